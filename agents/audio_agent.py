@@ -1,9 +1,12 @@
 import os
 import uuid
+import hashlib
 from pathlib import Path
+from typing import Iterator, Optional
 import pyttsx3
 from gtts import gTTS
 import logging
+from utils.tracing import traced
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
@@ -13,6 +16,14 @@ logger = logging.getLogger(__name__)
 AUDIO_DIR = Path("audio")
 AUDIO_DIR.mkdir(exist_ok=True)
 
+def content_audio_filename(text: str, engine: str = "gtts") -> str:
+    """
+    Content-addressed filename: the same text and engine always map to the
+    same file, so it can be reused and cached by clients indefinitely.
+    """
+    return hashlib.sha256(f"{engine}\0{text}".encode("utf-8")).hexdigest()[:32] + ".mp3"
+
+
 def generate_audio_filename(base: str = None) -> str:
     """
     Generates a unique filename for the audio file.
@@ -25,27 +36,38 @@ def generate_audio_filename(base: str = None) -> str:
     """
     return f"{base or uuid.uuid4().hex}.mp3"
 
+@traced("audio_agent.generate_audio")
 def generate_audio(text: str, filename: str = None, engine: str = "gtts") -> Path:
     """
     Converts input text to speech and saves it as an audio file.
     
     Args:
         text (str): The input text to convert to speech.
-        filename (str): Optional filename for the audio file (without extension). If None, a UUID is used.
+        filename (str): Optional filename for the audio file (without extension). If None, the name is
+            derived from the text and engine, and existing audio for the same text is reused.
         engine (str): The text-to-speech engine to use ('gtts' or 'pyttsx3').
 
     Returns:
         Path: Path to the generated audio file.
     """
-    # Generate audio filename (with .mp3 extension)
-    filename = generate_audio_filename(filename)
+    # Generate audio filename (with .mp3 extension); unnamed audio is content-addressed
+    content_addressed = not filename
+    filename = content_audio_filename(text, engine.lower()) if content_addressed else generate_audio_filename(filename)
     audio_path = AUDIO_DIR / filename
+    if content_addressed and audio_path.exists():
+        logger.info(f"Audio already generated at: {audio_path}")
+        return audio_path
 
     try:
         # Generate audio using gTTS (Google Text-to-Speech)
         if engine.lower() == "gtts":
             tts = gTTS(text)
-            tts.save(str(audio_path))
+            tmp_path = audio_path.with_name(f"{audio_path.name}.{uuid.uuid4().hex}.part")
+            try:
+                tts.save(str(tmp_path))
+                os.replace(tmp_path, audio_path)  # never serve a half-written file
+            finally:
+                tmp_path.unlink(missing_ok=True)
         # Generate audio using pyttsx3
         elif engine.lower() == "pyttsx3":
             engine = pyttsx3.init()
@@ -62,3 +84,56 @@ def generate_audio(text: str, filename: str = None, engine: str = "gtts") -> Pat
         # Log any errors that occur during audio generation
         logger.error(f"Failed to generate audio: {e}")
         return None
+
+
+def queue_audio(text: str) -> Optional[Path]:
+    """
+    Content-addressed audio path for `text` without synthesizing it yet. The
+    text is saved beside it, and the first request for the file streams the
+    MP3 while it is synthesized (see stream_audio), so playback starts after
+    the first TTS segment instead of after the whole summary.
+    """
+    if not text or not text.strip():
+        return None
+    audio_path = AUDIO_DIR / content_audio_filename(text)
+    text_path = audio_path.with_suffix(".txt")
+    if not audio_path.exists() and not text_path.exists():
+        tmp_path = text_path.with_name(f"{text_path.name}.{uuid.uuid4().hex}.part")
+        tmp_path.write_text(text, encoding="utf-8")
+        os.replace(tmp_path, text_path)
+    return audio_path
+
+
+def queued_audio_text(name: str) -> Optional[str]:
+    """Text queued by queue_audio() for the audio file `name`, or None."""
+    try:
+        return (AUDIO_DIR / name).with_suffix(".txt").read_text(encoding="utf-8")
+    except FileNotFoundError:
+        return None
+
+
+def stream_audio(text: str, chunk_size: int = 64 * 1024) -> Iterator[bytes]:
+    """
+    Yield MP3 bytes as gTTS produces each text segment, so playback can start
+    after the first segment. The stream is also written to the
+    content-addressed file, which later requests serve directly.
+    """
+    audio_path = AUDIO_DIR / content_audio_filename(text)
+    if audio_path.exists():
+        with open(audio_path, "rb") as f:
+            while chunk := f.read(chunk_size):
+                yield chunk
+        return
+
+    tmp_path = audio_path.with_name(f"{audio_path.name}.{uuid.uuid4().hex}.part")
+    try:
+        with open(tmp_path, "wb") as out:
+            for segment in gTTS(text).stream():
+                out.write(segment)
+                yield segment
+        os.replace(tmp_path, audio_path)
+        audio_path.with_suffix(".txt").unlink(missing_ok=True)
+        logger.info(f"Audio streamed and saved at: {audio_path}")
+    finally:
+        if tmp_path.exists():
+            tmp_path.unlink()  # client went away or TTS failed mid-stream
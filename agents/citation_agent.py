@@ -1,9 +1,17 @@
 import re
 import requests
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, Iterator, List, Optional, Tuple
 from PyPDF2 import PdfReader
 from urllib.parse import urlparse
+from utils.crossref import get_work, get_works, normalize_doi
+from utils.html_extract import fetch_html, extract_citation_metadata
+from utils.tracing import traced
 
-def extract_metadata_from_pdf(file_path: str) -> dict:
+def extract_metadata_from_pdf(file_path: str, document=None) -> dict:
+    if document is not None:  # already parsed by the caller (utils.document.Document)
+        return document.citation_metadata()
     try:
         reader = PdfReader(file_path)
         info = reader.metadata or {}
@@ -27,14 +35,16 @@ def extract_metadata_from_pdf(file_path: str) -> dict:
             "source": file_path
         }
 
-def extract_metadata_from_doi(doi: str) -> dict:
+def extract_metadata_from_doi(doi: str, record: dict = None) -> dict:
+    """
+    Build citation metadata for a DOI. Pass the Crossref `record` when the
+    caller already fetched it; otherwise it is looked up through the shared cache.
+    """
     try:
-        url = f"https://api.crossref.org/works/{doi}"
-        res = requests.get(url)
-        if res.status_code != 200:
+        data = record or get_work(doi)
+        if not data:
             raise Exception("DOI not found")
 
-        data = res.json()["message"]
         author_data = data.get("author", [])
         author_names = [f"{a.get('family', '')}, {a.get('given', '')}" for a in author_data]
         authors = ", ".join(author_names) if author_names else "Unknown Author"
@@ -86,11 +96,12 @@ def extract_metadata_from_text(text: str) -> dict:
         "source": "User-provided text"
     }
 
-def generate_citation(source: str, source_type: str) -> str:
+@traced("citation_agent.generate_citation")
+def generate_citation(source: str, source_type: str, record: dict = None, document=None) -> str:
     if source_type == "pdf":
-        meta = extract_metadata_from_pdf(source)
+        meta = extract_metadata_from_pdf(source, document)
     elif source_type == "doi":
-        meta = extract_metadata_from_doi(source)
+        meta = extract_metadata_from_doi(source, record)
     elif source_type == "url":
         meta = extract_metadata_from_url(source)
     elif source_type == "text":
@@ -100,3 +111,264 @@ def generate_citation(source: str, source_type: str) -> str:
 
     citation = f"{meta['author']}. ({meta['year']}). *{meta['title']}*. Retrieved from {meta['source']}."
     return citation
+
+
+# ---------------- Bulk export ---------------- #
+# Every source is normalized into one record; each style is a precompiled
+# template over fields prepared from that record.
+CITATION_STYLES = ("apa", "mla", "ieee", "bibtex")
+URL_WORKERS = 16
+DOI_RE = re.compile(r"^(?:https?://(?:dx\.)?doi\.org/|doi:)?(10\.\d{4,9}/\S+)$", re.IGNORECASE)
+_DOI_IN_TEXT = re.compile(r"\b(10\.\d{4,9}/[^\s\"<>]+[^\s\"<>.,;])")
+_AUTHOR_SPLIT = re.compile(r"\s*(?:;|\band\b|&)\s*")
+
+TEMPLATES = {
+    "apa": "{authors} ({year}). {title}{container}{link}",
+    "mla": "{authors} \"{title}\"{container}{link}",
+    "ieee": "[{n}] {authors}, \"{title},\"{container}{link}",
+    "bibtex": "@{entry_type}{{{key},\n{fields}\n}}\n",
+}
+BIBTEX_TYPES = {"journal-article": "article", "proceedings-article": "inproceedings",
+                "book-chapter": "incollection", "book": "book", "posted-content": "misc"}
+CONTAINER_FIELDS = {"journal-article": "journal", "proceedings-article": "booktitle", "book-chapter": "booktitle"}
+# DOIs and URLs are read verbatim by BibTeX styles, so only the text fields are escaped
+BIBTEX_VERBATIM = ("doi", "url")
+_BIBTEX_SPECIAL = re.compile(r"([&%$#_{}])")
+
+
+def empty_record(source: str = "") -> dict:
+    return {"authors": [], "title": "", "year": "", "container": "", "volume": "", "issue": "",
+            "pages": "", "publisher": "", "doi": "", "url": source, "type": ""}
+
+
+def split_name(name: str) -> Tuple[str, str]:
+    """("Family", "Given") from "Family, Given" or "Given Family"."""
+    name = " ".join(name.split())
+    if "," in name:
+        family, given = name.split(",", 1)
+        return family.strip(), given.strip()
+    parts = name.rsplit(" ", 1)
+    return (parts[1], parts[0]) if len(parts) == 2 else (name, "")
+
+
+def record_from_crossref(data: dict) -> dict:
+    record = empty_record(data.get("URL", ""))
+    record["authors"] = [
+        (a.get("family") or a.get("name", ""), a.get("given", "")) for a in data.get("author", [])
+        if a.get("family") or a.get("name")
+    ]
+    record["title"] = (data.get("title") or [""])[0]
+    issued = data.get("issued") or data.get("created") or {}
+    year = (issued.get("date-parts") or [[None]])[0][0]
+    record["year"] = str(year) if year else ""
+    record["container"] = (data.get("container-title") or [""])[0]
+    for field in ("volume", "issue", "page", "publisher", "DOI", "type"):
+        record["pages" if field == "page" else field.lower()] = data.get(field, "") or ""
+    return record
+
+
+def record_from_page(meta: dict) -> dict:
+    record = empty_record(meta["url"])
+    record.update({k: v for k, v in meta.items() if k in record and k != "authors" and v})
+    record["authors"] = [split_name(a) for a in meta["authors"]]
+    return record
+
+
+def record_from_document(document) -> dict:
+    meta = document.citation_metadata()
+    record = empty_record(meta["source"])
+    if meta["title"] != "Untitled":
+        record["title"] = meta["title"]
+    if meta["author"] != "Unknown Author":
+        record["authors"] = [split_name(a) for a in _AUTHOR_SPLIT.split(meta["author"]) if a.strip()]
+    record["year"] = "" if meta["year"] == "n.d." else meta["year"]
+    return record
+
+
+def find_doi(text: str) -> Optional[str]:
+    match = _DOI_IN_TEXT.search(text or "")
+    return normalize_doi(match.group(1)) if match else None
+
+
+@lru_cache(maxsize=2048)
+def _fetch_page_metadata(url: str) -> dict:
+    # lru_cache does not memoize exceptions, so a failed fetch is retried next time
+    content, final_url = fetch_html(url)
+    return extract_citation_metadata(content, final_url)
+
+
+def page_metadata(url: str) -> Optional[dict]:
+    """Citation meta tags of a landing page; successful lookups are memoized per process."""
+    try:
+        return _fetch_page_metadata(url)
+    except (requests.RequestException, ValueError) as e:
+        print(f"⚠️ Could not fetch {url}: {e}")
+        return None
+
+
+# ---------------- Styles ---------------- #
+def _sentence(text: str) -> str:
+    """End `text` with exactly one period ("Title?" and "n.d." stay as they are)."""
+    text = text.rstrip(" .")
+    return text if text.endswith(("?", "!")) else f"{text}."
+
+
+def _initials(given: str) -> str:
+    return " ".join(f"{part[0]}." for part in re.split(r"[\s.]+", given) if part)
+
+
+def _join(names: List[str], conjunction: str) -> str:
+    if len(names) < 3:
+        return f" {conjunction} ".join(names)
+    return ", ".join(names[:-1]) + f", {conjunction} " + names[-1]
+
+
+def _apa_authors(authors: list) -> str:
+    names = [f"{family}, {_initials(given)}".rstrip(", ") for family, given in authors[:20]]
+    if len(names) == 2:
+        return f"{names[0]}, & {names[1]}"
+    return _join(names, "&") if names else "Unknown Author"
+
+
+def _mla_authors(authors: list) -> str:
+    if not authors:
+        return "Unknown Author"
+    family, given = authors[0]
+    first = f"{family}, {given}" if given else family
+    if len(authors) == 1:
+        return first
+    if len(authors) == 2:
+        second_family, second_given = authors[1]
+        return f"{first}, and " + f"{second_given} {second_family}".strip()
+    return f"{first}, et al"
+
+
+def _ieee_authors(authors: list) -> str:
+    names = [f"{_initials(given)} {family}".strip() for family, given in authors]
+    if len(names) > 6:
+        return f"{names[0]} et al."
+    return _join(names, "and") if names else "Unknown Author"
+
+
+def _bibtex_key(record: dict, n: int, used_keys: set) -> str:
+    """surnameYEARword, with b, c, ... appended when an earlier entry already took the key."""
+    family = record["authors"][0][0] if record["authors"] else "anon"
+    word = next((w for w in re.findall(r"[A-Za-z]+", record["title"]) if len(w) > 3), "")
+    base = re.sub(r"[^A-Za-z0-9]", "", f"{family}{record['year'] or 'nd'}{word}").lower() or f"ref{n}"
+    key, suffix = base, 1
+    while key in used_keys:
+        key = base + (chr(ord("a") + suffix) if suffix < 26 else str(suffix))
+        suffix += 1
+    used_keys.add(key)
+    return key
+
+
+def _bibtex_escape(value: str) -> str:
+    return _BIBTEX_SPECIAL.sub(r"\\\1", value)
+
+
+def _bibtex_fields(record: dict) -> str:
+    fields = [
+        ("author", " and ".join(f"{family}, {given}".rstrip(", ") for family, given in record["authors"])),
+        ("title", record["title"]),
+        (CONTAINER_FIELDS.get(record["type"], "howpublished"), record["container"]),
+        ("year", record["year"]), ("volume", record["volume"]), ("number", record["issue"]),
+        ("pages", record["pages"].replace("-", "--")), ("publisher", record["publisher"]),
+        ("doi", record["doi"]), ("url", "" if record["doi"] else record["url"]),
+    ]
+    return ",\n".join(f"  {name} = {{{value if name in BIBTEX_VERBATIM else _bibtex_escape(value)}}}"
+                      for name, value in fields if value)
+
+
+def format_citation(record: dict, style: str = "apa", n: int = 1, used_keys: set = None) -> str:
+    """
+    Render one normalized record in `style`; `n` numbers IEEE entries and
+    `used_keys` collects BibTeX keys so one export never repeats a key.
+    """
+    if style == "bibtex":
+        key = _bibtex_key(record, n, used_keys if used_keys is not None else set())
+        return TEMPLATES[style].format(entry_type=BIBTEX_TYPES.get(record["type"], "misc"),
+                                       key=key, fields=_bibtex_fields(record))
+
+    title = record["title"] or "Untitled"
+    container, volume, issue, pages = record["container"].rstrip(" ."), record["volume"], record["issue"], record["pages"]
+    link = f" https://doi.org/{record['doi']}" if record["doi"] else (f" {record['url']}" if record["url"] else "")
+    if style == "apa":
+        parts = container + (f", {volume}" if volume else "") + (f"({issue})" if issue else "") + \
+            (f", {pages}" if pages else "")
+        return TEMPLATES[style].format(authors=_apa_authors(record["authors"]), year=record["year"] or "n.d.",
+                                       title=_sentence(title), container=f" {_sentence(parts)}" if parts else "",
+                                       link=link)
+    if style == "mla":
+        parts = [p for p in (container, f"vol. {volume}" if volume else "", f"no. {issue}" if issue else "",
+                             record["year"], f"pp. {pages}" if pages else "") if p]
+        return TEMPLATES[style].format(authors=_sentence(_mla_authors(record["authors"])), title=_sentence(title),
+                                       container=f" {_sentence(', '.join(parts))}" if parts else "", link=link)
+    if style == "ieee":
+        parts = [p for p in (container, f"vol. {volume}" if volume else "", f"no. {issue}" if issue else "",
+                             f"pp. {pages}" if pages else "", record["year"] or "n.d.") if p]
+        return TEMPLATES[style].format(n=n, authors=_ieee_authors(record["authors"]), title=title.rstrip(" .,"),
+                                       container=f" {_sentence(', '.join(parts))}",
+                                       link=f" doi: {record['doi']}." if record["doi"] else link)
+    raise ValueError(f"Unknown citation style '{style}'. Use one of: {', '.join(CITATION_STYLES)}.")
+
+
+def _unresolved(item: str, style: str, reason: str) -> str:
+    return f"% {reason}: {item}\n" if style == "bibtex" else f"[{reason}] {item}"
+
+
+# ---------------- Bulk resolution ---------------- #
+def bulk_citations(items: Iterable[str], style: str = "apa", documents: Iterable = ()) -> Iterator[str]:
+    """
+    Yield one rendered citation per DOI/URL in `items`, then one per parsed
+    PDF Document, in input order. All DOIs (including those found on landing
+    pages and in PDF text) go through one bulk Crossref lookup per pass;
+    landing pages are fetched concurrently.
+    """
+    if style not in CITATION_STYLES:
+        raise ValueError(f"Unknown citation style '{style}'. Use one of: {', '.join(CITATION_STYLES)}.")
+
+    entries = []  # (raw item, kind, value)
+    for item in items:
+        item = item.strip()
+        match = DOI_RE.match(item)
+        if match:
+            entries.append((item, "doi", normalize_doi(match.group(1))))
+        elif item.lower().startswith(("http://", "https://")):
+            entries.append((item, "url", item))
+        elif item:
+            entries.append((item, "invalid", item))
+    documents = list(documents)
+
+    with ThreadPoolExecutor(max_workers=URL_WORKERS) as executor:
+        pages = {value: executor.submit(page_metadata, value) for _, kind, value in entries if kind == "url"}
+        records = get_works([value for _, kind, value in entries if kind == "doi"])
+
+        # PDFs carry their DOI in the first pages far more often than in their metadata
+        pdf_dois = [find_doi(doc.text[:5000]) for doc in documents]
+        page_results = {url: future.result() for url, future in pages.items()}
+        page_dois = [meta["doi"] for meta in page_results.values() if meta and find_doi(meta["doi"])]
+        records.update(get_works([d for d in pdf_dois + page_dois if d and d not in records]))
+
+    n, used_keys = 0, set()
+    for item, kind, value in entries:
+        if kind == "invalid":
+            yield _unresolved(item, style, "Not a DOI or URL")
+            continue
+        if kind == "doi":
+            data = records.get(value)
+            record = record_from_crossref(data) if data else None
+        else:
+            meta = page_results.get(value)
+            doi = find_doi(meta["doi"]) if meta else None
+            record = record_from_crossref(records[doi]) if doi in records else (record_from_page(meta) if meta else None)
+        if record is None:
+            yield _unresolved(item, style, "Could not resolve")
+            continue
+        n += 1
+        yield format_citation(record, style, n, used_keys)
+
+    for document, doi in zip(documents, pdf_dois):
+        record = record_from_crossref(records[doi]) if doi in records else record_from_document(document)
+        n += 1
+        yield format_citation(record, style, n, used_keys)
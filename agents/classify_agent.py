@@ -1,14 +1,24 @@
-from typing import List, Union
+from typing import Iterator, List, Tuple
 import os
+import csv
+import json
+import itertools
+import threading
 import joblib
-from sklearn.feature_extraction.text import TfidfVectorizer
+from utils.embedding_cache import cached_encode  # before torch, the governor sets thread counts
+from sklearn.feature_extraction.text import TfidfVectorizer, HashingVectorizer
 from sklearn.naive_bayes import MultinomialNB
 from sentence_transformers import SentenceTransformer, util
 import numpy as np
+from utils.tracing import traced
 
 # Paths
 MODEL_PATH = "utils/classifier_model.pkl"
 VEC_PATH = "utils/tfidf_vectorizer.pkl"
+ONLINE_MODEL_PATH = "utils/online_classifier.pkl"  # (model, vectorizer) from train_model_incremental()
+
+# Hashing vectorizer is stateless, so online training never refits a vocabulary
+HASHING_FEATURES = 2 ** 20
 
 # Training Data (extendable)
 TRAIN_TEXTS = [
@@ -30,8 +40,9 @@ TRAIN_LABELS = [
     "Environmental Science"
 ]
 
-# Sentence-BERT model
-sbert_model = SentenceTransformer("all-MiniLM-L6-v2")
+# Sentence-BERT model; embeddings are cached on disk per model name
+SBERT_MODEL_NAME = "all-MiniLM-L6-v2"
+sbert_model = SentenceTransformer(SBERT_MODEL_NAME)
 
 # Topics for semantic classification
 TOPIC_LABELS = list(set(TRAIN_LABELS))
@@ -49,14 +60,108 @@ def train_model():
     return model, vectorizer
 
 
-def load_model():
-    if not os.path.exists(MODEL_PATH) or not os.path.exists(VEC_PATH):
-        return train_model()
-    model = joblib.load(MODEL_PATH)
-    vectorizer = joblib.load(VEC_PATH)
+def make_hashing_vectorizer() -> HashingVectorizer:
+    return HashingVectorizer(n_features=HASHING_FEATURES, alternate_sign=False, stop_words="english")
+
+
+def iter_labeled_corpus(corpus_path: str) -> Iterator[Tuple[str, str]]:
+    """
+    Stream (text, label) pairs from a labeled corpus on disk without loading it.
+    Supports JSON lines with "text" and "label" keys, or TSV/CSV files with
+    `label<TAB>text` / `label,text` rows and an optional `label,text` header.
+    """
+    if corpus_path.endswith((".jsonl", ".json")):
+        with open(corpus_path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    row = json.loads(line)
+                    yield row["text"], row["label"]
+    else:
+        delimiter = "\t" if corpus_path.endswith(".tsv") else ","
+        with open(corpus_path, encoding="utf-8", newline="") as f:
+            for i, row in enumerate(csv.reader(f, delimiter=delimiter)):
+                if i == 0 and [cell.strip().lower() for cell in row[:2]] == ["label", "text"]:
+                    continue  # header row
+                if len(row) >= 2:
+                    yield row[1], row[0]
+
+
+def train_model_incremental(corpus_path: str, batch_size: int = 10_000, resume: bool = False):
+    """
+    Train MultinomialNB with partial_fit on mini-batches streamed from
+    `corpus_path`, so memory stays bounded by `batch_size` regardless of corpus
+    size. The finished model is written atomically to ONLINE_MODEL_PATH and
+    picked up by running services on their next classification.
+
+    With resume=True training continues from the existing online model, which
+    requires the corpus to use the same label set.
+    """
+    vectorizer = make_hashing_vectorizer()
+
+    if resume and os.path.exists(ONLINE_MODEL_PATH):
+        model, _ = joblib.load(ONLINE_MODEL_PATH)
+        classes = model.classes_
+    else:
+        # partial_fit needs every class up front; one cheap streaming pass collects them
+        model = MultinomialNB(alpha=0.01)
+        classes = np.array(sorted({label for _, label in iter_labeled_corpus(corpus_path)}))
+
+    rows = iter_labeled_corpus(corpus_path)
+    seen = 0
+    while True:
+        batch = list(itertools.islice(rows, batch_size))
+        if not batch:
+            break
+        texts, labels = zip(*batch)
+        model.partial_fit(vectorizer.transform(texts), labels, classes=classes)
+        seen += len(batch)
+        print(f"[Training] {seen} documents processed")
+
+    if not seen:
+        raise ValueError(f"No labeled documents found in {corpus_path}.")
+
+    tmp_path = f"{ONLINE_MODEL_PATH}.tmp"
+    joblib.dump((model, vectorizer), tmp_path)
+    os.replace(tmp_path, ONLINE_MODEL_PATH)
     return model, vectorizer
 
 
+# Loaded (model, vectorizer) pair, reloaded only when the file on disk changes
+_loaded_model = {"path": None, "mtime": None, "pair": None}
+_model_lock = threading.Lock()
+
+
+def load_model():
+    """
+    Return the active (model, vectorizer) pair: the online model when one has
+    been trained, else the seed TF-IDF model. Kept in memory and swapped
+    atomically when a newer model file is written.
+    """
+    if os.path.exists(ONLINE_MODEL_PATH):
+        path = ONLINE_MODEL_PATH
+    elif os.path.exists(MODEL_PATH) and os.path.exists(VEC_PATH):
+        path = MODEL_PATH
+    else:
+        with _model_lock:
+            pair = train_model()
+            _loaded_model.update(path=MODEL_PATH, mtime=os.path.getmtime(MODEL_PATH), pair=pair)
+            return pair
+
+    mtime = os.path.getmtime(path)
+    if _loaded_model["path"] == path and _loaded_model["mtime"] == mtime:
+        return _loaded_model["pair"]
+
+    with _model_lock:
+        if _loaded_model["path"] != path or _loaded_model["mtime"] != mtime:
+            if path == ONLINE_MODEL_PATH:
+                pair = joblib.load(ONLINE_MODEL_PATH)
+            else:
+                pair = (joblib.load(MODEL_PATH), joblib.load(VEC_PATH))
+            _loaded_model.update(path=path, mtime=mtime, pair=pair)
+        return _loaded_model["pair"]
+
+
+@traced("classify_agent.classify_content")
 def classify_content(text: str) -> str:
     model, vectorizer = load_model()
     X_text = vectorizer.transform([text])
@@ -75,6 +180,41 @@ def classify_content(text: str) -> str:
     return f"{predicted_label} (confidence={confidence:.2f})"
 
 
+@traced("classify_agent.classify_contents")
+def classify_contents(texts: List[str]) -> List[str]:
+    """
+    Batched version of classify_content(). The model is loaded once, all texts
+    are vectorized in one call and low-confidence texts share one SBERT pass.
+    """
+    if not texts:
+        return []
+
+    model, vectorizer = load_model()
+    probas = model.predict_proba(vectorizer.transform(texts))
+
+    labels = [None] * len(texts)
+    fallback_idx = []
+    for i, row in enumerate(probas):
+        max_idx = np.argmax(row)
+        confidence = row[max_idx]
+        if confidence < 0.5:
+            fallback_idx.append(i)
+        else:
+            labels[i] = f"{model.classes_[max_idx]} (confidence={confidence:.2f})"
+
+    fallback_idx = [i for i in fallback_idx if texts[i].strip()]
+    if fallback_idx:
+        print(f"[Warning] Low confidence from Naive Bayes for {len(fallback_idx)} texts. Falling back to semantic classification.")
+        text_embeddings = cached_encode(sbert_model, SBERT_MODEL_NAME, [texts[i] for i in fallback_idx])
+        topic_embeddings = cached_encode(sbert_model, SBERT_MODEL_NAME, TOPIC_LABELS)
+        similarities = util.cos_sim(text_embeddings, topic_embeddings)
+        for row, i in enumerate(fallback_idx):
+            score, idx = similarities[row].max(dim=0)
+            labels[i] = f"{TOPIC_LABELS[int(idx)]} (semantic fallback, score={float(score):.2f})"
+
+    return [label or "Unknown" for label in labels]
+
+
 def classify_content_semantic(text: str, top_k: int = 3) -> List[dict]:
     """
     Classify the input text using semantic similarity to a predefined list of topics.
@@ -83,19 +223,44 @@ def classify_content_semantic(text: str, top_k: int = 3) -> List[dict]:
     if not text.strip():
         return []
 
-    # Compute embeddings
-    text_embedding = sbert_model.encode(text, convert_to_tensor=True)
-    topic_embeddings = sbert_model.encode(TOPIC_LABELS, convert_to_tensor=True)
+    return classify_content_with_topics(text, TOPIC_LABELS, top_k)
+
+
+@traced("classify_agent.classify_content_with_topics")
+def classify_content_with_topics(text: str, topics: List[str], top_k: int = 3) -> List[dict]:
+    """
+    Rank caller-supplied topics by semantic similarity to the text.
+    Returns top-k topics and their similarity scores.
+    """
+    topics = [topic for topic in topics if topic and topic.strip()]
+    if not text.strip() or not topics:
+        return []
+
+    # Compute embeddings (repeat texts and topic lists are served from the cache)
+    text_embedding = cached_encode(sbert_model, SBERT_MODEL_NAME, [text])
+    topic_embeddings = cached_encode(sbert_model, SBERT_MODEL_NAME, topics)
 
     # Compute similarity
     similarities = util.cos_sim(text_embedding, topic_embeddings)[0]
-    top_results = similarities.topk(k=top_k)
+    top_results = similarities.topk(k=min(top_k, len(topics)))
 
     results = []
     for score, idx in zip(top_results.values, top_results.indices):
         results.append({
-            "topic": TOPIC_LABELS[int(idx)],
+            "topic": topics[int(idx)],
             "similarity_score": float(score)
         })
 
     return results
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Incrementally train the paper classifier.")
+    parser.add_argument("corpus", help="Labeled corpus (.jsonl, .tsv or .csv)")
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    parser.add_argument("--resume", action="store_true", help="Continue training the existing online model")
+    args = parser.parse_args()
+
+    train_model_incremental(args.corpus, batch_size=args.batch_size, resume=args.resume)
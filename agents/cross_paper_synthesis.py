@@ -1,73 +1,91 @@
 import os
 import time
-from typing import List
-from PyPDF2 import PdfReader
-from transformers import pipeline
+from typing import List, Union
+from utils.document import Document, parse_pdf
 from concurrent.futures import ThreadPoolExecutor, as_completed
-
-# Use a faster model or keep Pegasus
-summarizer = pipeline("summarization", model="facebook/bart-large-cnn")  # Or use "google/pegasus-xsum"
+from utils.near_duplicate import deduplicate
+from agents.generation_profiles import get_summarizer, generation_kwargs, chunk_length, split_text, token_window
+from utils.resource_governor import run_inference, INFERENCE_SLOTS
+from utils.tracing import traced
 
 def clean_text(text: str) -> str:
     lines = text.splitlines()
     clean_lines = [line.strip() for line in lines if len(line.strip()) > 30]
     return " ".join(clean_lines)
 
-def extract_text_from_pdf(pdf_path: str) -> str:
+def extract_text_from_pdf(pdf: Union[str, Document]) -> str:
     try:
-        reader = PdfReader(pdf_path)
-        text = ""
-        for page in reader.pages:
-            page_text = page.extract_text()
-            if page_text:
-                text += page_text + "\n"
-        return clean_text(text)
+        document = pdf if isinstance(pdf, Document) else parse_pdf(pdf)
+        return clean_text(document.select_text())  # skips references, appendices, tables
     except Exception as e:
-        print(f"❌ Failed to extract text from {pdf_path}: {e}")
+        print(f"❌ Failed to extract text from {pdf}: {e}")
         return ""
 
 def chunk_text(text: str, max_words: int = 200) -> List[str]:
     words = text.split()
     return [" ".join(words[i:i + max_words]) for i in range(0, len(words), max_words)]
 
-def summarize_single_chunk(i: int, chunk: str) -> str:
+def summarize_single_chunk(i: int, chunk: str, profile: str = "balanced") -> str:
     try:
         if len(chunk.split()) < 50:
             print(f"⚠️ Chunk {i+1} too short, skipping.")
             return ""
-        summary = summarizer(chunk, max_length=150, min_length=30, do_sample=False)[0]['summary_text']
+        summary = run_inference(get_summarizer(profile), chunk, **generation_kwargs(profile))[0]['summary_text']
         print(f"✅ Chunk {i+1} summarized.")
         return summary
     except Exception as e:
         print(f"⚠️ Error summarizing chunk {i+1}: {e}")
         return ""
 
-def summarize_chunks_parallel(chunks: List[str], max_workers: int = 6) -> List[str]:
+def summarize_chunks_parallel(chunks: List[str], max_workers: int = INFERENCE_SLOTS, profile: str = "balanced") -> List[str]:
+    # More threads than inference slots would only queue in the governor
     summaries = []
     with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        future_to_index = {executor.submit(summarize_single_chunk, i, chunk): i for i, chunk in enumerate(chunks)}
+        future_to_index = {executor.submit(summarize_single_chunk, i, chunk, profile): i for i, chunk in enumerate(chunks)}
         for future in as_completed(future_to_index):
             summary = future.result()
             if summary:
                 summaries.append(summary)
     return summaries
 
-def summarize_pdf(pdf_path: str) -> str:
+@traced("cross_paper_synthesis.summarize_extracted_text")
+def summarize_extracted_text(text: str, profile: str = "balanced") -> str:
+    chunks = split_text(text, profile) if token_window(profile) else chunk_text(text)
+    summaries = summarize_chunks_parallel(chunks, profile=profile)
+    return " ".join(summaries)
+
+def summarize_pdf(pdf_path: Union[str, Document], profile: str = "balanced") -> str:
     text = extract_text_from_pdf(pdf_path)
     if not text:
         print(f"⚠️ No extractable text in {pdf_path}")
         return ""
-    chunks = chunk_text(text)
-    summaries = summarize_chunks_parallel(chunks)
-    return " ".join(summaries)
+    return summarize_extracted_text(text, profile)
 
-def cross_paper_synthesis(pdf_paths: List[str]) -> str:
+@traced("cross_paper_synthesis.cross_paper_synthesis")
+def cross_paper_synthesis(pdf_paths: List[Union[str, Document]], profile: str = "balanced") -> str:
     start_time = time.time()
     all_summaries = []
 
-    for i, path in enumerate(pdf_paths):
-        print(f"\n📄 Processing {os.path.basename(path)} ({i+1}/{len(pdf_paths)})...")
-        summary = summarize_pdf(path)
+    # Extract everything first so near-duplicate papers (e.g. arXiv and
+    # publisher versions) are dropped before any model work
+    papers = []
+    for pdf in pdf_paths:
+        path = pdf.source if isinstance(pdf, Document) else pdf
+        text = extract_text_from_pdf(pdf)
+        if text:
+            papers.append((path, text))
+        else:
+            print(f"⚠️ No extractable text in {path}")
+
+    keep = deduplicate([text for _, text in papers])
+    for i, (path, _) in enumerate(papers):
+        if i not in keep:
+            print(f"⚠️ Skipping {os.path.basename(path)}: near-duplicate of another uploaded paper.")
+    papers = [papers[i] for i in keep]
+
+    for i, (path, text) in enumerate(papers):
+        print(f"\n📄 Processing {os.path.basename(path)} ({i+1}/{len(papers)})...")
+        summary = summarize_extracted_text(text, profile)
         if summary:
             all_summaries.append(f"Summary of {os.path.basename(path)}:\n{summary}")
         else:
@@ -76,7 +94,8 @@ def cross_paper_synthesis(pdf_paths: List[str]) -> str:
     if not all_summaries:
         return "❌ No valid summaries were generated."
 
-    combined_input = "\n\n".join(all_summaries)[:3000]
+    # BART profiles only see the first ~3000 characters; the long-context profile reads them all
+    combined_input = "\n\n".join(all_summaries)[:chunk_length(profile, 3000)]
     final_prompt = (
         "Here are summaries of different research papers. "
         "Please synthesize the key insights, compare common themes, highlight unique contributions, "
@@ -85,7 +104,8 @@ def cross_paper_synthesis(pdf_paths: List[str]) -> str:
     )
 
     try:
-        result = summarizer(final_prompt, max_length=250, min_length=100, do_sample=False)[0]['summary_text']
+        settings = generation_kwargs(profile, max_length=250, min_length=100)
+        result = run_inference(get_summarizer(profile), final_prompt, **settings)[0]['summary_text']
         elapsed = round(time.time() - start_time, 2)
         return f"🧠 Cross-Paper Synthesis (completed in {elapsed}s):\n\n{result}"
     except Exception as e:
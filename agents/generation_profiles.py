@@ -0,0 +1,134 @@
+import os
+import threading
+from typing import List, Optional
+from utils import resource_governor  # noqa: F401  sets thread env vars before torch loads
+from transformers import pipeline
+
+# ---------------- Profiles ---------------- #
+# Named generation settings shared by every summarization agent. "quality"
+# matches the settings summarize() has always used; "balanced" matches the
+# synthesis agent's chunk settings; "fast" trades detail for latency with a
+# distilled BART and fewer beams. "long" swaps BART's 1024-token window for a
+# Longformer encoder-decoder (LED) that reads a whole paper in one or two passes.
+LONG_CONTEXT_MODEL = os.getenv("LONG_CONTEXT_MODEL", "allenai/led-large-16384-arxiv")
+LONG_CONTEXT_TOKENS = int(os.getenv("LONG_CONTEXT_TOKENS", "16384"))
+CHARS_PER_TOKEN = 4  # rough average for English prose; inputs are still cut by the tokenizer
+
+GENERATION_PROFILES = {
+    "fast": {
+        "model": "sshleifer/distilbart-cnn-6-6",
+        "num_beams": 2,
+        "max_length": 120,
+        "min_length": 30,
+        "early_stopping": True,
+        "no_repeat_ngram_size": 3,
+    },
+    "balanced": {
+        "model": "facebook/bart-large-cnn",
+        "num_beams": 4,
+        "max_length": 150,
+        "min_length": 40,
+        "early_stopping": True,
+        "no_repeat_ngram_size": 3,
+    },
+    "quality": {
+        "model": "facebook/bart-large-cnn",
+        "num_beams": 4,
+        "max_length": 512,
+        "min_length": 150,
+        "length_penalty": 2.0,
+        "early_stopping": True,
+        "no_repeat_ngram_size": 3,
+    },
+    "long": {
+        "model": LONG_CONTEXT_MODEL,
+        "backend": "led",
+        "max_input_tokens": LONG_CONTEXT_TOKENS,
+        "chunk_chars": LONG_CONTEXT_TOKENS * CHARS_PER_TOKEN,
+        "num_beams": 2,
+        "max_length": 512,
+        "min_length": 150,
+        "length_penalty": 2.0,
+        "early_stopping": True,
+        "no_repeat_ngram_size": 3,
+    },
+}
+
+# Profile keys that pick and size the model rather than being passed to generate()
+MODEL_SETTINGS = ("model", "backend", "max_input_tokens", "chunk_chars")
+
+# Ordered from cheapest to most thorough; a stored result made with a profile
+# at least as thorough as the requested one, on the same backend, can be reused.
+PROFILE_RANK = {"fast": 0, "balanced": 1, "quality": 2, "long": 3}
+
+# Route defaults reproduce the summaries these routes gave before profiles
+# existed; set INTERACTIVE_PROFILE=fast to trade detail for latency
+INTERACTIVE_PROFILE = os.getenv("INTERACTIVE_PROFILE", "quality")
+BATCH_PROFILE = os.getenv("BATCH_PROFILE", "quality")
+
+_pipelines = {}
+_pipelines_lock = threading.Lock()
+
+
+def resolve_profile(name: str = None, default: str = "quality") -> str:
+    """Validate a profile name, falling back to `default` when none is given."""
+    name = (name or default).lower()
+    if name not in GENERATION_PROFILES:
+        raise ValueError(f"Unknown generation profile '{name}'. Use one of: {', '.join(GENERATION_PROFILES)}.")
+    return name
+
+
+def get_summarizer(profile: str = "quality"):
+    """Summarization pipeline for a profile's model, loaded once per model and shared."""
+    settings = GENERATION_PROFILES[resolve_profile(profile)]
+    model = settings["model"]
+    if model not in _pipelines:
+        with _pipelines_lock:
+            if model not in _pipelines:
+                if settings.get("backend") == "led":
+                    from agents.long_context import LongContextSummarizer
+                    _pipelines[model] = LongContextSummarizer(model, settings["max_input_tokens"])
+                else:
+                    _pipelines[model] = pipeline("summarization", model=model)
+    return _pipelines[model]
+
+
+def chunk_length(profile: str = "quality", default: int = 1024) -> int:
+    """Characters per summarizer call: the profile's own window, or the caller's default."""
+    return GENERATION_PROFILES[resolve_profile(profile)].get("chunk_chars", default)
+
+
+def token_window(profile: str = "quality") -> Optional[int]:
+    """Input tokens per call for profiles split by their tokenizer; None for character-chunked profiles."""
+    return GENERATION_PROFILES[resolve_profile(profile)].get("max_input_tokens")
+
+
+def split_text(text: str, profile: str = "quality", default: int = 1024) -> List[str]:
+    """
+    Summarizer inputs for `text`: windows of the model's token limit for
+    token-windowed profiles (so nothing is cut off by truncation), else slices
+    of chunk_length() characters.
+    """
+    if token_window(profile):
+        return get_summarizer(profile).split(text)
+    size = chunk_length(profile, default)
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+def generation_kwargs(profile: str = "quality", **overrides) -> dict:
+    """Pipeline call arguments for a profile (everything except the model)."""
+    settings = {k: v for k, v in GENERATION_PROFILES[resolve_profile(profile)].items() if k not in MODEL_SETTINGS}
+    settings.update(overrides)
+    settings["do_sample"] = False
+    return settings
+
+
+def profile_satisfies(stored_profile: str, requested_profile: str) -> bool:
+    """Whether a result generated with `stored_profile` may answer a `requested_profile` request."""
+    # Results stored before profiles existed were generated with the quality settings
+    stored_profile = stored_profile or "quality"
+    requested_profile = resolve_profile(requested_profile)
+    # BART and LED summaries differ in kind, not just detail, so neither stands in for the other
+    if GENERATION_PROFILES.get(stored_profile, {}).get("backend") != GENERATION_PROFILES[requested_profile].get("backend"):
+        return False
+    return PROFILE_RANK.get(stored_profile, 0) >= PROFILE_RANK[requested_profile]
@@ -0,0 +1,47 @@
+import torch
+from typing import List, Union
+from transformers import AutoTokenizer, AutoModelForSeq2SeqLM
+
+# Inputs of several thousand tokens are padded to the longest in the batch;
+# more than two at a time mostly costs memory on CPU
+MAX_BATCH = 2
+# Re-tokenizing a slice can merge differently at its edges; keep a few tokens spare
+SPLIT_MARGIN = 8
+
+
+class LongContextSummarizer:
+    """
+    LED (Longformer Encoder-Decoder) summarizer with the same call signature
+    and output as a transformers summarization pipeline, so the agents and
+    run_inference() use it unchanged. LED needs global attention on the first
+    token, which the pipeline does not set, hence the direct generate() call.
+    """
+
+    def __init__(self, model_name: str, max_input_tokens: int = 16384):
+        self.tokenizer = AutoTokenizer.from_pretrained(model_name)
+        self.model = AutoModelForSeq2SeqLM.from_pretrained(model_name).eval()
+        limit = getattr(self.model.config, "max_encoder_position_embeddings", max_input_tokens)
+        self.max_input_tokens = min(max_input_tokens, limit)
+
+    def split(self, text: str) -> List[str]:
+        """Cut `text` at token boundaries into pieces that fit max_input_tokens."""
+        window = self.max_input_tokens - self.tokenizer.num_special_tokens_to_add() - SPLIT_MARGIN
+        offsets = self.tokenizer(text, add_special_tokens=False, return_offsets_mapping=True,
+                                 verbose=False)["offset_mapping"]
+        starts = [0] + [offsets[i][0] for i in range(window, len(offsets), window)]
+        return [text[start:end] for start, end in zip(starts, starts[1:] + [len(text)])] if offsets else []
+
+    def __call__(self, texts: Union[str, List[str]], batch_size: int = 1, **generate_kwargs) -> List[dict]:
+        texts = [texts] if isinstance(texts, str) else list(texts)
+        batch_size = max(1, min(batch_size or 1, MAX_BATCH))
+        results = []
+        for i in range(0, len(texts), batch_size):
+            inputs = self.tokenizer(texts[i:i + batch_size], return_tensors="pt", padding=True,
+                                    truncation=True, max_length=self.max_input_tokens)
+            global_attention_mask = torch.zeros_like(inputs["input_ids"])
+            global_attention_mask[:, 0] = 1
+            with torch.inference_mode():
+                output = self.model.generate(**inputs, global_attention_mask=global_attention_mask, **generate_kwargs)
+            results.extend({"summary_text": text.strip()}
+                           for text in self.tokenizer.batch_decode(output, skip_special_tokens=True))
+        return results
@@ -0,0 +1,82 @@
+from pathlib import Path
+from typing import Optional
+from utils.corpus_store import find_paper, save_paper
+from utils.near_duplicate import text_signature, find_near_duplicates, add_document
+from agents.generation_profiles import profile_satisfies
+from agents.similarity_agent import index_paper
+
+# ---------------- Processed papers ---------------- #
+# Lookup and post-processing shared by the API routes and the Celery tasks, so
+# a paper processed either way lands in the same stores and indexes.
+
+# A near-duplicate's result is reused only when it was made from at least
+# about as much text: a summary of a full PDF may answer a later request for
+# the abstract page, never the other way round.
+MIN_REUSE_LENGTH_RATIO = 0.8
+
+
+def remember_paper(record: dict, signature=None) -> None:
+    """
+    Persist a processed paper to the corpus store, the near-duplicate index and
+    the similarity index without failing the request if any write goes wrong.
+    """
+    try:
+        save_paper(record)
+        add_document(record["content_hash"], signature if signature is not None else text_signature(record["text"]))
+    except Exception as e:
+        print(f"⚠️ Could not store paper: {e}")
+
+    try:
+        metadata = {key: record[key] for key in ("content_hash", "doi", "url", "filename", "category", "citation") if record.get(key)}
+        index_paper(record["text"], record["summary"], metadata)
+    except Exception as e:
+        print(f"⚠️ Could not index paper: {e}")
+
+
+def reusable(record: Optional[dict], profile: str) -> Optional[dict]:
+    """The stored record if it was generated with a profile at least as thorough as `profile`."""
+    if record and profile_satisfies(record.get("profile"), profile):
+        return record
+    return None
+
+
+def find_processed_paper(text_hash: str, signature, profile: str) -> Optional[dict]:
+    """
+    Stored record for freshly extracted text: an exact content-hash match
+    first, then the closest MinHash near-duplicate (same paper from another
+    source) whose stored text is not much shorter than the new one.
+    """
+    stored = reusable(find_paper(content_hash=text_hash), profile)
+    if stored:
+        return stored
+    for duplicate_of in find_near_duplicates(signature):
+        record = reusable(find_paper(content_hash=duplicate_of), profile)
+        if record and len(record["text"]) >= MIN_REUSE_LENGTH_RATIO * signature.length:
+            return record
+    return None
+
+
+def stored_paper_response(record: dict) -> dict:
+    """Response body of /process-url and /process-doi for a stored paper."""
+    return {
+        "text": record["text"],
+        "category": record["category"],
+        "summary": record["summary"],
+        "audio_url": record["audio_path"],
+        "citation": record["citation"],
+        "profile": record.get("profile"),
+        "cached": True
+    }
+
+
+def stored_pdf_response(record: dict) -> dict:
+    """Response body of /upload-pdf/ for a stored paper."""
+    return {
+        "classification": record["category"],
+        "summary": record["summary"],
+        "citations": record["citation"],
+        "audio_file": Path(record["audio_path"]).name if record["audio_path"] else None,
+        "message": "✅ PDF already processed, returning stored result.",
+        "profile": record.get("profile"),
+        "cached": True
+    }
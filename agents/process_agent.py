@@ -2,6 +2,8 @@ import fitz  # PyMuPDF
 from pathlib import Path
 from PyPDF2 import PdfReader
 from utils.helpers import extract_from_doi, extract_from_url
+from utils.document import parse_pdf
+from utils.tracing import traced
 
 def process_paper(file_path: str = None, url: str = None, doi: str = None) -> dict:
     """
@@ -39,16 +41,16 @@ def process_file(file_path: str) -> dict:
 
     return {"id": file_path, "content": text}
 
+@traced("process_agent.extract_text_from_pdf")
 def extract_text_from_pdf(file_path: str) -> str:
     """
     Extract text from a PDF file using PyMuPDF or PyPDF2.
     """
     text = ""
 
-    # Option 1: Using PyMuPDF (fitz)
+    # Option 1: Using PyMuPDF (fitz), via the shared Document parser
     try:
-        with fitz.open(file_path) as doc:
-            text = " ".join([page.get_text() for page in doc])
+        text = parse_pdf(file_path).text
     except Exception as e:
         print(f"❌ Error extracting text with PyMuPDF: {e}")
 
@@ -94,6 +96,7 @@ def c(doi: str) -> dict:
 import requests
 from bs4 import BeautifulSoup
 
+@traced("process_agent.extract_from_url")
 def extract_from_url(url: str) -> dict:
     """
     Extract paper information from a URL by scraping academic websites.
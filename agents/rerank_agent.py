@@ -0,0 +1,57 @@
+import re
+import numpy as np
+from typing import List
+from agents.classify_agent import sbert_model, SBERT_MODEL_NAME
+from utils.embedding_cache import cached_encode
+from utils.tracing import traced
+
+# ---------------- Config ---------------- #
+# all-MiniLM-L6-v2 reads at most 256 word pieces, so longer abstracts add
+# hashing work without changing the embedding
+MAX_RESULT_CHARS = 1500
+PLACEHOLDERS = {"", "no title", "no abstract", "unknown"}
+
+
+def result_text(result: dict) -> str:
+    """Title and abstract of a search result, as one passage to embed."""
+    parts = [str(result.get(field) or "").strip() for field in ("title", "abstract")]
+    parts = [part for part in parts if part.lower() not in PLACEHOLDERS]
+    return re.sub(r"\s+", " ", ". ".join(parts))[:MAX_RESULT_CHARS]
+
+
+@traced("rerank_agent.rerank_results")
+def rerank_results(query: str, results: List[dict]) -> List[dict]:
+    """
+    Re-sort search results by semantic similarity to the query. The query and
+    every title+abstract are encoded in one batched SBERT call (abstracts seen
+    before come from the embedding cache) and scored with one matrix-vector
+    product. Each result gains a "relevance_score"; ties keep provider order.
+    """
+    if not query.strip() or not results:
+        return results
+
+    texts = [result_text(result) for result in results]
+    embeddings = cached_encode(sbert_model, SBERT_MODEL_NAME, [query.strip()] + texts, normalize=True)
+    scores = embeddings[1:] @ embeddings[0]
+    scores[[i for i, text in enumerate(texts) if not text]] = -1.0  # nothing to compare against
+
+    order = np.argsort(-scores, kind="stable")
+    return [{**results[i], "relevance_score": round(float(scores[i]), 4)} for i in order]
+
+
+def merge_results(results_by_source: dict) -> List[dict]:
+    """
+    Interleave several providers' result lists, tagging each result with its
+    source and dropping repeats of the same title from later sources.
+    """
+    merged, seen = [], set()
+    lists = [[{**result, "source": source} for result in results] for source, results in results_by_source.items()]
+    for rank in range(max((len(results) for results in lists), default=0)):
+        for results in lists:
+            if rank < len(results):
+                key = re.sub(r"\W+", " ", str(results[rank].get("title") or "")).strip().lower()
+                if key and key in seen:
+                    continue
+                seen.add(key)
+                merged.append(results[rank])
+    return merged
@@ -1,6 +1,11 @@
 import requests
 from bs4 import BeautifulSoup
 import re
+import json
+import base64
+from utils.rate_limiter import rate_limited_get
+from utils.html_extract import fetch_html, extract_paper_metadata
+from utils.tracing import traced
 def search_paper(query: str, max_results: int = 5, sort_by: str = 'relevance', date_filter: str = 'year') -> list:
     """
     Search for academic papers based on a query string from the Semantic Scholar API or other repositories.
@@ -23,7 +28,7 @@ def search_paper(query: str, max_results: int = 5, sort_by: str = 'relevance', d
     
     try:
         # Send the request to the API endpoint
-        response = requests.get(base_url, params=params)
+        response = rate_limited_get(base_url, params=params)
         response.raise_for_status()  # Raise an exception for HTTP errors
         
         # Parse the response JSON data
@@ -49,14 +54,11 @@ def search_paper(query: str, max_results: int = 5, sort_by: str = 'relevance', d
     
 import requests
 
-def search_semantic_scholar(query: str, sort_by: str = "relevance", limit: int = 10):
+def search_semantic_scholar_page(query: str, sort_by: str = "relevance", limit: int = 10, offset: int = 0):
     """
-    Searches research articles on Semantic Scholar based on the given query.
+    Fetch one page of Semantic Scholar results starting at `offset`.
 
-    :param query: The search term (topic, title, author, etc.).
-    :param sort_by: Sorting method ('relevance' or 'recency').
-    :param limit: Number of articles to return.
-    :return: List of article metadata.
+    :return: (results, next_offset) where next_offset is None on the last page.
     """
     base_url = "https://api.semanticscholar.org/graph/v1/paper/search"
     headers = {"Accept": "application/json"}
@@ -72,12 +74,12 @@ def search_semantic_scholar(query: str, sort_by: str = "relevance", limit: int =
         "query": query,
         "limit": limit,
         "fields": "title,authors,abstract,year,venue,url",
-        "offset": 0,
+        "offset": offset,
         "sort": sort_param
     }
 
     try:
-        response = requests.get(base_url, headers=headers, params=params)
+        response = rate_limited_get(base_url, headers=headers, params=params)
         response.raise_for_status()
         data = response.json()
 
@@ -92,10 +94,22 @@ def search_semantic_scholar(query: str, sort_by: str = "relevance", limit: int =
                 "url": paper.get("url")
             })
 
-        return results
+        return results, data.get("next")
 
     except Exception as e:
         raise RuntimeError(f"Semantic Scholar search failed: {e}")
+
+
+def search_semantic_scholar(query: str, sort_by: str = "relevance", limit: int = 10):
+    """
+    Searches research articles on Semantic Scholar based on the given query.
+
+    :param query: The search term (topic, title, author, etc.).
+    :param sort_by: Sorting method ('relevance' or 'recency').
+    :param limit: Number of articles to return.
+    :return: List of article metadata.
+    """
+    return search_semantic_scholar_page(query, sort_by, limit)[0]
     
 import feedparser
 
@@ -104,19 +118,24 @@ from urllib.parse import urlencode
 
 import feedparser
 
-def search_arxiv(query: str, limit: int = 10, sort_by: str = "relevance"):
+def search_arxiv_page(query: str, limit: int = 10, sort_by: str = "relevance", start: int = 0):
+    """
+    Fetch one page of arXiv results starting at `start`.
+
+    :return: (results, next_start) where next_start is None on the last page.
+    """
     base_url = "http://export.arxiv.org/api/query"
     
     params = {
         "search_query": query,
-        "start": 0,
+        "start": start,
         "max_results": limit,
         "sortBy": sort_by,
         "sortOrder": "descending"
     }
 
     try:
-        response = requests.get(base_url, params=params)
+        response = rate_limited_get(base_url, params=params)
         response.raise_for_status()
         
         # Parse the XML response
@@ -131,58 +150,150 @@ def search_arxiv(query: str, limit: int = 10, sort_by: str = "relevance"):
                 "venue": "arXiv",
                 "url": entry.link
             })
-        return results
+
+        total = int(feed.feed.get("opensearch_totalresults", 0) or 0)
+        next_start = start + len(results)
+        has_more = len(results) == limit and (not total or next_start < total)
+        return results, next_start if has_more else None
 
     except requests.RequestException as e:
         raise RuntimeError(f"ArXiv search failed: {e}")
 
 
+def search_arxiv(query: str, limit: int = 10, sort_by: str = "relevance"):
+    return search_arxiv_page(query, limit, sort_by)[0]
+
+
 
 import requests
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from xml.etree import ElementTree
 
-def search_pubmed(query: str, sort_by: str = "relevance", limit: int = 10):
-    search_url = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils/esearch.fcgi"
-    fetch_url = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils/efetch.fcgi"
+PUBMED_ESEARCH_URL = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils/esearch.fcgi"
+PUBMED_EFETCH_URL = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils/efetch.fcgi"
+PUBMED_EFETCH_BATCH = 200   # records per EFetch call
+PUBMED_MAX_WORKERS = 3      # NCBI allows 3 requests/second without an API key
+
 
-    # Step 1: Search for IDs
+def pubmed_esearch(query: str, sort_by: str = "relevance"):
+    """
+    Run ESearch on the Entrez history server.
+
+    :return: (count, webenv, query_key) used by later EFetch calls.
+    """
     search_params = {
         "db": "pubmed",
         "term": query,
-        "retmax": limit,
-        "sort": "relevance" if sort_by == "relevance" else "pub+date",
+        "retmax": 0,
+        "usehistory": "y",
+        "sort": "relevance" if sort_by == "relevance" else "pub_date",
         "retmode": "json"
     }
-    response = requests.get(search_url, params=search_params)
+    response = rate_limited_get(PUBMED_ESEARCH_URL, params=search_params)
     response.raise_for_status()
-    ids = response.json().get("esearchresult", {}).get("idlist", [])
+    esearch = response.json().get("esearchresult", {})
+    return int(esearch.get("count", 0)), esearch.get("webenv"), esearch.get("querykey")
+
 
-    # Step 2: Fetch article metadata
+def parse_pubmed_articles(stream):
+    """
+    Incrementally parse an EFetch XML stream, yielding one dict per article and
+    clearing each element once read so memory does not grow with the response.
+    """
+    root = None
+    for event, elem in ElementTree.iterparse(stream, events=("start", "end")):
+        if event == "start":
+            if root is None:
+                root = elem
+            continue
+        if elem.tag != "PubmedArticle":
+            continue
+
+        pmid = elem.findtext(".//MedlineCitation/PMID", default="")
+        title_elem = elem.find(".//ArticleTitle")
+        title = "".join(title_elem.itertext()).strip() if title_elem is not None else "No title"
+
+        sections = []
+        for part in elem.iterfind(".//Abstract/AbstractText"):
+            text = "".join(part.itertext()).strip()
+            label = part.get("Label")
+            if text:
+                sections.append(f"{label}: {text}" if label else text)
+
+        authors = [f"{a.findtext('ForeName')} {a.findtext('LastName')}"
+                   for a in elem.iterfind(".//Author") if a.find("LastName") is not None]
+        journal = elem.findtext(".//Journal/Title", default="Unknown Journal")
+
+        yield {
+            "title": title or "No title",
+            "abstract": " ".join(sections) or "No abstract",
+            "authors": authors,
+            "journal": journal,
+            "url": f"https://pubmed.ncbi.nlm.nih.gov/{pmid}/" if pmid else None
+        }
+
+        elem.clear()
+        root.clear()
+
+
+def pubmed_efetch_batch(webenv: str, query_key: str, retstart: int, retmax: int) -> list:
+    """Fetch one batch of records from the history server, parsing while it downloads."""
     fetch_params = {
         "db": "pubmed",
-        "id": ",".join(ids),
+        "WebEnv": webenv,
+        "query_key": query_key,
+        "retstart": retstart,
+        "retmax": retmax,
         "retmode": "xml"
     }
-    fetch_response = requests.get(fetch_url, params=fetch_params)
-    fetch_response.raise_for_status()
-
-    root = ElementTree.fromstring(fetch_response.content)
-    results = []
-
-    for article in root.findall(".//PubmedArticle"):
-        title = article.findtext(".//ArticleTitle", default="No title")
-        abstract = article.findtext(".//Abstract/AbstractText", default="No abstract")
-        authors = [f"{a.findtext('ForeName')} {a.findtext('LastName')}" 
-                   for a in article.findall(".//Author") if a.find("LastName") is not None]
-        journal = article.findtext(".//Journal/Title", default="Unknown Journal")
-        results.append({
-            "title": title,
-            "abstract": abstract,
-            "authors": authors,
-            "journal": journal
-        })
+    with rate_limited_get(PUBMED_EFETCH_URL, params=fetch_params, stream=True) as response:
+        response.raise_for_status()
+        response.raw.decode_content = True
+        return list(parse_pubmed_articles(response.raw))
 
-    return results
+
+def iter_pubmed_results(webenv: str, query_key: str, start: int, end: int):
+    """
+    Yield records start..end from the history server in order. EFetch batches
+    are pipelined across a small pool, so the next batches download while
+    the current one is consumed; at most PUBMED_MAX_WORKERS batches are held.
+    """
+    with ThreadPoolExecutor(max_workers=PUBMED_MAX_WORKERS) as executor:
+        in_flight = deque()
+        for batch_start in range(start, end, PUBMED_EFETCH_BATCH):
+            batch_size = min(PUBMED_EFETCH_BATCH, end - batch_start)
+            in_flight.append(executor.submit(pubmed_efetch_batch, webenv, query_key, batch_start, batch_size))
+            if len(in_flight) >= PUBMED_MAX_WORKERS:
+                yield from in_flight.popleft().result()
+        while in_flight:
+            yield from in_flight.popleft().result()
+
+
+def search_pubmed_page(query: str, sort_by: str = "relevance", limit: int = 10, retstart: int = 0):
+    """
+    Fetch one page of PubMed results starting at `retstart`.
+
+    :return: (results, next_retstart) where next_retstart is None on the last page.
+    """
+    count, webenv, query_key = pubmed_esearch(query, sort_by)
+    end = min(count, retstart + limit)
+    if not webenv or retstart >= end:
+        return [], None
+
+    results = list(iter_pubmed_results(webenv, query_key, retstart, end))
+    return results, end if end < count else None
+
+
+def stream_pubmed(query: str, sort_by: str = "relevance", max_results: int = 1000):
+    """Yield up to `max_results` PubMed records from a single history-server search."""
+    count, webenv, query_key = pubmed_esearch(query, sort_by)
+    if webenv:
+        yield from iter_pubmed_results(webenv, query_key, 0, min(count, max_results))
+
+
+def search_pubmed(query: str, sort_by: str = "relevance", limit: int = 10):
+    return search_pubmed_page(query, sort_by, limit)[0]
 
 import requests
 
@@ -196,18 +307,24 @@ def reconstruct_abstract(inverted_index):
     word_positions.sort()
     return " ".join(word for _, word in word_positions)
 
-def search_openalex(query: str, sort_by: str = "relevance", limit: int = 10):
+def search_openalex_page(query: str, sort_by: str = "relevance", limit: int = 10, cursor: str = "*"):
+    """
+    Fetch one page of OpenAlex results using cursor paging (start with "*").
+
+    :return: (results, next_cursor) where next_cursor is None on the last page.
+    """
     base_url = "https://api.openalex.org/works"
     sort_param = "relevance_score:desc" if sort_by == "relevance" else "publication_date:desc"
 
     params = {
         "search": query,
         "per-page": limit,
-        "sort": sort_param
+        "sort": sort_param,
+        "cursor": cursor
     }
 
     try:
-        response = requests.get(base_url, params=params)
+        response = rate_limited_get(base_url, params=params)
         response.raise_for_status()
         data = response.json()
 
@@ -224,14 +341,20 @@ def search_openalex(query: str, sort_by: str = "relevance", limit: int = 10):
                 "url": work.get("id", "")
             })
 
-        return results
+        next_cursor = data.get("meta", {}).get("next_cursor")
+        return results, next_cursor if results else None
 
     except Exception as e:
         raise RuntimeError(f"OpenAlex search failed: {e}")
 
 
+def search_openalex(query: str, sort_by: str = "relevance", limit: int = 10):
+    return search_openalex_page(query, sort_by, limit)[0]
+
+
 
     
+@traced("search_agent.search_articles")
 def search_articles(source: str, query: str, sort_by: str = "relevance", limit: int = 10):
     if source == "semanticscholar":
         return search_semantic_scholar(query, sort_by, limit)
@@ -245,6 +368,74 @@ def search_articles(source: str, query: str, sort_by: str = "relevance", limit:
         raise ValueError("Source not supported.")
 
 
+# ---------------- Pagination ---------------- #
+# Each source pages differently; the position is wrapped in an opaque cursor
+# so callers never need to know whether it is an offset or a provider token.
+
+def encode_cursor(source: str, position) -> str:
+    payload = json.dumps({"source": source, "position": position}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(source: str, cursor: str):
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+    except (ValueError, UnicodeError):
+        raise ValueError("Invalid cursor.")
+    if payload.get("source") != source:
+        raise ValueError("Cursor does not belong to this source.")
+    return payload["position"]
+
+
+@traced("search_agent.search_articles_page")
+def search_articles_page(source: str, query: str, sort_by: str = "relevance", limit: int = 10, cursor: str = None) -> dict:
+    """
+    Fetch one page of results. Pass the returned `next_cursor` back to get the
+    following page; it is None once the source has no more results.
+    """
+    if source == "semanticscholar":
+        position = decode_cursor(source, cursor) if cursor else 0
+        results, next_position = search_semantic_scholar_page(query, sort_by, limit, position)
+    elif source == "arxiv":
+        position = decode_cursor(source, cursor) if cursor else 0
+        results, next_position = search_arxiv_page(query, limit, sort_by, position)
+    elif source == "pubmed":
+        position = decode_cursor(source, cursor) if cursor else 0
+        results, next_position = search_pubmed_page(query, sort_by, limit, position)
+    elif source == "openalex":
+        position = decode_cursor(source, cursor) if cursor else "*"
+        results, next_position = search_openalex_page(query, sort_by, limit, position)
+    else:
+        raise ValueError("Source not supported.")
+
+    return {
+        "results": results,
+        "next_cursor": encode_cursor(source, next_position) if next_position is not None else None
+    }
+
+
+def iter_search_results(source: str, query: str, sort_by: str = "relevance", page_size: int = 50, max_results: int = 1000):
+    """
+    Yield results one at a time, fetching page after page until `max_results`
+    or the end of the source. Only one page is held in memory at a time.
+    """
+    if source == "pubmed":
+        # One ESearch, then pipelined EFetch batches from the history server
+        yield from stream_pubmed(query, sort_by, max_results)
+        return
+
+    cursor, yielded = None, 0
+    while yielded < max_results:
+        page = search_articles_page(source, query, sort_by, min(page_size, max_results - yielded), cursor)
+        for result in page["results"]:
+            yield result
+            yielded += 1
+        cursor = page["next_cursor"]
+        if not cursor or not page["results"]:
+            break
+
+
+@traced("search_agent.search_paper_by_url")
 def search_paper_by_url(url: str) -> dict:
     """
     Search for an academic paper from its URL on Semantic Scholar or another site, and extract paper details.
@@ -254,25 +445,8 @@ def search_paper_by_url(url: str) -> dict:
     """
     
     try:
-        # Make a request to the paper's URL
-        response = requests.get(url)
-        response.raise_for_status()  # Raise an exception for HTTP errors
-        
-        # Use BeautifulSoup to parse the page content
-        soup = BeautifulSoup(response.content, 'html.parser')
-        
-        # Example: Extract title, authors, and abstract (Semantic Scholar's HTML structure may differ)
-        title = soup.find('h1', {'class': 'paper-title'}).get_text(strip=True) if soup.find('h1', {'class': 'paper-title'}) else 'No Title Found'
-        authors = [author.get_text(strip=True) for author in soup.find_all('a', {'class': 'author-name'})]
-        abstract = soup.find("meta", {"name": "description"}) or soup.find("div", {"class": "abstract"})
-        text = abstract.get("content") if abstract and "content" in abstract.attrs else abstract.get_text() if abstract else soup.get_text()
-        text = re.sub(r'\s+', ' ', text).strip()
-        return {
-            'title': title,
-            'url': url,
-            'authors': authors,
-            'abstract': text
-        }
+        content, final_url = fetch_html(url)
+        return extract_paper_metadata(content, final_url)
     
     except requests.exceptions.RequestException as e:
         print(f"Error during request to {url}: {e}")
@@ -280,5 +454,3 @@ def search_paper_by_url(url: str) -> dict:
     except Exception as e:
         print(f"Error extracting information from {url}: {e}")
         return {}
-    
-   
\ No newline at end of file
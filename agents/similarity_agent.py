@@ -0,0 +1,41 @@
+import numpy as np
+from typing import List
+from agents.classify_agent import sbert_model, SBERT_MODEL_NAME
+from utils.vector_index import VectorIndex
+from utils.embedding_cache import cached_encode
+from utils.tracing import traced
+
+# Shared index of every processed paper (text + summary embeddings)
+paper_index = VectorIndex(dim=sbert_model.get_sentence_embedding_dimension())
+
+
+def embed_paper(text: str, summary: str = "") -> np.ndarray:
+    """
+    Embed a paper as the normalized mean of its text and summary embeddings,
+    so both the full content and the condensed findings influence similarity.
+    """
+    parts = [part for part in (text, summary) if part and part.strip()]
+    embeddings = cached_encode(sbert_model, SBERT_MODEL_NAME, parts, normalize=True)
+    vector = embeddings.mean(axis=0)
+    return vector / (np.linalg.norm(vector) or 1.0)
+
+
+@traced("similarity_agent.index_paper")
+def index_paper(text: str, summary: str, metadata: dict) -> int:
+    """
+    Add a processed paper to the similarity index, replacing its earlier entry
+    when metadata["content_hash"] was indexed before. Returns its row id.
+    """
+    if not (text or "").strip():
+        return -1
+    record = {**metadata, "summary": (summary or "")[:500]}
+    return paper_index.add(embed_paper(text, summary), record, key=metadata.get("content_hash"))
+
+
+@traced("similarity_agent.find_similar_papers")
+def find_similar_papers(query: str, top_k: int = 10) -> List[dict]:
+    """Find previously processed papers most similar to a query text."""
+    if not query.strip():
+        return []
+    vector = cached_encode(sbert_model, SBERT_MODEL_NAME, [query], normalize=True)[0]
+    return paper_index.search(vector, top_k=top_k)
@@ -1,19 +1,23 @@
-from transformers import pipeline
+from typing import List
+from agents.generation_profiles import get_summarizer, generation_kwargs, split_text
+from utils.resource_governor import run_inference
+from utils.tracing import traced
 
-summarizer = pipeline("summarization", model="facebook/bart-large-cnn")
-
-def summarize(text: str, max_chunk_len: int = 1024) -> str:
-    chunks = [text[i:i + max_chunk_len] for i in range(0, len(text), max_chunk_len)]
+@traced("summarize_agent.summarize")
+def summarize(text: str, max_chunk_len: int = 1024, profile: str = "quality") -> str:
+    """
+    Summarize text chunk by chunk using a named generation profile
+    ('fast', 'balanced', 'quality' or 'long'; see agents/generation_profiles.py).
+    The long-context profile splits by its tokenizer's window instead.
+    """
+    summarizer = get_summarizer(profile)
+    settings = generation_kwargs(profile)
+    chunks = split_text(text, profile, max_chunk_len)
     all_summaries = []
 
     for i, chunk in enumerate(chunks):
         try:
-            result = summarizer(
-                chunk,
-                max_length=512,   # Increase summary length
-                min_length=150,   # Ensure it's not too short
-                do_sample=False
-            )
+            result = run_inference(summarizer, chunk, **settings)
             summary_text = result[0]['summary_text']
             all_summaries.append(summary_text)
         except Exception as e:
@@ -21,3 +25,32 @@ def summarize(text: str, max_chunk_len: int = 1024) -> str:
             continue
 
     return " ".join(all_summaries)
+
+
+@traced("summarize_agent.summarize_batch")
+def summarize_batch(texts: List[str], max_chunk_len: int = 1024, batch_size: int = 8, profile: str = "quality") -> List[str]:
+    """
+    Summarize several documents at once. Chunks from every document are sent
+    through the pipeline together so the model runs full batches instead of
+    one forward pass per chunk, then the chunk summaries are regrouped per document.
+    """
+    chunks, owners = [], []
+    for doc_idx, text in enumerate(texts):
+        for chunk in split_text(text, profile, max_chunk_len):
+            chunks.append(chunk)
+            owners.append(doc_idx)
+
+    if not chunks:
+        return ["" for _ in texts]
+
+    try:
+        results = run_inference(get_summarizer(profile), chunks, batch_size=batch_size, **generation_kwargs(profile))
+    except Exception as e:
+        print(f"[Batch Summarization Error] {e}, falling back to per-document summaries")
+        return [summarize(text, max_chunk_len, profile) for text in texts]
+
+    per_doc = [[] for _ in texts]
+    for doc_idx, result in zip(owners, results):
+        per_doc[doc_idx].append(result['summary_text'])
+
+    return [" ".join(summaries) for summaries in per_doc]
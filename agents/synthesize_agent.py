@@ -1,6 +1,8 @@
 import logging
 from typing import List
-from transformers import pipeline
+from agents.generation_profiles import get_summarizer, generation_kwargs, split_text
+from utils.resource_governor import run_inference
+from utils.tracing import traced
 
 # ---------------- Logging ---------------- #
 logging.basicConfig(level=logging.DEBUG)
@@ -10,21 +12,23 @@ logger = logging.getLogger(__name__)
 MAX_CHUNK_LENGTH = 1000  # Token/character length per chunk
 
 # ---------------- Local Summarizer ---------------- #
-# Uses local transformer summarization model
-summarizer = pipeline("summarization", model="facebook/bart-large-cnn")
+# Pipelines are shared per model through agents.generation_profiles
 
 # ---------------- Helper: Chunk and Summarize ---------------- #
-def summarize_text(text: str, max_chunk_length: int = MAX_CHUNK_LENGTH) -> str:
+@traced("synthesize_agent.summarize_text")
+def summarize_text(text: str, max_chunk_length: int = MAX_CHUNK_LENGTH, profile: str = "balanced") -> str:
     """
     Summarize a single long text using chunked approach.
     """
-    chunks = [text[i:i + max_chunk_length] for i in range(0, len(text), max_chunk_length)]
+    summarizer = get_summarizer(profile)
+    settings = generation_kwargs(profile)
+    chunks = split_text(text, profile, max_chunk_length)
     summaries = []
 
     for i, chunk in enumerate(chunks):
         try:
             logger.debug(f"Summarizing chunk {i + 1}/{len(chunks)}")
-            result = summarizer(chunk, max_length=150, min_length=40, do_sample=False)
+            result = run_inference(summarizer, chunk, **settings)
             summaries.append(result[0]["summary_text"])
         except Exception as e:
             logger.error(f"Chunk {i + 1} summarization failed: {str(e)}")
@@ -33,7 +37,8 @@ def summarize_text(text: str, max_chunk_length: int = MAX_CHUNK_LENGTH) -> str:
     return " ".join(summaries)
 
 # ---------------- Cross-Paper Synthesis ---------------- #
-def cross_paper_synthesis(paper_texts: List[str]) -> str:
+@traced("synthesize_agent.cross_paper_synthesis")
+def cross_paper_synthesis(paper_texts: List[str], profile: str = "balanced") -> str:
     """
     Performs cross-paper synthesis by summarizing multiple paper texts into a unified synthesis.
     """
@@ -42,13 +47,13 @@ def cross_paper_synthesis(paper_texts: List[str]) -> str:
 
     for idx, paper in enumerate(paper_texts):
         logger.info(f"Summarizing paper {idx + 1}")
-        summary = summarize_text(paper)
+        summary = summarize_text(paper, profile=profile)
         combined_summary.append(summary)
 
     try:
         final_input = " ".join(combined_summary)
         logger.info("Generating final combined synthesis...")
-        return summarize_text(final_input)  # Final mega-summary
+        return summarize_text(final_input, profile=profile)  # Final mega-summary
     except Exception as e:
         logger.error(f"Error in final synthesis: {str(e)}")
         return f"[Error in final synthesis: {str(e)}]"
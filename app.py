@@ -1,33 +1,52 @@
-from fastapi import FastAPI, UploadFile, File, HTTPException, Query
+from fastapi import FastAPI, UploadFile, File, Form, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
+from fastapi.responses import StreamingResponse, JSONResponse, Response
+from starlette.concurrency import run_in_threadpool, iterate_in_threadpool
 from pydantic import BaseModel
 from typing import Optional, List
 from pathlib import Path
-import tempfile
-import fitz  # PyMuPDF
+import asyncio
+import json
 import httpx
 import time
-import shutil
 import os
 import requests
 import re
-from bs4 import BeautifulSoup
+from utils.resource_governor import governor_stats  # first: sizes torch thread pools
+from utils.admission import admit, admission_stats, Overloaded
+from utils.tracing import span, extract
 from utils.helpers import search_paper_by_url
+from utils.crossref import get_work, get_works, normalize_doi
+from utils.corpus_store import content_hash, find_paper, save_paper, normalize_url
+from utils.html_extract import fetch_html, fetch_html_async, extract_text_from_html
+from utils.single_flight import single_flight, flight_key
+from utils.near_duplicate import text_signature
+from utils.artifact_store import put_artifact, get_json
+from utils.document import parse_pdf, parse_sections
+from utils.file_delivery import prepare_file_response, iter_file
+from tasks.celery_worker import celery, process_pdf_task
+from celery.result import AsyncResult
 from agents.cross_paper_synthesis import cross_paper_synthesis
 
 # Import agents
-from agents.classify_agent import classify_content
-from agents.summarize_agent import summarize
+from agents.classify_agent import classify_content, classify_contents
+from agents.summarize_agent import summarize, summarize_batch
 from agents.process_agent import extract_text_from_pdf ,extract_from_url,extract_from_doi,extract_text_from_txt
-from agents.audio_agent import generate_audio
-from agents.citation_agent import generate_citation
+from agents.audio_agent import queue_audio, queued_audio_text, stream_audio
+from agents.citation_agent import generate_citation, bulk_citations, CITATION_STYLES
+from agents.generation_profiles import resolve_profile, INTERACTIVE_PROFILE, BATCH_PROFILE
+from agents.similarity_agent import find_similar_papers
+from agents.paper_registry import (remember_paper, reusable, find_processed_paper,
+                                   stored_paper_response, stored_pdf_response)
+from agents.rerank_agent import rerank_results, merge_results
 from agents.search_agent import (
     search_semantic_scholar,
     search_arxiv,
     search_pubmed,
     search_openalex,
-    search_articles
+    search_articles,
+    search_articles_page,
+    iter_search_results
 )
 from agents.cross_paper_synthesis import cross_paper_synthesis
 
@@ -43,6 +62,35 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+
+@app.middleware("http")
+async def trace_requests(request: Request, call_next):
+    """
+    One span per request, parented to an incoming traceparent header. Spans
+    for agents, upstream HTTP calls, model calls and Celery tasks nest under it.
+    Streamed bodies are still being produced when the span closes.
+    """
+    with span(f"{request.method} {request.url.path}", parent=extract(request.headers.get("traceparent")),
+              method=request.method, path=request.url.path) as s:
+        response = await call_next(request)
+        if s is not None:
+            route = request.scope.get("route")
+            if route is not None:
+                s.name = f"{request.method} {route.path}"
+            s.set(status=response.status_code)
+            response.headers["X-Trace-Id"] = s.trace_id
+        return response
+
+
+@app.exception_handler(Overloaded)
+async def overloaded_handler(request, exc: Overloaded):
+    """Admission control refusals: 429/503 with a Retry-After hint."""
+    return JSONResponse(
+        status_code=exc.status_code,
+        content={"detail": exc.detail},
+        headers={"Retry-After": str(exc.retry_after)}
+    )
+
 # Directories for file handling
 UPLOAD_DIR = Path("uploads")
 SUMMARY_DIR = Path("summaries")
@@ -50,8 +98,8 @@ AUDIO_DIR = Path("audio")
 for directory in [UPLOAD_DIR, SUMMARY_DIR, AUDIO_DIR]:
     directory.mkdir(parents=True, exist_ok=True)
 
-# Mount audio for public access
-app.mount("/audio", StaticFiles(directory="audio"), name="audio")
+# Audio is served by the /audio routes below (range requests, ETags, caching)
+MAX_STREAM_TEXT = 5000  # characters accepted by /audio/stream
 
 
 # ----------------------------- MODELS -----------------------------
@@ -64,9 +112,225 @@ class SearchRequest(BaseModel):
 
 class URLRequest(BaseModel):
     url: str
+    profile: Optional[str] = None  # fast / balanced / quality
 
 class DOIRequest(BaseModel):
     doi: str
+    profile: Optional[str] = None
+
+class BatchRequest(BaseModel):
+    items: List[str]
+    max_concurrency: Optional[int] = 8
+    batch_size: Optional[int] = 8
+    profile: Optional[str] = None
+
+
+# ----------------------------- HELPERS -----------------------------
+
+MAX_BATCH_ITEMS = 500
+# After the first fetch of a round completes, wait this long for more so the
+# model pass gets a real batch instead of one document at a time
+BATCH_FLUSH_SECONDS = 0.2
+DOI_PATTERN = re.compile(r'^(?:https?://(?:dx\.)?doi\.org/|doi:)?(10\.\d{4,9}/\S+)$', re.IGNORECASE)
+
+
+def fetch_abstract_from_url(url: str) -> str:
+    """Fetch a landing page and return its extracted text, or "" on failure."""
+    try:
+        content, final_url = fetch_html(url)
+        return extract_text_from_html(content, final_url)
+    except (requests.RequestException, ValueError) as e:
+        print(f"⚠️ Could not fetch {url}: {e}")
+        return ""
+
+
+def is_processed(result: dict) -> bool:
+    """Whether a processing route produced a result rather than an explanatory error payload."""
+    return bool(result.get("category") or result.get("classification"))
+
+
+async def run_admitted(fn, *args, priority: str = "interactive"):
+    """Run blocking heavy work in the threadpool once admission control grants a slot."""
+    async with admit(priority):
+        return await run_in_threadpool(fn, *args)
+
+
+def parse_batch_item(item: str) -> tuple:
+    """Return ("doi", doi) or ("url", url) for a raw batch entry."""
+    item = item.strip()
+    match = DOI_PATTERN.match(item)
+    if match:
+        return "doi", normalize_doi(match.group(1))
+    if item.lower().startswith(("http://", "https://")):
+        return "url", item
+    raise ValueError("Item is neither a DOI nor an http(s) URL.")
+
+
+async def fetch_batch_item_text(client: httpx.AsyncClient, kind: str, value: str, records: dict) -> str:
+    """
+    Asynchronously fetch the text to process for one DOI or URL. DOI metadata
+    comes from `records`, which the caller resolved in bulk beforehand.
+    """
+    if kind == "doi":
+        data = records.get(value)
+        if not data:
+            raise ValueError("DOI not found or inaccessible.")
+        abstract = data.get("abstract")
+        if abstract:
+            return re.sub(r'<.*?>', '', abstract).strip()
+        value = data.get("URL", "")
+        if not value:
+            raise ValueError("No URL found in DOI metadata.")
+
+    content, final_url = await fetch_html_async(client, value)
+    text = extract_text_from_html(content, final_url)
+    if not text:
+        raise ValueError("No useful content found on this page.")
+    return text
+
+
+def run_agents_batch(entries: List[tuple], records: dict, profile: str) -> List[dict]:
+    """
+    Run classification and summarization over a group of fetched documents in
+    one batched model pass each, then audio and citation per document.
+    Documents that duplicate an already processed paper reuse its result.
+    """
+    results, fresh = [], []
+    for index, kind, value, text in entries:
+        # A DOI's text is its Crossref abstract when the record has one
+        is_abstract = kind == "doi" and bool((records.get(value) or {}).get("abstract"))
+        text_hash, signature = content_hash(text), text_signature(text, abstract=text if is_abstract else None)
+        stored = find_processed_paper(text_hash, signature, profile)
+        if stored:
+            save_paper({**stored, kind: value})
+            results.append({"index": index, "item": value, "type": kind, **stored_paper_response(stored)})
+        else:
+            fresh.append((index, kind, value, text, text_hash, signature))
+
+    texts = [text for _, _, _, text, _, _ in fresh]
+    categories = classify_contents(texts)
+    summaries = summarize_batch(texts, profile=profile) if texts else []
+
+    for (index, kind, value, text, text_hash, signature), category, summary in zip(fresh, categories, summaries):
+        audio_path = queue_audio(summary)
+        citation = generate_citation(value, source_type=kind, record=records.get(value))
+        remember_paper({
+            "content_hash": text_hash,
+            "source_type": kind,
+            kind: value,
+            "text": text,
+            "category": category,
+            "summary": summary,
+            "citation": citation,
+            "audio_path": audio_path,
+            "profile": profile
+        }, signature)
+        results.append({
+            "index": index,
+            "item": value,
+            "type": kind,
+            "text": text,
+            "category": category,
+            "summary": summary,
+            "audio_url": str(audio_path) if audio_path else None,
+            "citation": citation,
+            "profile": profile
+        })
+    return results
+
+
+async def process_batch_stream(items: List[str], max_concurrency: int, batch_size: int, profile: str):
+    """
+    Fetch all items concurrently (bounded by a semaphore) and, whenever some
+    fetches complete, push the ready documents through the agents in batches.
+    An item listed more than once (after DOI/URL normalization) is fetched
+    and processed once. Each finished item is yielded as one NDJSON line.
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    parsed = []
+    for item in items:
+        try:
+            parsed.append(parse_batch_item(item))
+        except ValueError as e:
+            parsed.append((None, str(e)))
+
+    # First index of each distinct item -> indices of its later repeats
+    repeats, first_index = {}, {}
+    for index, (kind, value) in enumerate(parsed):
+        if kind is None:
+            continue
+        key = (kind, normalize_url(value) if kind == "url" else value)
+        if key in first_index:
+            repeats[first_index[key]].append(index)
+        else:
+            first_index[key], repeats[index] = index, []
+
+    def lines(result: dict):
+        """NDJSON lines for a result and for every repeat of its item."""
+        yield json.dumps(result) + "\n"
+        for index in repeats.get(result["index"], []):
+            yield json.dumps({**result, "index": index, "item": parsed[index][1]}) + "\n"
+
+    # Papers processed before are answered straight from the corpus store
+    stored = {}
+    for index in repeats:
+        kind, value = parsed[index]
+        record = reusable(await run_in_threadpool(find_paper, **{kind: value}), profile)
+        if record:
+            stored[index] = record
+            for line in lines({"index": index, "item": value, "type": kind, **stored_paper_response(record)}):
+                yield line
+
+    dois = [parsed[index][1] for index in repeats if parsed[index][0] == "doi" and index not in stored]
+    records = await run_in_threadpool(get_works, dois) if dois else {}
+
+    async with httpx.AsyncClient() as client:
+        async def fetch(index: int, item: str, kind: str, value: str):
+            if kind is None:
+                return index, item, None, None, value
+            async with semaphore:
+                try:
+                    return index, value, kind, await fetch_batch_item_text(client, kind, value, records), None
+                except Exception as e:
+                    return index, value, kind, None, str(e)
+
+        pending = {
+            asyncio.create_task(fetch(i, item, kind, value))
+            for i, (item, (kind, value)) in enumerate(zip(items, parsed))
+            if (kind is None or i in repeats) and i not in stored
+        }
+        loop = asyncio.get_running_loop()
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            flush_at = loop.time() + BATCH_FLUSH_SECONDS
+            while pending and len(done) < batch_size and loop.time() < flush_at:
+                more, pending = await asyncio.wait(pending, timeout=flush_at - loop.time(),
+                                                   return_when=asyncio.FIRST_COMPLETED)
+                done |= more
+
+            ready = []
+            for task in done:
+                index, value, kind, text, error = task.result()
+                if error:
+                    for line in lines({"index": index, "item": value, "error": error}):
+                        yield line
+                else:
+                    ready.append((index, kind, value, text))
+
+            for start in range(0, len(ready), batch_size):
+                group = ready[start:start + batch_size]
+                try:
+                    # Already accepted, so batch groups wait behind interactive work rather than fail
+                    async with admit("batch", reject=False):
+                        results = await run_in_threadpool(run_agents_batch, group, records, profile)
+                    for result in results:
+                        for line in lines(result):
+                            yield line
+                except Exception as e:
+                    for index, _, value, _ in group:
+                        for line in lines({"index": index, "item": value, "error": f"Processing error: {e}"}):
+                            yield line
 
 
 # ----------------------------- ROUTES -----------------------------
@@ -77,16 +341,22 @@ def read_root():
 
 
 @app.post("/synthesize-papers/")
-async def synthesize_papers(files: List[UploadFile] = File(...)):
-    saved_paths = []
+async def synthesize_papers(files: List[UploadFile] = File(...), profile: Optional[str] = Query(None)):
+    try:
+        profile = resolve_profile(profile, "balanced")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
+    # Parsed in memory once; the synthesis agent works on the Documents directly
+    documents = []
     for file in files:
-        file_path = os.path.join(UPLOAD_DIR, file.filename)
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-        saved_paths.append(file_path)
+        try:
+            documents.append(await run_in_threadpool(parse_pdf, await file.read(), file.filename))
+        except Exception as e:
+            raise HTTPException(status_code=400, detail=f"❌ Could not read {file.filename}: {e}")
 
-    synthesis_result = cross_paper_synthesis(saved_paths)
+    async with admit("interactive"):
+        synthesis_result = await run_in_threadpool(cross_paper_synthesis, documents, profile)
     return {"synthesis": synthesis_result}
 
 
@@ -95,16 +365,23 @@ async def search_research_articles(
     source: str = Query(...),
     query: str = Query(...),
     sort_by: str = Query("relevance"),
-    limit: int = Query(10)
+    limit: int = Query(10),
+    cursor: Optional[str] = Query(None),
+    rerank: bool = Query(False, description="Re-sort the page by semantic similarity to the query")
 ):
     try:
-        results = search_articles(source, query, sort_by, limit)
+        # Providers are rate limited (arXiv: one call per 3 s), so waits happen in a worker thread
+        page = await run_in_threadpool(search_articles_page, source, query, sort_by, limit, cursor)
+        results = page["results"]
+        if rerank:
+            results = await run_in_threadpool(rerank_results, query, results)
         return {
             "source": source,
             "query": query,
             "sort_by": sort_by,
             "limit": limit,
-            "results": results
+            "results": results,
+            "next_cursor": page["next_cursor"]
         }
     except ValueError as ve:
         raise HTTPException(status_code=400, detail=str(ve))
@@ -112,65 +389,172 @@ async def search_research_articles(
         raise HTTPException(status_code=500, detail=f"Search failed: {str(e)}")
 
 
+@app.get("/search-articles/merged")
+async def search_merged_articles(
+    query: str = Query(...),
+    sources: str = Query("arxiv,semanticscholar,pubmed,openalex", description="Comma-separated sources"),
+    sort_by: str = Query("relevance"),
+    limit: int = Query(10, ge=1, le=50, description="Results per source"),
+    rerank: bool = Query(True)
+):
+    """
+    Query several sources concurrently and return one list: merged by
+    provider rank, with repeated titles dropped, then semantically reranked.
+    """
+    names = list(dict.fromkeys(name.strip().lower() for name in sources.split(",") if name.strip()))
+    if not names:
+        raise HTTPException(status_code=400, detail="No sources given.")
+
+    pages = await asyncio.gather(
+        *(run_in_threadpool(search_articles_page, name, query, sort_by, limit) for name in names),
+        return_exceptions=True
+    )
+    results_by_source, errors = {}, {}
+    for name, page in zip(names, pages):
+        if isinstance(page, ValueError):
+            raise HTTPException(status_code=400, detail=f"{name}: {page}")
+        if isinstance(page, Exception):
+            errors[name] = str(page)
+        else:
+            results_by_source[name] = page["results"]
 
-@app.post("/process-url")
-async def process_from_url(request: URLRequest):
-    url = request.url.strip()
-    print("🔗 Received URL:", url)
+    results = merge_results(results_by_source)
+    if rerank:
+        results = await run_in_threadpool(rerank_results, query, results)
+    return {"query": query, "sources": names, "results": results, "errors": errors}
 
-    headers = {
-        "User-Agent": (
-            "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-            "AppleWebKit/537.36 (KHTML, like Gecko) "
-            "Chrome/120.0.0.0 Safari/537.36"
+
+@app.get("/search-articles/stream")
+async def stream_research_articles(
+    source: str = Query(...),
+    query: str = Query(...),
+    sort_by: str = Query("relevance"),
+    page_size: int = Query(50, ge=1, le=200),
+    max_results: int = Query(1000, ge=1, le=10000)
+):
+    async def result_lines():
+        try:
+            results = iter_search_results(source, query, sort_by, page_size, max_results)
+            async for result in iterate_in_threadpool(results):
+                yield json.dumps(result) + "\n"
+        except Exception as e:
+            yield json.dumps({"error": f"Search failed: {str(e)}"}) + "\n"
+
+    return StreamingResponse(result_lines(), media_type="application/x-ndjson")
+
+
+@app.get("/audio/stream")
+async def stream_summary_audio(text: str = Query(..., min_length=1, max_length=MAX_STREAM_TEXT)):
+    """
+    Progressive MP3 for a summary: bytes are sent as each TTS segment is
+    synthesized, so playback starts before the whole file exists. The result
+    is saved under its content-addressed name for later /audio/{name} requests.
+    """
+    return StreamingResponse(
+        iterate_in_threadpool(stream_audio(text)),
+        media_type="audio/mpeg",
+        headers={"Cache-Control": "no-cache"}
+    )
+
+
+@app.api_route("/audio/{name}", methods=["GET", "HEAD"])
+async def get_audio(name: str, request: Request):
+    """
+    Generated audio with byte-range, ETag and cache-header support. Audio
+    queued by a processing route is streamed while it is synthesized on its
+    first request, then served from the saved file.
+    """
+    path = AUDIO_DIR / Path(name).name
+    if name != path.name or path.suffix != ".mp3":
+        raise HTTPException(status_code=404, detail="Audio not found.")
+    if not path.is_file():
+        text = await run_in_threadpool(queued_audio_text, path.name)
+        if text is None:
+            raise HTTPException(status_code=404, detail="Audio not found.")
+        if request.method == "HEAD":
+            return Response(headers={"Cache-Control": "no-cache"}, media_type="audio/mpeg")
+        return StreamingResponse(
+            iterate_in_threadpool(stream_audio(text)),
+            media_type="audio/mpeg",
+            headers={"Cache-Control": "no-cache"}
         )
-    }
 
+    status, headers, byte_range = prepare_file_response(
+        path,
+        range_header=request.headers.get("range"),
+        if_none_match=request.headers.get("if-none-match"),
+        if_range=request.headers.get("if-range")
+    )
+    if request.method == "HEAD" or byte_range is None:
+        return Response(status_code=status, headers=headers, media_type="audio/mpeg")
+    return StreamingResponse(
+        iterate_in_threadpool(iter_file(path, *byte_range)),
+        status_code=status,
+        headers=headers,
+        media_type="audio/mpeg"
+    )
+
+
+@app.get("/metrics")
+def metrics():
+    """Inference governor configuration and saturation for this worker process."""
+    return {"pid": os.getpid(), "inference": governor_stats(), "admission": admission_stats()}
+
+
+@app.get("/similar-papers")
+async def similar_papers(
+    query: str = Query(...),
+    top_k: int = Query(10, ge=1, le=100)
+):
     try:
-        response = requests.get(url, headers=headers, timeout=20, allow_redirects=True, verify=True)
-
-        if response.status_code >= 400:
-            return {"text": f"❌ Failed to fetch content. HTTP {response.status_code}"}
-
-        if "text/html" not in response.headers.get("Content-Type", ""):
-            return {"text": "⚠️ URL does not point to an HTML page."}
-
-        soup = BeautifulSoup(response.content, 'html.parser')
-
-        full_text_div = soup.find("div", class_="papercontent")
-        if full_text_div:
-            content = full_text_div.get_text(separator=" ", strip=True)
-        else:
-            meta = soup.find("meta", attrs={"name": "description"})
-            abstract_div = soup.find("div", class_=re.compile("abstract", re.IGNORECASE))
-            paragraphs = soup.find_all("p")
+        results = await run_in_threadpool(find_similar_papers, query, top_k)
+        return {"query": query, "top_k": top_k, "results": results}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Similarity search failed: {str(e)}")
 
-            content_parts = []
-            if meta and meta.get("content"):
-                content_parts.append(meta.get("content"))
-            if abstract_div:
-                content_parts.append(abstract_div.get_text(separator=" ", strip=True))
-            if paragraphs:
-                content_parts.append(" ".join(p.get_text(strip=True) for p in paragraphs[:5]))
 
-            content = " ".join(content_parts)
+def process_url_request(url: str, profile: str) -> dict:
+    """Fetch, extract and run the agents for one URL (blocking; runs in a worker thread)."""
+    try:
+        try:
+            content, final_url = fetch_html(url)
+        except ValueError as e:
+            return {"text": str(e)}
 
-        clean_text = re.sub(r'\s+', ' ', content).strip()
+        clean_text = extract_text_from_html(content, final_url)
         if not clean_text:
             return {"text": "ℹ️ No useful content found on this page."}
 
+        text_hash, signature = content_hash(clean_text), text_signature(clean_text)
+        stored = find_processed_paper(text_hash, signature, profile)
+        if stored:
+            save_paper({**stored, "url": url})
+            return stored_paper_response(stored)
+
         # 🔍 Agents work
         category = classify_content(clean_text)
-        summary = summarize(clean_text)
-        audio_url = generate_audio(summary)
+        summary = summarize(clean_text, profile=profile)
+        audio_url = queue_audio(summary)
         citation = generate_citation(url, source_type="url")  # ✅ only one argument
+        remember_paper({
+            "content_hash": text_hash,
+            "source_type": "url",
+            "url": url,
+            "text": clean_text,
+            "category": category,
+            "summary": summary,
+            "citation": citation,
+            "audio_path": audio_url,
+            "profile": profile
+        }, signature)
 
         return {
             "text": clean_text,
             "category": category,
             "summary": summary,
             "audio_url": audio_url,
-            "citation": citation
+            "citation": citation,
+            "profile": profile
         }
 
     except Exception as e:
@@ -179,69 +563,144 @@ async def process_from_url(request: URLRequest):
         return {"text": f"⚠️ Error occurred while processing: {str(e)}"}
 
 
-@app.post("/upload-pdf/")
-async def upload_pdf(file: UploadFile = File(...)):
-    start_time = time.time()
-
+@app.post("/process-url")
+async def process_from_url(request: URLRequest):
+    url = request.url.strip()
+    print("🔗 Received URL:", url)
     try:
-        # Save uploaded file temporarily
-        temp_file = tempfile.NamedTemporaryFile(delete=False)
-        temp_file.write(await file.read())
-        temp_file.close()
-
-        pdf_path = Path(temp_file.name)
-        print(f"📄 PDF saved at {pdf_path}")
-
-        # Extract text
-        print("📖 Extracting text from PDF...")
-        extracted_text = extract_text_from_pdf(str(pdf_path))
-
-        if not extracted_text.strip():
-            raise HTTPException(status_code=400, detail="❌ Could not extract text from the PDF.")
-
-        # Run your agents
-        print("🏷 Classifying...")
-        classification = classify_content(extracted_text)
-
-        print("📝 Summarizing...")
-        summary = summarize(extracted_text)
-
-        print("📚 Generating citation...")
-        citation = generate_citation(pdf_path, source_type="pdf")
+        profile = resolve_profile(request.profile, INTERACTIVE_PROFILE)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    stored = reusable(find_paper(url=url), profile)
+    if stored:
+        return stored_paper_response(stored)
+
+    # Concurrent requests for the same URL and profile share one computation
+    return await single_flight(
+        flight_key("url", normalize_url(url), profile=profile),
+        lambda: run_admitted(process_url_request, url, profile),
+        cacheable=is_processed
+    )
+
+
+def process_pdf_upload(file_bytes: bytes, filename: str, pdf_hash: str, start_time: float, profile: str,
+                       sections: Optional[List[str]] = None) -> dict:
+    """
+    Extract and run the agents for one uploaded PDF (blocking; runs in a worker thread).
+    Only the requested sections are summarized; by default everything except
+    front matter, acknowledgments, references and appendices.
+    """
+    # Parsed once from memory; every agent below reads this Document
+    print("📖 Parsing PDF...")
+    try:
+        document = parse_pdf(file_bytes, filename)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"❌ Could not read the PDF: {e}")
+    extracted_text = document.text
+
+    if not extracted_text.strip():
+        raise HTTPException(status_code=400, detail="❌ Could not extract text from the PDF.")
+
+    # Same paper uploaded from another source (arXiv vs publisher PDF)
+    signature = text_signature(extracted_text, abstract=document.abstract_text())
+    stored = find_processed_paper(pdf_hash, signature, profile) if not sections else None
+    if stored:
+        save_paper({**stored, "filename": filename})
+        return stored_pdf_response(stored)
+
+    selected_text = document.select_text(sections)
+    print(f"📑 Sections: {', '.join(document.section_kinds())} "
+          f"({len(selected_text)}/{len(extracted_text)} chars selected)")
+
+    # Run your agents
+    print("🏷 Classifying...")
+    classification = classify_content(selected_text)
+
+    print("📝 Summarizing...")
+    summary = summarize(selected_text, profile=profile)
+
+    print("📚 Generating citation...")
+    citation = generate_citation(filename, source_type="pdf", document=document)
+
+    audio_path = queue_audio(summary)  # synthesized while /audio/{name} streams it
+
+    # The stored summary answers default requests, so section-specific ones aren't saved
+    if not sections:
+        remember_paper({
+            "content_hash": pdf_hash,
+            "source_type": "pdf",
+            "filename": filename,
+            "text": extracted_text,
+            "category": classification,
+            "summary": summary,
+            "citation": citation,
+            "audio_path": audio_path,
+            "profile": profile
+        }, signature)
+
+    elapsed = round(time.time() - start_time, 2)
+
+    return {
+        "classification": classification,
+        "summary": summary,
+        "citations": citation,
+        "audio_file": audio_path.name if audio_path else None,
+        "message": f"✅ PDF processed successfully in {elapsed} seconds!",
+        "profile": profile,
+        "sections": document.section_kinds(),
+        "summarized_chars": len(selected_text),
+        "total_chars": len(extracted_text)
+    }
 
-        print("🎧 Generating audio...")
-        audio_path = generate_audio(summary, f"{file.filename}_summary.mp3")
-        if audio_path is None:
-            raise HTTPException(status_code=500, detail="❌ Audio generation failed.")
 
-        elapsed = round(time.time() - start_time, 2)
+@app.post("/upload-pdf/")
+async def upload_pdf(
+    file: UploadFile = File(...),
+    profile: Optional[str] = Query(None),
+    sections: Optional[str] = Query(None, description="Comma-separated sections to summarize, e.g. abstract,results")
+):
+    start_time = time.time()
+    try:
+        profile = resolve_profile(profile, INTERACTIVE_PROFILE)
+        sections = parse_sections(sections)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-        return {
-            "classification": classification,
-            "summary": summary,
-            "citations": citation,
-            "audio_file": audio_path.name,
-            "message": f"✅ PDF processed successfully in {elapsed} seconds!"
-        }
+    try:
+        file_bytes = await file.read()
+        pdf_hash = content_hash(file_bytes)
+
+        stored = reusable(find_paper(content_hash=pdf_hash), profile) if not sections else None
+        if stored:
+            return stored_pdf_response(stored)
+
+        # Identical uploads in flight share one computation
+        return await single_flight(
+            flight_key("pdf", pdf_hash, profile=profile, sections=sections),
+            lambda: run_admitted(process_pdf_upload, file_bytes, file.filename, pdf_hash, start_time, profile, sections),
+            cacheable=is_processed
+        )
 
+    except (HTTPException, Overloaded):
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"PDF processing error: {e}")
-@app.post("/process-doi")
-async def process_doi(request: DOIRequest):
-    doi = request.doi.strip()
-    crossref_url = f"https://api.crossref.org/works/{doi}"
 
+
+def process_doi_request(doi: str, profile: str) -> dict:
+    """Resolve, extract and run the agents for one DOI (blocking; runs in a worker thread)."""
     try:
-        response = requests.get(crossref_url, timeout=15)
-        if response.status_code != 200:
+        # Fetched once (or served from cache) and shared with the citation agent
+        data = get_work(doi)
+        if not data:
             raise HTTPException(status_code=404, detail="DOI not found or inaccessible.")
 
-        data = response.json()["message"]
-
         # Extract raw abstract or fallback content
         abstract = data.get("abstract")
         if abstract:
             clean_text = re.sub(r'<.*?>', '', abstract).strip()
+            signature = text_signature(clean_text, abstract=clean_text)
         else:
             url = data.get("URL", "")
             if not url:
@@ -249,22 +708,163 @@ async def process_doi(request: DOIRequest):
             clean_text = fetch_abstract_from_url(url)
             if not clean_text:
                 raise HTTPException(status_code=404, detail="Could not extract abstract or content.")
+            signature = text_signature(clean_text)
+
+        text_hash = content_hash(clean_text)
+        stored = find_processed_paper(text_hash, signature, profile)
+        if stored:
+            save_paper({**stored, "doi": doi})
+            return stored_paper_response(stored)
 
         # Run agents
         category = classify_content(clean_text)
-        summary = summarize(clean_text)
-        audio_url = generate_audio(summary)
-        citation = generate_citation(source=doi, source_type="doi")  # for DOIs
+        summary = summarize(clean_text, profile=profile)
+        audio_url = queue_audio(summary)
+        citation = generate_citation(source=doi, source_type="doi", record=data)
+        remember_paper({
+            "content_hash": text_hash,
+            "source_type": "doi",
+            "doi": doi,
+            "text": clean_text,
+            "category": category,
+            "summary": summary,
+            "citation": citation,
+            "audio_path": audio_url,
+            "profile": profile
+        }, signature)
 
         return {
             "text": clean_text,
             "category": category,
             "summary": summary,
             "audio_url": audio_url,
-            "citation": citation
+            "citation": citation,
+            "profile": profile
         }
 
     except Exception as e:
         import traceback
         traceback.print_exc()
-        raise HTTPException(status_code=500, detail=f"Processing error: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Processing error: {str(e)}")
+
+
+@app.post("/process-doi")
+async def process_doi(request: DOIRequest):
+    doi = normalize_doi(request.doi)
+    try:
+        profile = resolve_profile(request.profile, INTERACTIVE_PROFILE)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    stored = reusable(find_paper(doi=doi), profile)
+    if stored:
+        return stored_paper_response(stored)
+
+    # Concurrent requests for the same DOI and profile share one computation
+    return await single_flight(
+        flight_key("doi", doi, profile=profile),
+        lambda: run_admitted(process_doi_request, doi, profile),
+        cacheable=is_processed
+    )
+
+
+@app.post("/process-batch")
+async def process_batch(request: BatchRequest):
+    items = [item for item in request.items if item and item.strip()]
+    if not items:
+        raise HTTPException(status_code=400, detail="No DOIs or URLs provided.")
+    if len(items) > MAX_BATCH_ITEMS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_ITEMS} items per batch.")
+
+    max_concurrency = min(max(request.max_concurrency or 1, 1), 32)
+    batch_size = min(max(request.batch_size or 1, 1), 32)
+    try:
+        profile = resolve_profile(request.profile, BATCH_PROFILE)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return StreamingResponse(
+        process_batch_stream(items, max_concurrency, batch_size, profile),
+        media_type="application/x-ndjson"
+    )
+
+
+@app.post("/citations/export")
+async def export_citations(
+    items: str = Form("", description="DOIs and URLs, one per line"),
+    files: List[UploadFile] = File(default=[]),
+    style: str = Query("apa", description="apa, mla, ieee or bibtex")
+):
+    """
+    Resolve a bibliography of DOIs, URLs and PDFs and stream it back as a
+    downloadable file, one entry per input in the order given.
+    """
+    style = style.lower()
+    if style not in CITATION_STYLES:
+        raise HTTPException(status_code=400, detail=f"Unknown style '{style}'. Use one of: {', '.join(CITATION_STYLES)}.")
+    lines = [line.strip() for line in items.splitlines() if line.strip()]
+    if not lines and not files:
+        raise HTTPException(status_code=400, detail="No DOIs, URLs or PDFs provided.")
+    if len(lines) + len(files) > MAX_BATCH_ITEMS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_ITEMS} entries per export.")
+
+    documents = []
+    for file in files:
+        try:
+            documents.append(await run_in_threadpool(parse_pdf, await file.read(), file.filename))
+        except Exception as e:
+            raise HTTPException(status_code=400, detail=f"❌ Could not read {file.filename}: {e}")
+
+    separator = "\n" if style == "bibtex" else "\n\n"
+    entries = iterate_in_threadpool(bulk_citations(lines, style, documents))
+    filename = "bibliography.bib" if style == "bibtex" else f"bibliography-{style}.txt"
+
+    async def body():
+        async for entry in entries:
+            yield entry + separator
+
+    return StreamingResponse(
+        body(),
+        media_type="application/x-bibtex" if style == "bibtex" else "text/plain; charset=utf-8",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+
+@app.post("/jobs/upload-pdf")
+async def enqueue_pdf(
+    file: UploadFile = File(...),
+    profile: Optional[str] = Query(None),
+    sections: Optional[str] = Query(None, description="Comma-separated sections to summarize, e.g. abstract,results")
+):
+    """
+    Queue a PDF for processing on the Celery model workers. The PDF is written
+    once to the artifact store and the task receives only its reference.
+    """
+    try:
+        profile = resolve_profile(profile, BATCH_PROFILE)
+        sections = parse_sections(sections)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    file_bytes = await file.read()
+    stored = reusable(find_paper(content_hash=content_hash(file_bytes)), profile) if not sections else None
+    if stored:
+        return stored_pdf_response(stored)
+
+    pdf_ref = await run_in_threadpool(put_artifact, file_bytes)
+    task = process_pdf_task.delay(pdf_ref, file.filename, profile, sections)
+    return {"task_id": task.id, "status": "queued", "profile": profile}
+
+
+@app.get("/jobs/{task_id}")
+async def get_job(task_id: str):
+    result = AsyncResult(task_id, app=celery)
+    if result.failed():
+        raise HTTPException(status_code=500, detail=f"Job failed: {result.result}")
+    if not result.successful():
+        return {"task_id": task_id, "status": result.state.lower()}
+    try:
+        output = await run_in_threadpool(get_json, result.result)
+    except KeyError:
+        raise HTTPException(status_code=410, detail="❌ Job result has expired.")
+    return {"task_id": task_id, "status": "done", **output}
@@ -0,0 +1,102 @@
+"""
+Benchmark generation profiles (fast / balanced / quality).
+
+Summarizes every chunk of the benchmark corpus with each profile and reports
+median and p95 latency per chunk, plus ROUGE-L F1 of each profile's output
+against the quality profile's output for the same chunk. The corpus is the
+saved pages in benchmarks/fixtures/html plus any PDFs passed with --pdfs.
+
+    python -m benchmarks.bench_generation_profiles --pdfs uploads/
+"""
+import time
+import argparse
+from pathlib import Path
+from statistics import median
+from agents.generation_profiles import GENERATION_PROFILES, get_summarizer, generation_kwargs
+from utils.html_extract import extract_text_from_html
+
+HTML_FIXTURES = Path(__file__).parent / "fixtures" / "html"
+
+
+def load_corpus(pdf_dir: Path = None) -> list:
+    """Extracted text for every HTML fixture and PDF in the corpus."""
+    texts = [extract_text_from_html(path.read_bytes()) for path in sorted(HTML_FIXTURES.glob("*.html"))]
+    if pdf_dir:
+        import fitz  # PyMuPDF, only needed when PDFs are benchmarked
+        for path in sorted(pdf_dir.glob("*.pdf")):
+            with fitz.open(path) as doc:
+                texts.append(" ".join(page.get_text() for page in doc))
+    return [t for t in texts if t.strip()]
+
+
+def rouge_l(candidate: str, reference: str) -> float:
+    """ROUGE-L F1 over whitespace tokens (longest common subsequence)."""
+    a, b = candidate.lower().split(), reference.lower().split()
+    if not a or not b:
+        return 0.0
+    previous = [0] * (len(b) + 1)
+    for token in a:
+        current = [0]
+        for j, other in enumerate(b):
+            current.append(previous[j] + 1 if token == other else max(previous[j + 1], current[j]))
+        previous = current
+    lcs = previous[-1]
+    if lcs == 0:
+        return 0.0
+    precision, recall = lcs / len(a), lcs / len(b)
+    return 2 * precision * recall / (precision + recall)
+
+
+def run_profile(profile: str, chunks: list) -> tuple:
+    """Per-chunk latencies in seconds and the generated summaries."""
+    summarizer = get_summarizer(profile)
+    summarizer(chunks[0], **generation_kwargs(profile))  # warm-up, excluded from timings
+    latencies, outputs = [], []
+    for chunk in chunks:
+        start = time.perf_counter()
+        result = summarizer(chunk, **generation_kwargs(profile))
+        latencies.append(time.perf_counter() - start)
+        outputs.append(result[0]["summary_text"])
+    return latencies, outputs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pdfs", type=Path, default=None, help="directory of PDFs to add to the corpus")
+    parser.add_argument("--max-chunks", type=int, default=40)
+    parser.add_argument("--chunk-len", type=int, default=1024)
+    parser.add_argument("--markdown", action="store_true", help="print the results as a README table")
+    args = parser.parse_args()
+
+    # Same fixed-width chunking summarize() applies
+    chunks = [text[i:i + args.chunk_len] for text in load_corpus(args.pdfs) for i in range(0, len(text), args.chunk_len)]
+    chunks = chunks[:args.max_chunks]
+    if not chunks:
+        print("❌ No text found in the benchmark corpus.")
+        return
+    print(f"📚 {len(chunks)} chunks\n")
+
+    # Long-context profiles are compared separately, see bench_long_context
+    profiles = [p for p, settings in GENERATION_PROFILES.items() if "chunk_chars" not in settings]
+    results = {profile: run_profile(profile, chunks) for profile in profiles}
+    reference = results["quality"][1]
+
+    if args.markdown:
+        print("| Profile | Model | Beams | Median s / chunk | p95 s / chunk | ROUGE-L vs `quality` |")
+        print("|---|---|---|---|---|---|")
+    else:
+        print(f"{'profile':<10}{'model':<32}{'beams':>6}{'median s':>10}{'p95 s':>8}{'ROUGE-L':>9}")
+    for profile, (latencies, outputs) in results.items():
+        settings = GENERATION_PROFILES[profile]
+        p95 = sorted(latencies)[max(0, int(len(latencies) * 0.95) - 1)]
+        rouge = sum(rouge_l(o, r) for o, r in zip(outputs, reference)) / len(outputs)
+        if args.markdown:
+            print(f"| `{profile}` | `{settings['model']}` | {settings['num_beams']} | {median(latencies):.2f} "
+                  f"| {p95:.2f} | {rouge:.3f} |")
+        else:
+            print(f"{profile:<10}{settings['model']:<32}{settings['num_beams']:>6}"
+                  f"{median(latencies):>10.2f}{p95:>8.2f}{rouge:>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Benchmark HTML content extraction for /process-url.
+
+Compares the previous BeautifulSoup `html.parser` extraction against
+utils.html_extract over saved pages in benchmarks/fixtures/html. Drop more
+saved pages into that directory (or pass --fixtures) to extend the corpus.
+
+    python -m benchmarks.bench_html_extract --repeat 50
+"""
+import re
+import time
+import argparse
+from pathlib import Path
+from statistics import median
+from bs4 import BeautifulSoup
+from utils.html_extract import extract_text_from_html
+
+FIXTURE_DIR = Path(__file__).parent / "fixtures" / "html"
+
+# Page URLs so the site-specific extractors are exercised
+FIXTURE_URLS = {
+    "arxiv_abs.html": "https://arxiv.org/abs/2401.00001",
+    "pubmed_article.html": "https://pubmed.ncbi.nlm.nih.gov/12345678/",
+    "publisher_landing.html": "https://www.example-publisher.com/doi/10.1234/example.5678",
+    "generic_paper.html": "https://example.org/papers/42",
+    "aspnet_publisher.html": "https://www.jar-journal.org/Article.aspx?articleid=2837461",
+    "html5_article.html": "https://letters.example.org/a/2024.0117",
+}
+
+# A sentence from each page's abstract that the extracted text must contain.
+# aspnet_publisher and html5_article follow real publisher templates: an
+# ASP.NET page wrapped in one <form>, and an HTML5 <article><header> holding
+# the title and abstract, with no description meta tags to fall back on.
+EXPECTED_PHRASES = {
+    "aspnet_publisher.html": "Conservation tillage is widely promoted",
+    "html5_article.html": "Discharge summaries and progress notes",
+}
+
+
+def baseline_extract(content: bytes) -> str:
+    """The extraction /process-url used before utils.html_extract."""
+    soup = BeautifulSoup(content, 'html.parser')
+
+    full_text_div = soup.find("div", class_="papercontent")
+    if full_text_div:
+        text = full_text_div.get_text(separator=" ", strip=True)
+    else:
+        meta = soup.find("meta", attrs={"name": "description"})
+        abstract_div = soup.find("div", class_=re.compile("abstract", re.IGNORECASE))
+        paragraphs = soup.find_all("p")
+
+        content_parts = []
+        if meta and meta.get("content"):
+            content_parts.append(meta.get("content"))
+        if abstract_div:
+            content_parts.append(abstract_div.get_text(separator=" ", strip=True))
+        if paragraphs:
+            content_parts.append(" ".join(p.get_text(strip=True) for p in paragraphs[:5]))
+        text = " ".join(content_parts)
+
+    return re.sub(r'\s+', ' ', text).strip()
+
+
+def time_call(fn, repeat: int) -> float:
+    """Median wall time in milliseconds."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fixtures", type=Path, default=FIXTURE_DIR)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'fixture':<28}{'KB':>8}{'baseline ms':>14}{'lxml ms':>10}{'speedup':>9}{'chars':>8}{'abstract':>10}")
+    totals = [0.0, 0.0]
+    for path in sorted(args.fixtures.glob("*.html")):
+        content = path.read_bytes()
+        url = FIXTURE_URLS.get(path.name)
+        baseline_ms = time_call(lambda: baseline_extract(content), args.repeat)
+        new_ms = time_call(lambda: extract_text_from_html(content, url), args.repeat)
+        totals[0] += baseline_ms
+        totals[1] += new_ms
+        text = extract_text_from_html(content, url)
+        expected = EXPECTED_PHRASES.get(path.name)
+        found = "-" if expected is None else ("ok" if expected in text else "MISSING")
+        print(f"{path.name:<28}{len(content) / 1024:>8.1f}{baseline_ms:>14.2f}{new_ms:>10.2f}"
+              f"{baseline_ms / new_ms:>8.1f}x{len(text):>8}{found:>10}")
+
+    if totals[1]:
+        print(f"{'total':<28}{'':>8}{totals[0]:>14.2f}{totals[1]:>10.2f}{totals[0] / totals[1]:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Benchmark the long-context (LED) summarizer against chunked BART.
+
+Summarizes every document of the benchmark corpus end to end with summarize()
+under each profile and reports model passes, CPU wall time per document and
+peak resident memory. Each profile runs in its own subprocess so peak memory
+is measured per model. The corpus is the saved pages in
+benchmarks/fixtures/html plus any PDFs passed with --pdfs.
+
+    python -m benchmarks.bench_long_context --pdfs uploads/
+    python -m benchmarks.bench_long_context --profiles balanced,long
+"""
+import sys
+import json
+import time
+import resource
+import argparse
+import subprocess
+from pathlib import Path
+from statistics import median
+from benchmarks.bench_generation_profiles import load_corpus, rouge_l
+
+
+def run_worker(profile: str, pdf_dir: Path, max_docs: int) -> dict:
+    """Summarize the corpus with one profile in this process; timings exclude model loading."""
+    from agents.generation_profiles import get_summarizer, split_text
+    from agents.summarize_agent import summarize
+
+    documents = load_corpus(pdf_dir)[:max_docs]
+    start = time.perf_counter()
+    get_summarizer(profile)
+    load_s = time.perf_counter() - start
+
+    latencies, outputs, passes = [], [], 0
+    for text in documents:
+        passes += len(split_text(text, profile))
+        start = time.perf_counter()
+        outputs.append(summarize(text, profile=profile))
+        latencies.append(time.perf_counter() - start)
+
+    return {
+        "profile": profile,
+        "documents": len(documents),
+        "passes": passes,
+        "load_s": load_s,
+        "latencies": latencies,
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,  # KiB on Linux
+        "outputs": outputs,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pdfs", type=Path, default=None, help="directory of PDFs to add to the corpus")
+    parser.add_argument("--profiles", default="quality,long", help="comma-separated profiles; the first is the reference")
+    parser.add_argument("--max-docs", type=int, default=10)
+    parser.add_argument("--worker", default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_worker(args.worker, args.pdfs, args.max_docs)))
+        return
+
+    results = []
+    for profile in args.profiles.split(","):
+        command = [sys.executable, "-m", "benchmarks.bench_long_context", "--worker", profile,
+                   "--max-docs", str(args.max_docs)]
+        if args.pdfs:
+            command += ["--pdfs", str(args.pdfs)]
+        print(f"⏳ Running {profile}...")
+        completed = subprocess.run(command, capture_output=True, text=True)
+        if completed.returncode != 0:
+            print(f"❌ {profile} failed:\n{completed.stderr[-2000:]}")
+            return
+        results.append(json.loads(completed.stdout.strip().splitlines()[-1]))
+
+    if not results[0]["documents"]:
+        print("❌ No text found in the benchmark corpus.")
+        return
+    reference = results[0]["outputs"]
+
+    print(f"\n📚 {results[0]['documents']} documents\n")
+    print(f"{'profile':<10}{'passes':>8}{'load s':>8}{'total s':>9}{'median s/doc':>14}{'peak RSS MB':>13}"
+          f"{'ROUGE-L':>9}")
+    for result in results:
+        latencies = result["latencies"]
+        rouge = sum(rouge_l(o, r) for o, r in zip(result["outputs"], reference)) / len(reference)
+        print(f"{result['profile']:<10}{result['passes']:>8}{result['load_s']:>8.1f}{sum(latencies):>9.1f}"
+              f"{median(latencies):>14.2f}{result['peak_rss_mb']:>13.0f}{rouge:>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
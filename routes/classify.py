@@ -10,7 +10,7 @@ class ClassificationRequest(BaseModel):
     top_k: int = 3
 
 @router.post("/classify-topics")
-async def classify_text(request: ClassificationRequest):
+def classify_text(request: ClassificationRequest):
     try:
         result = classify_content_with_topics(
             text=request.text,
@@ -0,0 +1,254 @@
+import os
+import json
+import streamlit as st
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+API_BASE = os.getenv("API_BASE", "http://127.0.0.1:8000")
+
+SOURCES = ["arxiv", "pubmed", "semanticscholar", "openalex"]
+SORT_OPTIONS = ["relevance", "recency"]
+PROFILES = ["fast", "balanced", "quality", "long"]
+
+SEARCH_TTL = 10 * 60       # search results go stale quickly
+PROCESS_TTL = 24 * 3600    # processed papers don't change
+
+st.set_page_config(page_title="📚 Multi-Source Research Tool", layout="wide")
+
+
+class ApiError(Exception):
+    """Failed API call. Raised inside cached calls so failures are never cached."""
+
+
+# ---------------- API client ---------------- #
+@st.cache_resource
+def get_session() -> requests.Session:
+    """One pooled session per server process, shared by every rerun and user."""
+    session = requests.Session()
+    retry = Retry(total=2, connect=2, backoff_factor=0.5, status_forcelist=[502, 504], allowed_methods=["GET"])
+    adapter = HTTPAdapter(pool_connections=8, pool_maxsize=32, max_retries=retry)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def check(response: requests.Response) -> dict:
+    if response.status_code == 200:
+        return response.json()
+    try:
+        detail = response.json().get("detail", response.text)
+    except ValueError:
+        detail = response.text
+    if response.status_code in (429, 503):
+        detail = f"{detail} Retry in {response.headers.get('Retry-After', 'a few')} seconds."
+    raise ApiError(f"{response.status_code}: {detail}")
+
+
+def check_paper(response: requests.Response) -> dict:
+    """
+    Like check(), for the processing routes: some failures (unreachable page,
+    no extractable text) come back as 200 with only an explanatory "text", and
+    must not be cached as if they were results.
+    """
+    data = check(response)
+    if not (data.get("category") or data.get("classification")):
+        raise ApiError(data.get("text") or "Processing failed.")
+    return data
+
+
+@st.cache_data(ttl=SEARCH_TTL, show_spinner=False)
+def search_articles(source: str, query: str, sort_by: str, limit: int) -> list:
+    params = {"source": source, "query": query, "sort_by": sort_by, "limit": limit}
+    return check(get_session().get(f"{API_BASE}/search-articles", params=params, timeout=60))["results"]
+
+
+@st.cache_data(ttl=SEARCH_TTL, show_spinner=False)
+def search_merged(sources: tuple, query: str, sort_by: str, limit: int) -> dict:
+    params = {"sources": ",".join(sources), "query": query, "sort_by": sort_by, "limit": limit, "rerank": True}
+    return check(get_session().get(f"{API_BASE}/search-articles/merged", params=params, timeout=120))
+
+
+@st.cache_data(ttl=PROCESS_TTL, show_spinner=False)
+def process_url(url: str, profile: str) -> dict:
+    return check_paper(get_session().post(f"{API_BASE}/process-url", json={"url": url, "profile": profile}, timeout=600))
+
+
+@st.cache_data(ttl=PROCESS_TTL, show_spinner=False)
+def process_doi(doi: str, profile: str) -> dict:
+    return check_paper(get_session().post(f"{API_BASE}/process-doi", json={"doi": doi, "profile": profile}, timeout=600))
+
+
+@st.cache_data(ttl=PROCESS_TTL, show_spinner=False)
+def process_pdf(filename: str, data: bytes, profile: str) -> dict:
+    """Cached on the file bytes, so re-uploading the same PDF is instant."""
+    files = {"file": (filename, data, "application/pdf")}
+    return check_paper(get_session().post(f"{API_BASE}/upload-pdf/", files=files, params={"profile": profile},
+                                          timeout=600))
+
+
+@st.cache_data(ttl=PROCESS_TTL, show_spinner=False)
+def synthesize_papers(uploads: tuple, profile: str) -> str:
+    files = [("files", (name, data, "application/pdf")) for name, data in uploads]
+    synthesis = check(get_session().post(f"{API_BASE}/synthesize-papers/", files=files,
+                                         params={"profile": profile}, timeout=1800))["synthesis"]
+    if synthesis.startswith("❌"):  # synthesis failures are reported in the text
+        raise ApiError(synthesis)
+    return synthesis
+
+
+def stream_batch(items: list, profile: str):
+    """Yield /process-batch results as the API streams them (not cached: results arrive incrementally)."""
+    with get_session().post(f"{API_BASE}/process-batch", json={"items": items, "profile": profile},
+                            stream=True, timeout=3600) as response:
+        if response.status_code != 200:
+            check(response)
+        for line in response.iter_lines():
+            if line:
+                yield json.loads(line)
+
+
+# ---------------- Rendering ---------------- #
+def show_article(idx: int, article: dict) -> None:
+    st.markdown(f"**{idx}. {article.get('title', 'No Title')}**")
+    if article.get("source"):
+        score = article.get("relevance_score")
+        st.caption(f"{article['source']}" + (f" · relevance {score:.2f}" if score is not None else ""))
+    if article.get("authors"):
+        authors = article["authors"]
+        st.markdown(f"👨‍🔬 {', '.join(authors) if isinstance(authors, list) else authors}")
+    if article.get("abstract"):
+        st.write(article["abstract"][:500])
+    if article.get("url"):
+        st.markdown(f"[🔗 Read more]({article['url']})")
+    st.markdown("---")
+
+
+def show_paper(data: dict) -> None:
+    if data.get("cached"):
+        st.caption("⚡ Served from the processed-paper store")
+    st.write("### ✏️ Category", data.get("category") or data.get("classification"))
+    st.write("### 📝 Summary", data.get("summary"))
+    st.write("### 📜 Citation", data.get("citation") or data.get("citations"))
+    if data.get("audio_url"):
+        st.audio(f"{API_BASE}/{data['audio_url']}", format="audio/mp3")
+    elif data.get("audio_file"):
+        st.audio(f"{API_BASE}/audio/{data['audio_file']}", format="audio/mp3")
+
+
+st.title("🔍 Multi-Source Research Article Search")
+st.markdown("Search, summarize, cite, and generate audio for research articles.")
+profile = st.sidebar.selectbox("Summary profile", PROFILES, index=PROFILES.index("quality"),
+                               help="fast: distilled model, seconds per paper. quality: full-length summaries. "
+                                    "long: whole-paper context in one or two passes.")
+
+
+# ------------------------- SEARCH SECTION -------------------------
+with st.expander("🔎 Search Research Articles", expanded=True):
+    query = st.text_input("Enter query:")
+    sources = st.multiselect("Sources", SOURCES, default=["arxiv", "openalex"])
+    sort_by = st.selectbox("Sort by", SORT_OPTIONS)
+    limit = st.slider("Results per source", 1, 50, 10)
+    merged = st.checkbox("Merge sources and rank by relevance to the query", value=False)
+
+    if st.button("Search"):
+        if not query.strip() or not sources:
+            st.warning("Please enter a query and pick at least one source.")
+        elif merged:
+            with st.spinner("Searching..."):
+                try:
+                    data = search_merged(tuple(sources), query, sort_by, limit)
+                except Exception as e:
+                    st.error(f"Search failed: {e}")
+                    data = {"results": [], "errors": {}}
+            for source, error in data["errors"].items():
+                st.warning(f"{source}: {error}")
+            if not data["results"]:
+                st.info("No articles found.")
+            for idx, article in enumerate(data["results"], start=1):
+                show_article(idx, article)
+        else:
+            # Sources are queried in parallel and each column fills in as soon as its source answers
+            columns = dict(zip(sources, st.columns(len(sources))))
+            for source, column in columns.items():
+                column.subheader(source)
+            with ThreadPoolExecutor(max_workers=len(sources)) as executor:
+                futures = {executor.submit(search_articles, s, query, sort_by, limit): s for s in sources}
+                for future in as_completed(futures):
+                    column = columns[futures[future]]
+                    try:
+                        results = future.result()
+                    except Exception as e:
+                        column.error(f"Search failed: {e}")
+                        continue
+                    with column:
+                        if not results:
+                            st.info("No articles found.")
+                        for idx, article in enumerate(results, start=1):
+                            show_article(idx, article)
+
+
+# ------------------------ URL / DOI PROCESSING -------------------------
+with st.expander("🌐 Process Paper from URL or DOI"):
+    url_col, doi_col = st.columns(2)
+    url = url_col.text_input("Enter research paper URL:")
+    doi = doi_col.text_input("Enter DOI")
+
+    if url_col.button("Process URL") and url.strip():
+        with st.spinner("Processing URL..."):
+            try:
+                show_paper(process_url(url.strip(), profile))
+            except Exception as e:
+                st.error(f"Failed: {e}")
+
+    if doi_col.button("Process DOI") and doi.strip():
+        with st.spinner("Processing DOI..."):
+            try:
+                show_paper(process_doi(doi.strip(), profile))
+            except Exception as e:
+                st.error(f"Failed: {e}")
+
+
+# ------------------------ BATCH PROCESSING -------------------------
+with st.expander("📦 Process a Batch of DOIs / URLs"):
+    batch_text = st.text_area("One DOI or URL per line")
+    items = [line.strip() for line in batch_text.splitlines() if line.strip()]
+    if st.button("Process Batch") and items:
+        progress = st.progress(0.0)
+        try:
+            for done, result in enumerate(stream_batch(items, profile), start=1):
+                progress.progress(done / len(items), text=f"{done}/{len(items)} processed")
+                with st.container():
+                    st.markdown(f"**{result.get('item', result.get('index'))}**")
+                    if result.get("error"):
+                        st.error(result["error"])
+                    else:
+                        show_paper(result)
+                    st.markdown("---")
+        except Exception as e:
+            st.error(f"Batch failed: {e}")
+
+
+# ------------------------ PDF PROCESSING -------------------------
+with st.expander("📄 Upload PDF"):
+    pdf_file = st.file_uploader("Upload PDF", type=["pdf"])
+    if pdf_file and st.button("Process PDF"):
+        with st.spinner("Processing PDF..."):
+            try:
+                show_paper(process_pdf(pdf_file.name, pdf_file.getvalue(), profile))
+            except Exception as e:
+                st.error(f"Error: {e}")
+
+
+# ------------------------ SYNTHESIZE MULTIPLE PDFs -------------------------
+with st.expander("🔗 Synthesize Multiple Papers"):
+    pdf_files = st.file_uploader("Upload PDFs", type=["pdf"], accept_multiple_files=True)
+    if pdf_files and st.button("Synthesize Papers"):
+        with st.spinner("Synthesizing..."):
+            try:
+                uploads = tuple((file.name, file.getvalue()) for file in pdf_files)
+                st.write("### 🧠 Synthesis")
+                st.write(synthesize_papers(uploads, profile))
+            except Exception as e:
+                st.error(f"Error: {e}")
@@ -1,56 +1,277 @@
+import os
+import logging
 from celery import Celery
-from agents.search_agent import search_paper
-from agents.process_agent import process_paper
-from agents.classify_agent import classify_paper
-from agents.summarize_agent import summarize
-from agents.synthesize_agent import synthesize
-from agents.audio_agent import generate_audio
-from agents.citation_agent import generate_citation
-
-# Initialize Celery with Redis as the broker
-celery = Celery(__name__, broker="redis://localhost:6379/0")
-
-@celery.task
+from celery.signals import (celeryd_after_setup, worker_process_init, before_task_publish,
+                            task_prerun, task_postrun)
+from kombu import Queue
+from utils.tracing import span, inject, extract, set_service_name
+
+logger = logging.getLogger(__name__)
+
+# Initialize Celery with Redis as the broker; results are short artifact references
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+celery = Celery(__name__, broker=REDIS_URL, backend=os.getenv("CELERY_RESULT_BACKEND", REDIS_URL))
+
+# ---------------- Queues ---------------- #
+# "io" holds short network-bound tasks (search, citation, metadata) and runs
+# on a wide pool; "models" holds summarization, synthesis and TTS and runs on
+# a narrow pool that keeps the models in memory. Run one worker per queue:
+#
+#   celery -A tasks.celery_worker.celery worker -Q io -n io@%h -c 16 --prefetch-multiplier 4
+#   celery -A tasks.celery_worker.celery worker -Q models -n models@%h -c 1 --prefetch-multiplier 1
+IO_QUEUE = "io"
+MODEL_QUEUE = "models"
+
+celery.conf.update(
+    task_queues=(Queue(IO_QUEUE), Queue(MODEL_QUEUE)),
+    task_default_queue=IO_QUEUE,
+    task_routes={
+        "tasks.io.*": {"queue": IO_QUEUE},
+        "tasks.models.*": {"queue": MODEL_QUEUE},
+    },
+    # Worker-wide default; io workers raise it on the command line. A model
+    # worker must not reserve a second long task while it is busy with one.
+    worker_prefetch_multiplier=int(os.getenv("CELERY_PREFETCH_MULTIPLIER", "1")),
+    task_acks_late=True,
+    task_reject_on_worker_lost=True,
+    task_serializer="json",
+    result_serializer="json",
+    # Run with `celery ... beat` to clean up expired artifacts
+    beat_schedule={
+        "purge-artifacts": {"task": "tasks.io.purge_artifacts", "schedule": 3600.0},
+    },
+)
+
+_consumed_queues = set()
+
+
+@celeryd_after_setup.connect
+def remember_queues(sender, instance, **kwargs):
+    """Record which queues this worker consumes; pool processes fork afterwards and inherit it."""
+    _consumed_queues.update(instance.app.amqp.queues.consume_from or {})
+
+
+@worker_process_init.connect
+def preload_models(**kwargs):
+    """
+    Load models once per pool process, and only on workers that consume the
+    model queue, so io workers never import transformers or SBERT.
+    """
+    if MODEL_QUEUE not in _consumed_queues:
+        return
+
+    from agents.generation_profiles import get_summarizer, INTERACTIVE_PROFILE, BATCH_PROFILE
+    from agents.classify_agent import load_model  # also loads the SBERT model
+
+    for profile in {INTERACTIVE_PROFILE, BATCH_PROFILE}:
+        get_summarizer(profile)
+    load_model()
+    logger.info(f"Models preloaded in pool process {os.getpid()}")
+
+
+# ---------------- Tracing ---------------- #
+# The publisher's span travels in the task headers as a W3C traceparent, so a
+# task's span (and every agent / HTTP span inside it) joins the API request's trace.
+_task_spans = {}
+
+
+@before_task_publish.connect
+def propagate_trace(headers=None, **kwargs):
+    if headers is not None:
+        inject(headers)
+
+
+@worker_process_init.connect
+def name_worker_spans(**kwargs):
+    set_service_name("research-worker")
+
+
+@task_prerun.connect
+def start_task_span(task_id=None, task=None, **kwargs):
+    manager = span(f"task {task.name}", parent=extract(getattr(task.request, "traceparent", None)),
+                   task_id=task_id, queue=(task.request.delivery_info or {}).get("routing_key"))
+    _task_spans[task_id] = (manager, manager.__enter__())
+
+
+@task_postrun.connect
+def end_task_span(task_id=None, state=None, **kwargs):
+    manager, task_span = _task_spans.pop(task_id, (None, None))
+    if task_span is not None:
+        task_span.set(state=state)
+    if manager is not None:
+        manager.__exit__(None, None, None)
+
+
+# ---------------- Light I/O tasks ---------------- #
+@celery.task(name="tasks.io.purge_artifacts")
+def purge_artifacts_task():
+    from utils.artifact_store import purge_expired
+    return purge_expired()
+
+
+@celery.task(name="tasks.io.search_articles")
+def search_articles_task(source, query, sort_by="relevance", limit=10, cursor=None):
+    """One page of search results from a provider, see search_articles_page()."""
+    from agents.search_agent import search_articles_page
+    return search_articles_page(source, query, sort_by, limit, cursor)
+
+
+@celery.task(name="tasks.io.citation")
+def citation_task(source, source_type):
+    """APA citation for a DOI, URL or PDF path."""
+    from agents.citation_agent import generate_citation
+    return generate_citation(source, source_type)
+
+
+@celery.task(name="tasks.io.metadata")
+def metadata_task(doi):
+    """Crossref metadata for a DOI (served from the local cache when fresh)."""
+    from utils.crossref import get_work
+    return get_work(doi)
+
+
+# ---------------- Heavy model tasks ---------------- #
+# Documents and results travel as artifact references (utils/artifact_store.py);
+# only the short "sha256:..." strings pass through the broker.
+@celery.task(name="tasks.models.summarize")
+def summarize_task(text_ref, profile="quality"):
+    """Summary of the text stored under `text_ref`, returned as a reference."""
+    from agents.summarize_agent import summarize
+    from utils.artifact_store import get_text, put_artifact
+    return put_artifact(summarize(get_text(text_ref), profile=profile))
+
+
+@celery.task(name="tasks.models.synthesize")
+def synthesize_task(text_refs, profile="balanced"):
+    from agents.synthesize_agent import cross_paper_synthesis
+    from utils.artifact_store import get_text, put_artifact
+    return put_artifact(cross_paper_synthesis([get_text(ref) for ref in text_refs], profile))
+
+
+@celery.task(name="tasks.models.process_pdf")
+def process_pdf_task(pdf_ref, filename, profile="quality", sections=None):
+    """
+    Full PDF pipeline (extract, classify, summarize, cite, TTS) for a PDF
+    stored under `pdf_ref`. The result dict is stored as a JSON artifact and
+    its reference returned. Like /upload-pdf/, a near-duplicate of a stored
+    paper reuses its result, and new papers are saved to the corpus store,
+    the near-duplicate index and the similarity index.
+    """
+    from utils.document import parse_pdf
+    from agents.classify_agent import classify_content
+    from agents.summarize_agent import summarize
+    from agents.audio_agent import generate_audio
+    from agents.citation_agent import generate_citation
+    from utils.artifact_store import get_artifact, put_json
+    from utils.corpus_store import save_paper
+    from utils.near_duplicate import text_signature
+    from agents.paper_registry import find_processed_paper, remember_paper, stored_pdf_response
+
+    document = parse_pdf(get_artifact(pdf_ref), filename)
+    text = document.text
+    if not text.strip():
+        return put_json({"error": "❌ Could not extract text from the PDF."})
+
+    pdf_hash = pdf_ref.split(":", 1)[1]  # same SHA-256 as content_hash(file_bytes)
+    signature = text_signature(text, abstract=document.abstract_text())
+    stored = find_processed_paper(pdf_hash, signature, profile) if not sections else None
+    if stored:
+        save_paper({**stored, "filename": filename})
+        return put_json(stored_pdf_response(stored))
+
+    citation = generate_citation(filename, source_type="pdf", document=document)
+
+    selected_text = document.select_text(sections)
+    category = classify_content(selected_text)
+    summary = summarize(selected_text, profile=profile)
+    audio_path = generate_audio(summary)
+
+    if not sections:  # section-specific summaries don't replace the stored default
+        remember_paper({
+            "content_hash": pdf_hash,
+            "source_type": "pdf",
+            "filename": filename,
+            "text": text,
+            "category": category,
+            "summary": summary,
+            "citation": citation,
+            "audio_path": audio_path,
+            "profile": profile
+        }, signature)
+    return put_json({
+        "classification": category,
+        "summary": summary,
+        "citations": citation,
+        "audio_file": audio_path.name if audio_path else None,
+        "profile": profile,
+        "sections": document.section_kinds(),
+        "summarized_chars": len(selected_text),
+        "total_chars": len(text)
+    })
+
+
+@celery.task(name="tasks.models.audio")
+def audio_task(text):
+    """Returns the generated audio path as a string, or None on failure."""
+    from agents.audio_agent import generate_audio
+    audio_path = generate_audio(text)
+    return str(audio_path) if audio_path else None
+
+
+@celery.task(name="tasks.models.process")
 def process_task(topic, file_path, paper_url, doi):
     """
     Process the research paper and generate necessary outputs like summary, synthesis, audio, and citation.
-    
+
     Args:
         topic (str): The topic for classification.
         file_path (str): Path to the uploaded paper.
         paper_url (str): URL of the paper (if available).
         doi (str): DOI of the paper (if available).
-    
+
     Returns:
         dict: Contains summary, synthesis, audio path, and citation.
     """
+    from agents.process_agent import process_paper
+    from agents.classify_agent import classify_content
+    from agents.summarize_agent import summarize
+    from agents.synthesize_agent import cross_paper_synthesis
+    from agents.audio_agent import generate_audio
+    from agents.citation_agent import generate_citation
+
     try:
         # Step 1: Process the paper (extract content, metadata, etc.)
         paper_data = process_paper(file_path, paper_url, doi)
+        content = paper_data.get('content', '')
 
-        # Step 2: Classify the paper based on the provided topic
-        paper_data['topic'] = classify_paper(paper_data['content'], topic)
+        # Step 2: Classify the paper's content
+        paper_data['topic'] = classify_content(content) if content else topic
 
         # Step 3: Summarize the paper's content
-        summary = summarize(paper_data['content'])
+        summary = summarize(content)
 
-        # Step 4: Synthesize cross-paper information (based on the topic)
-        synthesis = synthesize(topic)
+        # Step 4: Synthesize the paper into a cross-paper style overview
+        synthesis = cross_paper_synthesis([content])
 
         # Step 5: Convert the summary into an audio file
-        audio_path = generate_audio(summary, paper_data['id'])
+        audio_path = generate_audio(summary)
 
         # Step 6: Generate the citation for the paper
-        citation = generate_citation(paper_data['id'])
+        if doi:
+            citation = generate_citation(doi, source_type="doi")
+        elif paper_url:
+            citation = generate_citation(paper_url, source_type="url")
+        else:
+            citation = generate_citation(file_path, source_type="pdf")
 
         # Return the results as a dictionary
         return {
+            "topic": paper_data['topic'],
             "summary": summary,
             "synthesis": synthesis,
-            "audio_path": audio_path,
+            "audio_path": str(audio_path) if audio_path else None,
             "citation": citation
         }
     except Exception as e:
         # In case of any error, log and return an error message
         return {"error": str(e)}
-
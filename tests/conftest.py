@@ -0,0 +1,62 @@
+import os
+import sys
+import hashlib
+import tempfile
+from pathlib import Path
+import numpy as np
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+# Stores written while a test runs go to a scratch directory, not the repo
+_scratch = Path(tempfile.mkdtemp(prefix="research-tests-"))
+for name, path in [("CORPUS_DB_PATH", "corpus.db"), ("CROSSREF_CACHE_PATH", "crossref.db"),
+                   ("VECTOR_INDEX_DIR", "index"), ("EMBEDDING_CACHE_DIR", "embeddings"),
+                   ("ARTIFACT_DIR", "artifacts"), ("TRACE_FILE", "traces.jsonl")]:
+    os.environ.setdefault(name, str(_scratch / path))
+
+
+# ---------------- Models ---------------- #
+# Model weights aren't downloaded for the tests: embeddings are derived from a
+# hash of the text and the summarizer echoes the first words of its input.
+class FakeSentenceTransformer:
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return 8
+
+    def encode(self, texts, normalize_embeddings=False, **kwargs):
+        single = isinstance(texts, str)
+        vectors = []
+        for text in [texts] if single else texts:
+            seed = int.from_bytes(hashlib.sha256(text.encode()).digest()[:4], "big")
+            vector = np.random.default_rng(seed).random(8).astype(np.float32)
+            vectors.append(vector / np.linalg.norm(vector) if normalize_embeddings else vector)
+        return vectors[0] if single else np.stack(vectors) if vectors else np.zeros((0, 8), np.float32)
+
+
+def fake_pipeline(*args, **kwargs):
+    def summarize(inputs, **kw):
+        texts = inputs if isinstance(inputs, list) else [inputs]
+        return [{"summary_text": " ".join(text.split()[:20])} for text in texts]
+    return summarize
+
+
+import sentence_transformers  # noqa: E402
+import transformers  # noqa: E402
+sentence_transformers.SentenceTransformer = FakeSentenceTransformer
+transformers.pipeline = fake_pipeline
+
+
+# ---------------- Fixtures ---------------- #
+@pytest.fixture
+def corpus(tmp_path, monkeypatch):
+    """A fresh corpus database (papers and near-duplicate signatures) per test."""
+    from utils import corpus_store, near_duplicate
+    path = tmp_path / "corpus.db"
+    for module in (corpus_store, near_duplicate):
+        monkeypatch.setattr(module, "CORPUS_PATH", path)
+        monkeypatch.setattr(module, "_local", type(module._local)())
+    return path
@@ -0,0 +1,48 @@
+import asyncio
+import json
+import pytest
+
+
+@pytest.fixture
+def batch_app(monkeypatch):
+    import app
+    fetched, batches = [], []
+
+    async def fetch_batch_item_text(client, kind, value, records):
+        fetched.append(value)
+        await asyncio.sleep(0.01 * len(fetched))  # completions spread over ~50 ms
+        return f"text of {value}"
+
+    def run_agents_batch(entries, records, profile):
+        batches.append([index for index, _, _, _ in entries])
+        return [{"index": index, "item": value, "type": kind, "summary": text} for index, kind, value, text in entries]
+
+    monkeypatch.setattr(app, "find_paper", lambda **kw: None)
+    monkeypatch.setattr(app, "get_works", lambda dois: {})
+    monkeypatch.setattr(app, "fetch_batch_item_text", fetch_batch_item_text)
+    monkeypatch.setattr(app, "run_agents_batch", run_agents_batch)
+    return app, fetched, batches
+
+
+def stream(app, items, batch_size=8):
+    async def collect():
+        return [json.loads(line) async for line in app.process_batch_stream(items, 4, batch_size, "quality")]
+    return sorted(asyncio.run(collect()), key=lambda line: line["index"])
+
+
+def test_repeated_items_are_processed_once(batch_app):
+    app, fetched, _ = batch_app
+    items = ["10.1000/ABC", "https://example.org/paper", "doi:10.1000/abc", "not an item",
+             "https://doi.org/10.1000/abc"]
+    lines = stream(app, items)
+
+    assert sorted(fetched) == ["10.1000/abc", "https://example.org/paper"]
+    assert [line["index"] for line in lines] == [0, 1, 2, 3, 4]
+    assert lines[0]["summary"] == lines[2]["summary"] == lines[4]["summary"] == "text of 10.1000/abc"
+    assert "error" in lines[3]
+
+
+def test_completions_close_together_share_a_model_batch(batch_app):
+    app, _, batches = batch_app
+    stream(app, [f"https://example.org/{i}" for i in range(5)])
+    assert [sorted(batch) for batch in batches] == [[0, 1, 2, 3, 4]]
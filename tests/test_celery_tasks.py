@@ -0,0 +1,42 @@
+import fitz
+import pytest
+from utils import artifact_store
+from utils.artifact_store import get_json, put_artifact
+from utils.corpus_store import find_paper
+
+ABSTRACT = ("We study how soil microbes respond to long-term tillage and report the diversity of "
+            "bacterial and fungal communities across twenty years of field trials.")
+
+
+def make_pdf() -> bytes:
+    document = fitz.open()
+    page = document.new_page()
+    page.insert_text((72, 72), "Soil Microbes Under No-Till", fontsize=16)
+    page.insert_text((72, 110), "Abstract", fontsize=13)
+    page.insert_textbox(fitz.Rect(72, 120, 520, 300), ABSTRACT, fontsize=10)
+    page.insert_text((72, 320), "1. Introduction", fontsize=13)
+    page.insert_textbox(fitz.Rect(72, 330, 520, 700), "Tillage changes the soil habitat. " * 20, fontsize=10)
+    return document.tobytes()
+
+
+@pytest.fixture
+def queued(corpus, tmp_path, monkeypatch):
+    from agents import audio_agent
+    monkeypatch.setattr(artifact_store, "ARTIFACT_DIR", tmp_path / "artifacts")
+    monkeypatch.setattr(audio_agent, "generate_audio", lambda *args: None)  # no TTS service in tests
+    from tasks.celery_worker import process_pdf_task
+    return process_pdf_task
+
+
+def test_queued_pdf_is_registered(queued):
+    pdf_ref = put_artifact(make_pdf())
+    result = get_json(queued(pdf_ref, "paper.pdf"))
+    assert result["classification"] and result["summary"]
+
+    pdf_hash = pdf_ref.split(":", 1)[1]
+    stored = find_paper(content_hash=pdf_hash)
+    assert stored and stored["filename"] == "paper.pdf" and stored["summary"] == result["summary"]
+
+    again = get_json(queued(pdf_ref, "copy.pdf"))
+    assert again["cached"] and again["summary"] == result["summary"]
+
@@ -0,0 +1,36 @@
+from agents.citation_agent import empty_record, format_citation
+
+
+def record(**fields) -> dict:
+    return {**empty_record(), "authors": [("Smith", "Jane")], "title": "Deep Learning for Soil Science.",
+            "year": "2024", "container": "Journal of Soils.", "volume": "12", "issue": "3",
+            "pages": "1-10", "type": "journal-article", **fields}
+
+
+def test_bibtex_keys_are_unique_within_an_export():
+    used = set()
+    keys = [format_citation(record(), "bibtex", n, used).split("{", 1)[1].split(",", 1)[0] for n in range(1, 4)]
+    assert keys == ["smith2024deep", "smith2024deepb", "smith2024deepc"]
+
+
+def test_bibtex_escapes_text_but_not_links():
+    entry = format_citation(record(title="Costs & Benefits of 50% Cuts", doi="10.1000/a_b%c"), "bibtex")
+    assert r"title = {Costs \& Benefits of 50\% Cuts}" in entry
+    assert "doi = {10.1000/a_b%c}" in entry
+
+
+def test_apa_has_single_periods():
+    citation = format_citation(record(), "apa")
+    assert citation == "Smith, J. (2024). Deep Learning for Soil Science. Journal of Soils, 12(3), 1-10."
+    assert ".." not in format_citation(record(year="", container=""), "apa")
+
+
+def test_mla_has_single_periods():
+    citation = format_citation(record(), "mla")
+    assert citation == 'Smith, Jane. "Deep Learning for Soil Science." Journal of Soils, vol. 12, no. 3, 2024, pp. 1-10.'
+
+
+def test_ieee_has_single_periods():
+    citation = format_citation(record(title="Deep Learning?"), "ieee", n=2)
+    assert citation == '[2] J. Smith, "Deep Learning?," Journal of Soils, vol. 12, no. 3, pp. 1-10, 2024.'
+    assert format_citation(record(year=""), "ieee").endswith("n.d.")
@@ -0,0 +1,27 @@
+import pytest
+from agents import classify_agent
+from agents.classify_agent import iter_labeled_corpus, train_model_incremental
+
+
+@pytest.mark.parametrize("name, header, row", [
+    ("corpus.csv", "label,text", "Education,A new approach to teaching children."),
+    ("corpus.tsv", "Label\tText", "Education\tA new approach to teaching children."),
+])
+def test_header_row_is_not_a_sample(tmp_path, name, header, row):
+    path = tmp_path / name
+    path.write_text(f"{header}\n{row}\n", encoding="utf-8")
+    assert list(iter_labeled_corpus(str(path))) == [("A new approach to teaching children.", "Education")]
+
+
+def test_header_label_is_not_learned(tmp_path, monkeypatch):
+    monkeypatch.setattr(classify_agent, "ONLINE_MODEL_PATH", str(tmp_path / "online.pkl"))
+    path = tmp_path / "corpus.csv"
+    path.write_text("label,text\nEducation,A new approach to teaching children.\n", encoding="utf-8")
+    model, _ = train_model_incremental(str(path))
+    assert list(model.classes_) == ["Education"]
+
+
+def test_csv_without_header_keeps_first_row(tmp_path):
+    path = tmp_path / "corpus.csv"
+    path.write_text("Engineering,Robots in factories.\nEducation,Teaching children.\n", encoding="utf-8")
+    assert [label for _, label in iter_labeled_corpus(str(path))] == ["Engineering", "Education"]
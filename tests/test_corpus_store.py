@@ -0,0 +1,31 @@
+import sqlite3
+from utils import corpus_store
+from utils.corpus_store import find_paper, save_paper
+
+
+def record(**fields) -> dict:
+    return {"content_hash": "h1", "source_type": "doi", "text": "text", "category": "c",
+            "summary": "s", "citation": "", "audio_path": None, "profile": "quality", **fields}
+
+
+def test_every_alias_finds_the_paper(corpus):
+    save_paper(record(doi="10.1/a"))
+    save_paper(record(doi="10.1/b", url="https://example.org/a"))
+    save_paper(record(url="https://example.org/b", filename="a.pdf"))
+
+    for key in ({"doi": "10.1/a"}, {"doi": "10.1/b"},
+                {"url": "https://example.org/a"}, {"url": "https://example.org/b"}):
+        found = find_paper(**key)
+        assert found and found["content_hash"] == "h1", key
+    assert find_paper(doi="10.1/c") is None
+
+
+def test_aliases_are_seeded_from_older_databases(corpus, monkeypatch):
+    save_paper(record(doi="10.1/a"))
+    conn = sqlite3.connect(corpus)
+    conn.execute("DROP TABLE paper_aliases")
+    conn.commit()
+    conn.close()
+
+    monkeypatch.setattr(corpus_store, "_local", type(corpus_store._local)())
+    assert find_paper(doi="10.1/a")["content_hash"] == "h1"
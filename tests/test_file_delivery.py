@@ -0,0 +1,100 @@
+import pytest
+from utils.file_delivery import RangeNotSatisfiable, file_etag, parse_range, prepare_file_response
+
+SIZE = 1000
+
+
+# ---------------- parse_range ---------------- #
+@pytest.mark.parametrize("header, expected", [
+    ("bytes=0-99", (0, 99)),
+    ("bytes=100-", (100, 999)),          # open-ended: to the end of the file
+    ("bytes=900-5000", (900, 999)),      # end past EOF is clamped
+    ("bytes=-100", (900, 999)),          # suffix: the last 100 bytes
+    ("bytes=-5000", (0, 999)),           # suffix longer than the file
+    ("bytes=999-999", (999, 999)),
+])
+def test_parse_range_satisfiable(header, expected):
+    assert parse_range(header, SIZE) == expected
+
+
+@pytest.mark.parametrize("header", [None, "", "bytes=0-1,5-9", "bytes=-", "items=0-9", "bytes=a-b"])
+def test_parse_range_whole_file(header):
+    assert parse_range(header, SIZE) is None
+
+
+@pytest.mark.parametrize("header, size", [
+    ("bytes=1000-", SIZE),               # starts at EOF
+    ("bytes=5000-6000", SIZE),
+    ("bytes=10-5", SIZE),                # start after end
+    ("bytes=-0", SIZE),
+    ("bytes=-10", 0),                    # suffix of an empty file
+    ("bytes=0-", 0),
+])
+def test_parse_range_not_satisfiable(header, size):
+    with pytest.raises(RangeNotSatisfiable):
+        parse_range(header, size)
+
+
+# ---------------- prepare_file_response ---------------- #
+@pytest.fixture
+def audio_file(tmp_path):
+    path = tmp_path / "0123456789abcdef0123456789abcdef.mp3"
+    path.write_bytes(bytes(range(256)) * 4)
+    return path
+
+
+def test_full_response(audio_file):
+    status, headers, byte_range = prepare_file_response(audio_file)
+    assert status == 200
+    assert byte_range == (0, 1023)
+    assert headers["Content-Length"] == "1024"
+    assert "immutable" in headers["Cache-Control"]
+
+
+def test_partial_response(audio_file):
+    status, headers, byte_range = prepare_file_response(audio_file, range_header="bytes=-24")
+    assert status == 206
+    assert byte_range == (1000, 1023)
+    assert headers["Content-Range"] == "bytes 1000-1023/1024"
+    assert headers["Content-Length"] == "24"
+
+
+def test_out_of_bounds_range_is_416(audio_file):
+    status, headers, byte_range = prepare_file_response(audio_file, range_header="bytes=2048-")
+    assert status == 416
+    assert byte_range is None
+    assert headers["Content-Range"] == "bytes */1024"
+
+
+@pytest.mark.parametrize("if_none_match", [
+    '"0123456789abcdef0123456789abcdef"',
+    '"stale", "0123456789abcdef0123456789abcdef"',
+    'W/"0123456789abcdef0123456789abcdef"',
+    "*",
+])
+def test_if_none_match_is_304(audio_file, if_none_match):
+    status, headers, byte_range = prepare_file_response(audio_file, range_header="bytes=0-9",
+                                                        if_none_match=if_none_match)
+    assert status == 304
+    assert byte_range is None
+    assert headers["ETag"] == '"0123456789abcdef0123456789abcdef"'
+
+
+def test_if_none_match_mismatch_sends_body(audio_file):
+    status, _, _ = prepare_file_response(audio_file, if_none_match='"stale"')
+    assert status == 200
+
+
+def test_stale_if_range_ignores_range(audio_file):
+    status, _, byte_range = prepare_file_response(audio_file, range_header="bytes=0-9", if_range='"stale"')
+    assert status == 200
+    assert byte_range == (0, 1023)
+
+
+def test_mutable_file_etag_tracks_mtime_and_size(tmp_path):
+    path = tmp_path / "summary.mp3"
+    path.write_bytes(b"abc")
+    stat = path.stat()
+    assert file_etag(path, stat) == f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+    status, headers, _ = prepare_file_response(path)
+    assert status == 200 and headers["Cache-Control"] == "no-cache"
@@ -0,0 +1,26 @@
+from pathlib import Path
+import pytest
+from utils.html_extract import extract_text_from_html
+
+FIXTURES = Path(__file__).resolve().parent.parent / "benchmarks" / "fixtures" / "html"
+
+
+@pytest.mark.parametrize("name, url, phrase", [
+    ("aspnet_publisher.html", "https://www.jar-journal.org/Article.aspx?articleid=2837461",
+     "Conservation tillage is widely promoted"),
+    ("html5_article.html", "https://letters.example.org/a/2024.0117", "Discharge summaries and progress notes"),
+])
+def test_form_and_article_header_content_is_kept(name, url, phrase):
+    text = extract_text_from_html((FIXTURES / name).read_bytes(), url)
+    assert phrase in text
+
+
+def test_site_banner_header_is_dropped():
+    html = b"""<html><body>
+    <header><nav>Journals Books Sign in</nav></header>
+    <article><header><h1>Paper title</h1><p>The abstract sentence of this paper is here.</p></header>
+    <p>Body paragraph with enough words to count as real article content for extraction.</p></article>
+    </body></html>"""
+    text = extract_text_from_html(html, "https://example.org/paper")
+    assert "The abstract sentence" in text
+    assert "Sign in" not in text
@@ -0,0 +1,78 @@
+import random
+import pytest
+from utils.document import find_abstract
+from utils.near_duplicate import add_document, find_near_duplicate, text_signature
+
+WORDS = [f"w{i}" for i in range(5000)]
+BOILERPLATE = ("Skip to main content. Journal home. Browse issues. Submit a manuscript. "
+               "We use cookies to improve your experience. Accept all cookies. Manage preferences. ") * 8
+
+
+def prose(seed: int, n: int) -> str:
+    rng = random.Random(seed)
+    return " ".join(rng.choice(WORDS) for _ in range(n))
+
+
+def pdf_text(abstract: str, body: str) -> str:
+    return f"A Study of Things\nA. Author, B. Author\nAbstract\n{abstract}\nKeywords: things\n1 Introduction\n{body}"
+
+
+def page_text(abstract: str) -> str:
+    return f"{BOILERPLATE}\nAbstract: {abstract}\nKeywords: things\nCite this article. Share. {BOILERPLATE}"
+
+
+# ---------------- find_abstract ---------------- #
+def test_find_abstract_stops_at_keywords():
+    assert find_abstract(pdf_text("one two three", "body text")) == "one two three"
+
+
+def test_find_abstract_without_label():
+    assert find_abstract(BOILERPLATE + prose(1, 300)) == ""
+
+
+# ---------------- Matching ---------------- #
+def test_abstract_page_matches_full_paper(corpus):
+    abstract = prose(1, 200)
+    add_document("pdf", text_signature(pdf_text(abstract, prose(2, 6000))))
+    assert find_near_duplicate(text_signature(abstract, abstract=abstract)) == "pdf"
+    assert find_near_duplicate(text_signature(page_text(abstract))) == "pdf"
+
+
+def test_shared_boilerplate_does_not_match(corpus):
+    add_document("a", text_signature(page_text(prose(1, 200))))
+    assert find_near_duplicate(text_signature(page_text(prose(3, 200)))) is None
+
+
+def test_page_without_abstract_matches_on_full_text_only(corpus):
+    # The same publisher furniture leading two different articles
+    add_document("a", text_signature(BOILERPLATE + prose(1, 3000)))
+    assert find_near_duplicate(text_signature(BOILERPLATE + prose(3, 3000))) is None
+
+
+# ---------------- Reuse ---------------- #
+@pytest.fixture
+def registry(corpus):
+    from agents import paper_registry
+    return paper_registry
+
+
+def store(registry, content_hash: str, text: str, signature) -> None:
+    from utils.corpus_store import save_paper
+    save_paper({"content_hash": content_hash, "source_type": "pdf", "text": text, "category": "c",
+                "summary": f"summary of {content_hash}", "citation": "", "audio_path": None, "profile": "quality"})
+    add_document(content_hash, signature)
+
+
+def test_full_paper_answers_abstract_page(registry):
+    abstract = prose(1, 200)
+    full = pdf_text(abstract, prose(2, 6000))
+    store(registry, "pdf", full, text_signature(full))
+    stored = registry.find_processed_paper("doi", text_signature(abstract, abstract=abstract), "quality")
+    assert stored and stored["content_hash"] == "pdf"
+
+
+def test_abstract_page_does_not_answer_full_paper(registry):
+    abstract = prose(1, 200)
+    store(registry, "doi", abstract, text_signature(abstract, abstract=abstract))
+    full = pdf_text(abstract, prose(2, 6000))
+    assert registry.find_processed_paper("pdf", text_signature(full), "quality") is None
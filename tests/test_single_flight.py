@@ -0,0 +1,72 @@
+import asyncio
+import json
+import pytest
+fakeredis = pytest.importorskip("fakeredis")
+from utils import single_flight as sf
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    client = fakeredis.FakeAsyncRedis()
+    monkeypatch.setattr(sf, "get_async_redis", lambda: client)
+    return client
+
+
+def counting(result):
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        return result
+    return compute, calls
+
+
+def test_results_are_shared_with_later_callers(redis):
+    compute, calls = counting({"category": "c"})
+
+    async def run():
+        first = await sf.single_flight("k", compute)
+        second = await sf.single_flight("k", compute)
+        return first, second
+
+    assert asyncio.run(run()) == ({"category": "c"}, {"category": "c"})
+    assert len(calls) == 1
+
+
+def test_error_payloads_are_not_cached(redis):
+    compute, calls = counting({"text": "No useful content found on this page."})
+    cacheable = lambda result: bool(result.get("category"))
+
+    async def run():
+        await sf.single_flight("k", compute, cacheable)
+        await sf.single_flight("k", compute, cacheable)
+        return await redis.get("singleflight:result:k")
+
+    assert asyncio.run(run()) is None
+    assert len(calls) == 2
+
+
+def test_follower_wait_does_not_block_the_loop(redis):
+    async def run():
+        # Another process leads this key
+        await redis.set("singleflight:lock:k", "other", px=sf.LOCK_TTL_MS)
+        ticks = []
+
+        async def ticker():
+            while True:
+                ticks.append(1)
+                await asyncio.sleep(0.01)
+
+        async def leader_finishes():
+            await asyncio.sleep(0.3)
+            await redis.publish("singleflight:done:k", json.dumps({"category": "c"}))
+
+        tick_task = asyncio.create_task(ticker())
+        asyncio.create_task(leader_finishes())
+        result = await sf.single_flight("k", lambda: pytest.fail("follower computed"))
+        tick_task.cancel()
+        return result, len(ticks)
+
+    result, ticks = asyncio.run(run())
+    assert result == {"category": "c"}
+    assert ticks > 10
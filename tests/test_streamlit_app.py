@@ -0,0 +1,52 @@
+import pytest
+pytest.importorskip("streamlit")
+
+
+class FakeResponse:
+    def __init__(self, payload: dict, status_code: int = 200):
+        self.payload, self.status_code = payload, status_code
+        self.ok = status_code < 400
+
+    def json(self) -> dict:
+        return self.payload
+
+
+class FakeSession:
+    def __init__(self, *payloads):
+        self.payloads, self.calls = list(payloads), 0
+
+    def post(self, *args, **kwargs):
+        self.calls += 1
+        return FakeResponse(self.payloads.pop(0))
+
+
+@pytest.fixture
+def ui():
+    import streamlit_app
+    streamlit_app.process_url.clear()
+    return streamlit_app
+
+
+def test_error_payload_with_200_raises(ui):
+    response = FakeResponse({"text": "ℹ️ No useful content found on this page."})
+    with pytest.raises(ui.ApiError, match="No useful content"):
+        ui.check_paper(response)
+    assert ui.check_paper(FakeResponse({"category": "c", "summary": "s"}))["category"] == "c"
+
+
+def test_failed_processing_is_not_cached(ui, monkeypatch):
+    session = FakeSession({"text": "⚠️ Could not fetch the page."}, {"category": "c", "summary": "s"})
+    monkeypatch.setattr(ui, "get_session", lambda: session)
+
+    with pytest.raises(ui.ApiError):
+        ui.process_url("https://example.org/paper", "quality")
+    assert ui.process_url("https://example.org/paper", "quality")["summary"] == "s"
+    assert ui.process_url("https://example.org/paper", "quality")["summary"] == "s"
+    assert session.calls == 2
+
+
+def test_synthesis_failure_text_raises(ui, monkeypatch):
+    ui.synthesize_papers.clear()
+    monkeypatch.setattr(ui, "get_session", lambda: FakeSession({"synthesis": "❌ Could not synthesize."}))
+    with pytest.raises(ui.ApiError):
+        ui.synthesize_papers((("a.pdf", b"%PDF"),), "balanced")
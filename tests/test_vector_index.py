@@ -0,0 +1,50 @@
+import numpy as np
+from utils.vector_index import VectorIndex
+
+
+def unit(rng, dim=8):
+    vector = rng.normal(size=dim).astype(np.float32)
+    return vector / np.linalg.norm(vector)
+
+
+def test_upsert_found_before_and_after_rebuild(tmp_path):
+    rng = np.random.default_rng(0)
+    index = VectorIndex(tmp_path, dim=8)
+    for i in range(50):
+        index.add(unit(rng), {"n": i}, key=f"k{i}")
+    index.build(nlist=4)
+
+    target = unit(rng)
+    index.add(target, {"n": "moved"}, key="k7")  # its IVF list is stale now
+    assert index.search(target, top_k=1, nprobe=1)[0]["n"] == "moved"
+    assert list(index._rewritten) == [7]
+
+    index.build(nlist=4)
+    assert not index._rewritten
+    assert index.search(target, top_k=1, nprobe=4)[0]["n"] == "moved"
+
+
+def test_rewrite_after_build_snapshot_stays_exact(tmp_path):
+    rng = np.random.default_rng(1)
+    index = VectorIndex(tmp_path, dim=8)
+    for i in range(20):
+        index.add(unit(rng), {"n": i}, key=f"k{i}")
+    index.build(nlist=2)
+    index.add(unit(rng), {"n": "first"}, key="k3")
+    built_offset = index._meta_offset
+    index.build(nlist=2)
+    index.add(unit(rng), {"n": "second"}, key="k3")
+
+    # A fresh instance loading that build drops the covered rewrite, keeps the later one
+    other = VectorIndex(tmp_path, dim=8)
+    assert other._rewritten and min(other._rewritten.values()) > built_offset
+
+
+def test_build_lists_cover_every_row(tmp_path):
+    rng = np.random.default_rng(2)
+    index = VectorIndex(tmp_path, dim=8)
+    for i in range(30):
+        index.add(unit(rng), {"n": i})
+    index.build(nlist=3)
+    centroids, offsets, ids, rows = index._ivf
+    assert rows == 30 and offsets[-1] == len(ids) == 30 and len(centroids) == 3
@@ -0,0 +1,120 @@
+import os
+import math
+import time
+import heapq
+import asyncio
+import itertools
+from contextlib import asynccontextmanager
+from utils.resource_governor import INFERENCE_SLOTS
+
+# ---------------- Config ---------------- #
+# Heavy requests (extraction + model work) admitted at once per process. The
+# rest wait in a priority queue; interactive requests are always served before
+# batch work, and once a class's queue is full new requests are turned away.
+MAX_IN_FLIGHT = int(os.getenv("ADMISSION_MAX_IN_FLIGHT", INFERENCE_SLOTS * 2))
+QUEUE_LIMITS = {
+    "interactive": int(os.getenv("ADMISSION_INTERACTIVE_QUEUE", "16")),
+    "batch": int(os.getenv("ADMISSION_BATCH_QUEUE", "64")),
+}
+QUEUE_TIMEOUT = float(os.getenv("ADMISSION_QUEUE_TIMEOUT", "30"))  # seconds
+PRIORITIES = {"interactive": 0, "batch": 1}
+
+
+class Overloaded(Exception):
+    """Request refused by admission control; maps to an HTTP status with Retry-After."""
+
+    def __init__(self, status_code: int, retry_after: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.retry_after = retry_after
+        self.detail = detail
+
+
+_waiters = []  # heap of (priority rank, sequence, future)
+_sequence = itertools.count()
+_state = {"in_flight": 0, "service_s": 5.0}
+_stats = {"admitted": 0, "rejected": 0, "timed_out": 0, "wait_s": 0.0, "max_wait_s": 0.0}
+
+
+def _queued(rank: int = None) -> int:
+    return sum(1 for r, _, fut in _waiters if not fut.done() and (rank is None or r == rank))
+
+
+def _retry_after() -> int:
+    """Seconds until a slot is likely free, from the moving average service time."""
+    waves = _queued() / MAX_IN_FLIGHT + 1
+    return max(1, math.ceil(_state["service_s"] * waves))
+
+
+def _release() -> None:
+    """Hand the slot to the best waiting request, or free it."""
+    while _waiters:
+        _, _, fut = heapq.heappop(_waiters)
+        if not fut.done():
+            fut.set_result(None)
+            return
+    _state["in_flight"] -= 1
+
+
+@asynccontextmanager
+async def admit(priority: str = "interactive", reject: bool = True):
+    """
+    Hold one heavy-work slot for the duration of the block. With reject=True
+    (request handlers) raises Overloaded: 429 when the priority's queue is
+    full, 503 when the wait exceeds QUEUE_TIMEOUT. With reject=False (work
+    already accepted, e.g. a streaming batch) the caller waits its turn.
+    """
+    rank = PRIORITIES[priority]
+    enqueued = time.monotonic()
+
+    if _state["in_flight"] < MAX_IN_FLIGHT and not _queued():
+        _state["in_flight"] += 1
+    else:
+        if reject and _queued(rank) >= QUEUE_LIMITS[priority]:
+            _stats["rejected"] += 1
+            raise Overloaded(429, _retry_after(), "Server is busy, too many requests queued.")
+
+        fut = asyncio.get_running_loop().create_future()
+        heapq.heappush(_waiters, (rank, next(_sequence), fut))
+        try:
+            if reject:
+                await asyncio.wait_for(fut, QUEUE_TIMEOUT)
+            else:
+                await fut
+        except asyncio.TimeoutError:
+            if fut.done() and not fut.cancelled():
+                _release()
+            _stats["timed_out"] += 1
+            raise Overloaded(503, _retry_after(), "Server is overloaded, request waited too long.")
+        except asyncio.CancelledError:
+            if fut.done() and not fut.cancelled():
+                _release()  # slot was handed over just as the client went away
+            raise
+
+    waited = time.monotonic() - enqueued
+    _stats["admitted"] += 1
+    _stats["wait_s"] += waited
+    _stats["max_wait_s"] = max(_stats["max_wait_s"], waited)
+
+    started = time.monotonic()
+    try:
+        yield
+    finally:
+        _state["service_s"] = 0.8 * _state["service_s"] + 0.2 * (time.monotonic() - started)
+        _release()
+
+
+def admission_stats() -> dict:
+    admitted = _stats["admitted"]
+    return {
+        "max_in_flight": MAX_IN_FLIGHT,
+        "in_flight": _state["in_flight"],
+        "queued": {name: _queued(rank) for name, rank in PRIORITIES.items()},
+        "queue_limits": QUEUE_LIMITS,
+        "admitted": admitted,
+        "rejected": _stats["rejected"],
+        "timed_out": _stats["timed_out"],
+        "avg_queue_wait_ms": round(_stats["wait_s"] / admitted * 1000, 2) if admitted else 0.0,
+        "max_queue_wait_ms": round(_stats["max_wait_s"] * 1000, 2),
+        "avg_service_s": round(_state["service_s"], 2),
+    }
@@ -0,0 +1,140 @@
+import os
+import json
+import time
+import zlib
+import hashlib
+from pathlib import Path
+from typing import Any, Union
+from utils.redis_client import get_redis
+
+try:
+    import zstandard
+except ImportError:  # optional, zlib is used when neither codec is installed
+    zstandard = None
+try:
+    import lz4.frame as lz4_frame
+except ImportError:
+    lz4_frame = None
+
+# ---------------- Config ---------------- #
+# Large inputs and results (PDF bytes, extracted text, agent outputs) are
+# written here once and passed to Celery tasks as "sha256:<hex>" references.
+# "fs" needs a directory shared by the API and the workers; "redis" stores
+# blobs next to the broker for workers on other hosts.
+ARTIFACT_BACKEND = os.getenv("ARTIFACT_BACKEND", "fs")
+ARTIFACT_DIR = Path(os.getenv("ARTIFACT_DIR", "cache/artifacts"))
+ARTIFACT_TTL = int(os.getenv("ARTIFACT_TTL", 24 * 3600))  # seconds
+REF_PREFIX = "sha256:"
+
+# One-byte codec tag in front of every stored blob
+_ZSTD, _LZ4, _ZLIB = b"Z", b"L", b"z"
+
+
+# ---------------- Compression ---------------- #
+def _compress(data: bytes) -> bytes:
+    if zstandard is not None:
+        return _ZSTD + zstandard.ZstdCompressor(level=3).compress(data)
+    if lz4_frame is not None:
+        return _LZ4 + lz4_frame.compress(data)
+    return _ZLIB + zlib.compress(data, 6)
+
+
+def _decompress(blob: bytes) -> bytes:
+    codec, payload = blob[:1], blob[1:]
+    if codec == _ZSTD:
+        return zstandard.ZstdDecompressor().decompress(payload)
+    if codec == _LZ4:
+        return lz4_frame.decompress(payload)
+    if codec == _ZLIB:
+        return zlib.decompress(payload)
+    raise ValueError(f"Unknown artifact codec {codec!r}")
+
+
+# ---------------- Backends ---------------- #
+def _path(digest: str) -> Path:
+    return ARTIFACT_DIR / digest[:2] / digest
+
+
+def _redis():
+    client = get_redis()
+    if client is None:
+        raise RuntimeError("ARTIFACT_BACKEND=redis but Redis is unavailable")
+    return client
+
+
+def _write(digest: str, blob: bytes, ttl: int) -> None:
+    if ARTIFACT_BACKEND == "redis":
+        # NX: identical content is already stored; only its expiry is refreshed
+        client = _redis()
+        if not client.set(f"artifact:{digest}", blob, ex=ttl, nx=True):
+            client.expire(f"artifact:{digest}", ttl)
+        return
+
+    path = _path(digest)
+    if not path.exists():
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{digest}.{os.getpid()}.tmp")
+        tmp.write_bytes(blob)
+        os.replace(tmp, path)  # readers never see a partial file
+    # mtime is shifted so purge_expired() removes the file `ttl` seconds from now
+    stamp = time.time() + ttl - ARTIFACT_TTL
+    os.utime(path, (stamp, stamp))
+
+
+def _read(digest: str) -> bytes:
+    if ARTIFACT_BACKEND == "redis":
+        blob = _redis().get(f"artifact:{digest}")
+    else:
+        path = _path(digest)
+        blob = path.read_bytes() if path.exists() else None
+    if blob is None:
+        raise KeyError(f"Artifact {REF_PREFIX}{digest} not found or expired")
+    return blob
+
+
+# ---------------- Public API ---------------- #
+def put_artifact(data: Union[bytes, str], ttl: int = ARTIFACT_TTL) -> str:
+    """Store bytes or text once and return its content-hash reference."""
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    digest = hashlib.sha256(data).hexdigest()
+    _write(digest, _compress(data), ttl)
+    return REF_PREFIX + digest
+
+
+def get_artifact(ref: str) -> bytes:
+    """Bytes stored under a reference returned by put_artifact()."""
+    if not ref.startswith(REF_PREFIX):
+        raise ValueError(f"Not an artifact reference: {ref!r}")
+    return _decompress(_read(ref[len(REF_PREFIX):]))
+
+
+def get_text(ref: str) -> str:
+    return get_artifact(ref).decode("utf-8")
+
+
+def put_json(value: Any, ttl: int = ARTIFACT_TTL) -> str:
+    return put_artifact(json.dumps(value, default=str), ttl)
+
+
+def get_json(ref: str) -> Any:
+    return json.loads(get_artifact(ref))
+
+
+def purge_expired() -> int:
+    """
+    Delete filesystem artifacts whose TTL has passed (see _write()). Redis
+    blobs expire on their own. Returns the number of files removed.
+    """
+    if ARTIFACT_BACKEND == "redis" or not ARTIFACT_DIR.exists():
+        return 0
+    cutoff = time.time() - ARTIFACT_TTL
+    removed = 0
+    for path in ARTIFACT_DIR.glob("*/*"):
+        try:
+            if path.stat().st_mtime < cutoff:
+                path.unlink()
+                removed += 1
+        except FileNotFoundError:
+            continue
+    return removed
@@ -0,0 +1,176 @@
+import os
+import time
+import zlib
+import sqlite3
+import hashlib
+import threading
+from pathlib import Path
+from typing import Optional, Union
+from urllib.parse import urlsplit, urlunsplit
+
+# ---------------- Config ---------------- #
+CORPUS_PATH = Path(os.getenv("CORPUS_DB_PATH", "summaries/corpus.db"))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS papers (
+    id           INTEGER PRIMARY KEY,
+    content_hash TEXT NOT NULL UNIQUE,
+    source_type  TEXT NOT NULL,
+    doi          TEXT,
+    url          TEXT,
+    filename     TEXT,
+    text         BLOB NOT NULL,
+    category     TEXT,
+    summary      TEXT,
+    citation     TEXT,
+    audio_path   TEXT,
+    profile      TEXT,
+    created_at   REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_papers_doi ON papers (doi);
+CREATE INDEX IF NOT EXISTS idx_papers_url ON papers (url);
+"""
+
+# Every DOI, URL and filename a paper was requested by -> its content hash.
+# The papers row only keeps the latest of each; lookups go through this table.
+ALIAS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS paper_aliases (
+    kind         TEXT NOT NULL,
+    value        TEXT NOT NULL,
+    content_hash TEXT NOT NULL,
+    PRIMARY KEY (kind, value)
+);
+"""
+ALIAS_KINDS = ("doi", "url", "filename")
+
+COLUMNS = ("id", "content_hash", "source_type", "doi", "url", "filename",
+           "text", "category", "summary", "citation", "audio_path", "profile", "created_at")
+
+_local = threading.local()
+
+
+# ---------------- Connection ---------------- #
+def _connect() -> sqlite3.Connection:
+    """One connection per thread; WAL lets readers proceed while a writer commits."""
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        CORPUS_PATH.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(CORPUS_PATH, timeout=10)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(SCHEMA)
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(papers)")}
+        if "profile" not in columns:  # databases created before generation profiles
+            conn.execute("ALTER TABLE papers ADD COLUMN profile TEXT")
+        has_aliases = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'paper_aliases'"
+        ).fetchone()
+        conn.executescript(ALIAS_SCHEMA)
+        if not has_aliases:  # databases created before aliases: seed from the latest identifiers
+            with conn:
+                for kind in ALIAS_KINDS:
+                    conn.execute(
+                        f"INSERT OR IGNORE INTO paper_aliases (kind, value, content_hash) "
+                        f"SELECT '{kind}', {kind}, content_hash FROM papers WHERE {kind} IS NOT NULL"
+                    )
+        _local.conn = conn
+    return conn
+
+
+# ---------------- Keys ---------------- #
+def content_hash(data: Union[bytes, str]) -> str:
+    """SHA-256 of raw upload bytes or of extracted text."""
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    return hashlib.sha256(data).hexdigest()
+
+
+def normalize_url(url: str) -> str:
+    """Lowercase scheme and host, drop the fragment and trailing slash."""
+    parts = urlsplit(url.strip())
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, parts.query, ""))
+
+
+def _to_record(row: tuple) -> dict:
+    record = dict(zip(COLUMNS, row))
+    record["text"] = zlib.decompress(record["text"]).decode("utf-8")
+    return record
+
+
+# ---------------- Lookups ---------------- #
+def find_paper(content_hash: str = None, doi: str = None, url: str = None) -> Optional[dict]:
+    """
+    Return the stored record matching any of the given keys, or None.
+    Keys are checked in order: content hash, DOI, URL. A DOI or URL matches
+    every alias ever saved for the paper, not only the latest one.
+    """
+    conn = _connect()
+    select = f"SELECT {', '.join(COLUMNS)} FROM papers"
+    if content_hash:
+        row = conn.execute(f"{select} WHERE content_hash = ?", [content_hash]).fetchone()
+        if row:
+            return _to_record(row)
+    for kind, value in (("doi", doi), ("url", url and normalize_url(url))):
+        if not value:
+            continue
+        row = conn.execute(
+            f"{select} WHERE content_hash = "
+            "(SELECT content_hash FROM paper_aliases WHERE kind = ? AND value = ?)",
+            [kind, value]
+        ).fetchone()
+        if row:
+            return _to_record(row)
+    return None
+
+
+def save_paper(record: dict) -> int:
+    """
+    Insert or update a processed paper keyed by its content hash. DOI, URL and
+    filename are recorded as aliases so one stored result serves every identifier
+    seen for it; agent outputs are replaced when the record was re-processed
+    with a new profile.
+    """
+    conn = _connect()
+    url = record.get("url")
+    audio_path = record.get("audio_path")
+    values = (
+        record["content_hash"],
+        record["source_type"],
+        record.get("doi"),
+        normalize_url(url) if url else None,
+        record.get("filename"),
+        zlib.compress(record["text"].encode("utf-8"), 6),
+        record.get("category"),
+        record.get("summary"),
+        record.get("citation"),
+        str(audio_path) if audio_path else None,
+        record.get("profile"),
+        time.time()
+    )
+    with conn:
+        cursor = conn.execute(
+            """
+            INSERT INTO papers (content_hash, source_type, doi, url, filename, text,
+                                category, summary, citation, audio_path, profile, created_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(content_hash) DO UPDATE SET
+                doi = COALESCE(excluded.doi, papers.doi),
+                url = COALESCE(excluded.url, papers.url),
+                filename = COALESCE(excluded.filename, papers.filename),
+                category = COALESCE(excluded.category, papers.category),
+                summary = COALESCE(excluded.summary, papers.summary),
+                citation = COALESCE(excluded.citation, papers.citation),
+                audio_path = COALESCE(excluded.audio_path, papers.audio_path),
+                profile = COALESCE(excluded.profile, papers.profile)
+            RETURNING id
+            """,
+            values
+        )
+        paper_id = cursor.fetchone()[0]
+        aliases = [(kind, value, record["content_hash"])
+                   for kind, value in zip(ALIAS_KINDS, (values[2], values[3], values[4])) if value]
+        conn.executemany(
+            "INSERT OR REPLACE INTO paper_aliases (kind, value, content_hash) VALUES (?, ?, ?)", aliases
+        )
+        return paper_id
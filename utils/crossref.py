@@ -0,0 +1,119 @@
+import os
+import json
+import time
+import sqlite3
+import requests
+from pathlib import Path
+from typing import Dict, List, Optional
+from utils.rate_limiter import rate_limited_get
+
+# ---------------- Config ---------------- #
+CROSSREF_API = "https://api.crossref.org/works"
+CACHE_PATH = Path(os.getenv("CROSSREF_CACHE_PATH", "cache/crossref.db"))
+CACHE_TTL = int(os.getenv("CROSSREF_CACHE_TTL", 7 * 24 * 3600))  # seconds
+BULK_CHUNK_SIZE = 50  # DOIs per filter query, keeps the URL well under length limits
+
+
+# ---------------- Cache ---------------- #
+def _connect() -> sqlite3.Connection:
+    CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(CACHE_PATH, timeout=10)
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS works ("
+        "doi TEXT PRIMARY KEY, fetched_at REAL NOT NULL, data TEXT NOT NULL)"
+    )
+    return conn
+
+
+def normalize_doi(doi: str) -> str:
+    """DOIs are case-insensitive; strip resolver prefixes and lowercase."""
+    doi = doi.strip()
+    for prefix in ("https://doi.org/", "http://doi.org/", "https://dx.doi.org/", "http://dx.doi.org/", "doi:"):
+        if doi.lower().startswith(prefix):
+            doi = doi[len(prefix):]
+    return doi.lower()
+
+
+def _cache_get(dois: List[str]) -> Dict[str, dict]:
+    if not dois:
+        return {}
+    cutoff = time.time() - CACHE_TTL
+    placeholders = ",".join("?" for _ in dois)
+    with _connect() as conn:
+        rows = conn.execute(
+            f"SELECT doi, data FROM works WHERE fetched_at >= ? AND doi IN ({placeholders})",
+            [cutoff, *dois]
+        ).fetchall()
+    return {doi: json.loads(data) for doi, data in rows}
+
+
+def _cache_put(records: Dict[str, dict]) -> None:
+    if not records:
+        return
+    now = time.time()
+    with _connect() as conn:
+        conn.executemany(
+            "INSERT OR REPLACE INTO works (doi, fetched_at, data) VALUES (?, ?, ?)",
+            [(doi, now, json.dumps(data)) for doi, data in records.items()]
+        )
+
+
+def purge_expired() -> int:
+    """Delete cache rows older than the TTL. Returns the number of rows removed."""
+    with _connect() as conn:
+        return conn.execute("DELETE FROM works WHERE fetched_at < ?", [time.time() - CACHE_TTL]).rowcount
+
+
+# ---------------- Lookups ---------------- #
+def get_work(doi: str) -> Optional[dict]:
+    """
+    Return the Crossref `message` record for a DOI, served from the local
+    cache when fresh. Returns None when the DOI cannot be resolved.
+    """
+    doi = normalize_doi(doi)
+    cached = _cache_get([doi])
+    if doi in cached:
+        return cached[doi]
+
+    try:
+        response = rate_limited_get(f"{CROSSREF_API}/{doi}", timeout=15)
+        if response.status_code != 200:
+            return None
+        record = response.json()["message"]
+    except (requests.RequestException, ValueError, KeyError) as e:
+        print(f"⚠️ Crossref lookup failed for {doi}: {e}")
+        return None
+
+    _cache_put({doi: record})
+    return record
+
+
+def get_works(dois: List[str]) -> Dict[str, dict]:
+    """
+    Resolve many DOIs at once. Cached records are returned directly and the
+    misses are fetched with Crossref's multi-DOI filter query, BULK_CHUNK_SIZE
+    DOIs per request. DOIs that cannot be resolved are absent from the result.
+    """
+    wanted = list(dict.fromkeys(normalize_doi(d) for d in dois if d and d.strip()))
+    records = _cache_get(wanted)
+    missing = [doi for doi in wanted if doi not in records]
+
+    for i in range(0, len(missing), BULK_CHUNK_SIZE):
+        chunk = missing[i:i + BULK_CHUNK_SIZE]
+        params = {
+            "filter": ",".join(f"doi:{doi}" for doi in chunk),
+            "rows": len(chunk)
+        }
+        try:
+            response = rate_limited_get(CROSSREF_API, params=params, timeout=30)
+            response.raise_for_status()
+            items = response.json()["message"].get("items", [])
+        except (requests.RequestException, ValueError, KeyError) as e:
+            print(f"⚠️ Crossref bulk lookup failed for {len(chunk)} DOIs: {e}")
+            continue
+
+        fetched = {normalize_doi(item["DOI"]): item for item in items if item.get("DOI")}
+        _cache_put(fetched)
+        records.update(fetched)
+
+    return records
@@ -0,0 +1,282 @@
+import os
+import re
+from array import array
+from statistics import median
+from typing import Iterable, Iterator, List, Optional, Union
+import fitz  # PyMuPDF
+
+BOLD_FLAG = 16  # PyMuPDF span flag bit for bold fonts
+# Text-only extraction: without TEXT_PRESERVE_IMAGES PyMuPDF doesn't copy each
+# page's image bytes into the result dict only for us to skip them
+TEXT_FLAGS = fitz.TEXTFLAGS_DICT & ~fitz.TEXT_PRESERVE_IMAGES
+
+# ---------------- Sections ---------------- #
+# Heading text -> section kind. Checked in order against short heading blocks
+# with any "1.", "II." or "A." numbering removed.
+SECTION_PATTERNS = [
+    ("abstract", r"abstract|summary"),
+    ("introduction", r"introduction|overview"),
+    ("background", r"background|related work|literature review|preliminaries"),
+    ("methods", r"methods?|methodology|materials and methods|approach|experimental (setup|design)|study design|data( and methods)?"),
+    ("results", r"results?|experiments?|evaluation|findings|results and discussion"),
+    ("discussion", r"discussion|analysis|limitations"),
+    ("conclusion", r"conclusions?|concluding remarks|future work|conclusions? and future work"),
+    ("acknowledgments", r"acknowledge?ments?|funding|author contributions|conflicts? of interest|competing interests"),
+    ("references", r"references|bibliography|works cited|literature cited"),
+    ("appendix", r"appendix( [a-z0-9]+)?|appendices|supplementary( material| information)?"),
+]
+SECTION_KINDS = [kind for kind, _ in SECTION_PATTERNS] + ["front", "body"]
+
+# Not sent to the summarizer unless a route asks for them explicitly
+DEFAULT_EXCLUDED_SECTIONS = frozenset({"front", "acknowledgments", "references", "appendix"})
+
+_NUMBERING = re.compile(r"^\s*(?:[0-9]+(?:\.[0-9]+)*|[IVXLC]+|[A-Z])[.):]?\s+")
+_HEADING_RES = [(kind, re.compile(rf"^(?:{pattern})\s*[:.]?$", re.IGNORECASE)) for kind, pattern in SECTION_PATTERNS]
+_INLINE_ABSTRACT = re.compile(r"^abstract\s*[-—–:.]", re.IGNORECASE)
+MAX_HEADING_CHARS = 80
+
+# Plain-text abstracts: an "Abstract" label near the top of the text, running
+# to the keywords, the introduction, or MAX_ABSTRACT_WORDS
+_ABSTRACT_LABEL = re.compile(r"^[ \t]*abstract\b[ \t]*[-—–:.]?[ \t]*", re.IGNORECASE | re.MULTILINE)
+_ABSTRACT_END = re.compile(r"^[ \t]*(?:keywords|key words|index terms|(?:[0-9]+|I)\.?[ \t]+introduction|introduction)\b",
+                           re.IGNORECASE | re.MULTILINE)
+ABSTRACT_SEARCH_CHARS = 20000
+MAX_ABSTRACT_WORDS = 500
+
+
+def heading_kind(text: str) -> Optional[str]:
+    """Section kind for a heading line such as "3. Materials and Methods", or None."""
+    text = _NUMBERING.sub("", text.strip().splitlines()[0] if text.strip() else "")
+    for kind, pattern in _HEADING_RES:
+        if pattern.match(text.strip()):
+            return kind
+    return None
+
+
+def is_table_like(text: str) -> bool:
+    """Blocks that are mostly numbers and symbols (table cells, axis labels)."""
+    compact = re.sub(r"\s+", "", text)
+    if len(compact) < 20:
+        return False
+    letters = sum(ch.isalpha() for ch in compact)
+    return letters / len(compact) < 0.5
+
+
+def parse_sections(value: Optional[str]) -> Optional[List[str]]:
+    """Comma-separated section kinds from a query parameter; None when not given."""
+    if not value:
+        return None
+    kinds = [kind.strip().lower() for kind in value.split(",") if kind.strip()]
+    unknown = [kind for kind in kinds if kind not in SECTION_KINDS]
+    if unknown:
+        raise ValueError(f"Unknown section(s) {', '.join(unknown)}. Use any of: {', '.join(SECTION_KINDS)}.")
+    return kinds
+
+
+def find_abstract(text: str) -> str:
+    """Abstract of a plain text (web page, extracted PDF) after its "Abstract" label, or ""."""
+    head = text[:ABSTRACT_SEARCH_CHARS]
+    label = _ABSTRACT_LABEL.search(head)
+    if not label:
+        return ""
+    end = _ABSTRACT_END.search(head, label.end())
+    words = head[label.end():end.start() if end else None].split()
+    return " ".join(words[:MAX_ABSTRACT_WORDS])
+
+
+class Section:
+    """A named span of the document text, [start, end) in character offsets."""
+    __slots__ = ("title", "kind", "start", "end")
+
+    def __init__(self, title: str, kind: str, start: int, end: int):
+        self.title = title
+        self.kind = kind
+        self.start = start
+        self.end = end
+
+    def __repr__(self) -> str:
+        return f"Section({self.kind!r}, {self.title!r}, {self.start}:{self.end})"
+
+
+class Document:
+    """
+    A PDF parsed once with PyMuPDF and shared by every agent.
+
+    The full text is stored as one string; pages and layout blocks are
+    columns of compact arrays holding offsets into it, so slicing a page or
+    block never copies more than the slice itself. Blocks keep their page,
+    font size and bold flag for section detection.
+    """
+    __slots__ = ("text", "page_starts", "block_page", "block_start", "block_end",
+                 "block_font_size", "block_bold", "sections", "metadata", "source")
+
+    def __init__(self, source: str = ""):
+        self.text = ""
+        self.page_starts = array("l")
+        self.block_page = array("l")
+        self.block_start = array("l")
+        self.block_end = array("l")
+        self.block_font_size = array("f")
+        self.block_bold = array("b")
+        self.sections: List[Section] = []
+        self.metadata = {}
+        self.source = source
+
+    # ---------------- Building ---------------- #
+    @classmethod
+    def from_pdf(cls, pdf: Union[str, bytes], source: str = None) -> "Document":
+        """Parse a PDF from a path or raw bytes."""
+        if isinstance(pdf, (bytes, bytearray)):
+            document = cls(source or "upload.pdf")
+            opened = fitz.open(stream=pdf, filetype="pdf")
+        else:
+            document = cls(source or os.path.basename(str(pdf)))
+            opened = fitz.open(pdf)
+
+        parts, offset = [], 0
+        with opened as pdf_doc:
+            document.metadata = dict(pdf_doc.metadata or {})
+            for page_no, page in enumerate(pdf_doc):
+                document.page_starts.append(offset)
+                for block in page.get_text("dict", flags=TEXT_FLAGS)["blocks"]:
+                    if block.get("type") != 0:  # image placeholders
+                        continue
+                    lines, sizes, bold_chars, chars = [], [], 0, 0
+                    for line in block["lines"]:
+                        spans = line["spans"]
+                        lines.append("".join(span["text"] for span in spans))
+                        for span in spans:
+                            n = len(span["text"].strip())
+                            chars += n
+                            sizes.append(span["size"])
+                            if span["flags"] & BOLD_FLAG:
+                                bold_chars += n
+                    block_text = "\n".join(lines).strip()
+                    if not block_text:
+                        continue
+                    parts.append(block_text + "\n")
+                    document.block_page.append(page_no)
+                    document.block_start.append(offset)
+                    document.block_end.append(offset + len(block_text))
+                    document.block_font_size.append(max(sizes) if sizes else 0.0)
+                    document.block_bold.append(1 if chars and bold_chars * 2 > chars else 0)
+                    offset += len(block_text) + 1
+
+        document.text = "".join(parts)
+        document.sections = detect_sections(document)
+        return document
+
+    # ---------------- Access ---------------- #
+    @property
+    def page_count(self) -> int:
+        return len(self.page_starts)
+
+    @property
+    def block_count(self) -> int:
+        return len(self.block_start)
+
+    def page_text(self, page_no: int) -> str:
+        start = self.page_starts[page_no]
+        end = self.page_starts[page_no + 1] if page_no + 1 < self.page_count else len(self.text)
+        return self.text[start:end]
+
+    def block_text(self, i: int) -> str:
+        return self.text[self.block_start[i]:self.block_end[i]]
+
+    def iter_blocks(self) -> Iterator[tuple]:
+        """(index, page, font size, bold, text) for every text block in reading order."""
+        for i in range(self.block_count):
+            yield i, self.block_page[i], self.block_font_size[i], bool(self.block_bold[i]), self.block_text(i)
+
+    def section_text(self, section: Section) -> str:
+        return self.text[section.start:section.end]
+
+    def section_kinds(self) -> List[str]:
+        return list(dict.fromkeys(section.kind for section in self.sections))
+
+    def abstract_text(self) -> str:
+        """Text of the detected abstract section, else of an "Abstract" label in the text, or ""."""
+        for section in self.sections:
+            if section.kind == "abstract":
+                heading, _, rest = self.section_text(section).partition("\n")
+                if heading_kind(heading) != "abstract":  # "Abstract — ..." paragraph
+                    rest = _INLINE_ABSTRACT.sub("", heading) + "\n" + rest
+                return " ".join(rest.split())
+        return find_abstract(self.text)
+
+    def select_text(self, include: Iterable[str] = None,
+                    exclude: Iterable[str] = DEFAULT_EXCLUDED_SECTIONS) -> str:
+        """
+        Text of the chosen sections with table-like blocks dropped. `include`
+        lists the section kinds to keep; otherwise every section not in
+        `exclude`. Falls back to the whole text when nothing would be left.
+        """
+        include, exclude = set(include or ()), set(exclude or ())
+        if "abstract" not in self.section_kinds():
+            exclude.discard("front")  # the abstract is somewhere in the unlabeled front matter
+        chosen = [s for s in self.sections if (s.kind in include if include else s.kind not in exclude)]
+        parts, b = [], 0
+        for section in chosen:
+            while b < self.block_count and self.block_start[b] < section.start:
+                b += 1
+            i = b
+            while i < self.block_count and self.block_start[i] < section.end:
+                block = self.block_text(i)
+                if not is_table_like(block):
+                    parts.append(block)
+                i += 1
+        return "\n".join(parts) if parts else self.text
+
+    # ---------------- Metadata ---------------- #
+    def citation_metadata(self) -> dict:
+        """Title, author, year and source in the shape the citation agent expects."""
+        created = self.metadata.get("creationDate") or ""  # "D:YYYYMMDD..."
+        year = created[2:6] if created.startswith("D:") and created[2:6].isdigit() else "n.d."
+        return {
+            "title": (self.metadata.get("title") or "Untitled").strip(),
+            "author": (self.metadata.get("author") or "Unknown Author").strip(),
+            "year": year,
+            "source": self.source
+        }
+
+
+def detect_sections(document: Document) -> List[Section]:
+    """
+    Split a Document into sections at heading blocks. A heading is a short
+    block that names a known section and is set larger or bolder than the
+    body text (or is numbered); body size is the median block font size.
+    Text before the first heading is "front" matter (title, authors,
+    affiliations). An "Abstract —" paragraph opens the abstract section.
+    """
+    end = len(document.text)
+    if not document.block_count:
+        return [Section("Body", "body", 0, end)]
+    body_size = median(document.block_font_size)
+
+    boundaries = []  # (offset, title, kind)
+    for i, page, size, bold, text in document.iter_blocks():
+        first_line = text.split("\n", 1)[0].strip()
+        if _INLINE_ABSTRACT.match(first_line):
+            boundaries.append((document.block_start[i], "Abstract", "abstract"))
+            continue
+        if len(text) > MAX_HEADING_CHARS:
+            continue
+        kind = heading_kind(text)
+        if kind and (size >= body_size * 1.1 or bold or _NUMBERING.match(first_line) or first_line.isupper()):
+            boundaries.append((document.block_start[i], first_line, kind))
+
+    if not boundaries:
+        return [Section("Body", "body", 0, end)]
+
+    sections = []
+    if boundaries[0][0] > 0:
+        sections.append(Section("Front matter", "front", 0, boundaries[0][0]))
+    for n, (start, title, kind) in enumerate(boundaries):
+        stop = boundaries[n + 1][0] if n + 1 < len(boundaries) else end
+        sections.append(Section(title, kind, start, stop))
+    return sections
+
+
+def parse_pdf(pdf: Union[str, bytes], source: str = None) -> Document:
+    """Parse a PDF (path or bytes) into a Document."""
+    return Document.from_pdf(pdf, source)
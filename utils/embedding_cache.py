@@ -0,0 +1,142 @@
+import os
+import re
+import fcntl
+import hashlib
+import threading
+import numpy as np
+from pathlib import Path
+from typing import Dict, List
+from utils.resource_governor import run_inference
+
+# ---------------- Config ---------------- #
+CACHE_DIR = Path(os.getenv("EMBEDDING_CACHE_DIR", "cache/embeddings"))
+DIGEST_SIZE = 32  # raw SHA-256 bytes per key
+
+
+class EmbeddingCache:
+    """
+    Append-only cache of float32 embeddings for one encoder model, keyed by
+    the SHA-256 of the encoded text.
+
+    Layout inside `directory` (one directory per model):
+        vectors.f32  row-major float32 matrix, memory-mapped read-only
+        keys.bin     one raw 32-byte digest per row, same order as vectors
+
+    Every process maps the same files, so the vectors live once in the page
+    cache. The digest -> row index is rebuilt incrementally from keys.bin.
+    """
+
+    def __init__(self, model_name: str, dim: int, directory: Path = None):
+        slug = re.sub(r"[^A-Za-z0-9_.-]+", "_", model_name)
+        self.directory = Path(directory or CACHE_DIR / slug)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.dim = dim
+        self.vectors_path = self.directory / "vectors.f32"
+        self.keys_path = self.directory / "keys.bin"
+        self.lock_path = self.directory / ".lock"
+
+        self._lock = threading.RLock()
+        self._rows: Dict[bytes, int] = {}
+        self._key_count = 0
+        self._vectors = None
+        self._refresh()
+
+    def _refresh(self) -> None:
+        """Pick up rows appended by this or another process."""
+        with self._lock:
+            if self.keys_path.exists():
+                with open(self.keys_path, "rb") as f:
+                    f.seek(self._key_count * DIGEST_SIZE)
+                    data = f.read()
+                for start in range(0, len(data) - DIGEST_SIZE + 1, DIGEST_SIZE):
+                    self._rows.setdefault(data[start:start + DIGEST_SIZE], self._key_count)
+                    self._key_count += 1
+
+            size = self.vectors_path.stat().st_size if self.vectors_path.exists() else 0
+            rows = min(size // (self.dim * 4), self._key_count)
+            if rows and (self._vectors is None or self._vectors.shape[0] != rows):
+                self._vectors = np.memmap(self.vectors_path, dtype=np.float32, mode="r", shape=(rows, self.dim))
+
+    def __len__(self) -> int:
+        return 0 if self._vectors is None else self._vectors.shape[0]
+
+    @staticmethod
+    def key(text: str) -> bytes:
+        return hashlib.sha256(text.encode("utf-8")).digest()
+
+    def get_many(self, keys: List[bytes]) -> List[np.ndarray]:
+        """Cached vector (a copy) for each key, or None where it is missing."""
+        with self._lock:
+            if any(k not in self._rows for k in keys):
+                self._refresh()
+            limit = len(self)
+            return [
+                np.array(self._vectors[self._rows[k]]) if self._rows.get(k, limit) < limit else None
+                for k in keys
+            ]
+
+    def put_many(self, keys: List[bytes], vectors: np.ndarray) -> None:
+        """Append vectors for keys not stored yet."""
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(-1, self.dim)
+        with self._lock, open(self.lock_path, "w") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            self._refresh()
+            fresh, seen = [], set()
+            for k, v in zip(keys, vectors):
+                if k not in self._rows and k not in seen:
+                    fresh.append((k, v))
+                    seen.add(k)
+            if not fresh:
+                return
+
+            # Vectors first, then keys: a key on disk always has its vector.
+            # Truncating drops bytes left by a writer that died mid-append.
+            rows = self._key_count
+            with open(self.vectors_path, "ab") as f:
+                f.truncate(rows * self.dim * 4)
+                f.write(np.stack([v for _, v in fresh]).tobytes())
+            with open(self.keys_path, "ab") as f:
+                f.truncate(rows * DIGEST_SIZE)
+                f.write(b"".join(k for k, _ in fresh))
+            self._refresh()
+
+
+_caches: Dict[str, EmbeddingCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_cache(model_name: str, dim: int) -> EmbeddingCache:
+    with _caches_lock:
+        if model_name not in _caches:
+            _caches[model_name] = EmbeddingCache(model_name, dim)
+        return _caches[model_name]
+
+
+def cached_encode(model, model_name: str, texts: List[str], normalize: bool = False) -> np.ndarray:
+    """
+    SentenceTransformer.encode() through the embedding cache: texts seen
+    before are read from the memory-mapped file, the rest are encoded in one
+    batched call and appended. Returns a float32 (len(texts), dim) array.
+    """
+    cache = get_cache(model_name, model.get_sentence_embedding_dimension())
+    keys = [cache.key(text) for text in texts]
+    vectors = cache.get_many(keys)
+
+    # First position of each distinct uncached text; duplicates are encoded once
+    missing = {}
+    for i, v in enumerate(vectors):
+        if v is None:
+            missing.setdefault(keys[i], i)
+    if missing:
+        positions = list(missing.values())
+        encoded = run_inference(model.encode, [texts[i] for i in positions], convert_to_numpy=True)
+        encoded = np.asarray(encoded, dtype=np.float32)
+        cache.put_many(list(missing), encoded)
+        by_key = dict(zip(missing, encoded))
+        vectors = [v if v is not None else by_key[k] for k, v in zip(keys, vectors)]
+
+    matrix = np.stack(vectors) if vectors else np.empty((0, cache.dim), dtype=np.float32)
+    if normalize:
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        matrix = matrix / np.where(norms == 0, 1.0, norms)
+    return matrix
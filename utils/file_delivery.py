@@ -0,0 +1,98 @@
+import re
+import os
+from pathlib import Path
+from email.utils import formatdate
+from typing import Iterator, Optional, Tuple
+
+# ---------------- Config ---------------- #
+CHUNK_SIZE = 64 * 1024
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+
+# Files named by content hash never change, so clients may cache them forever
+CONTENT_ADDRESSED = re.compile(r"^[0-9a-f]{32}\.[a-z0-9]+$")
+_RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+class RangeNotSatisfiable(ValueError):
+    pass
+
+
+def file_etag(path: Path, stat: os.stat_result) -> str:
+    if CONTENT_ADDRESSED.match(path.name):
+        return f'"{path.stem}"'
+    return f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    Inclusive (start, end) for a single "bytes=" range, or None to send the
+    whole file (no header, or a multi-range request, which we don't split).
+    Raises RangeNotSatisfiable for ranges outside the file.
+    """
+    if not header or "," in header:
+        return None
+    match = _RANGE.match(header.strip())
+    if not match or match.groups() == ("", ""):
+        return None
+    first, last = match.groups()
+    if first == "":  # suffix range: the last N bytes
+        length = int(last)
+        if length == 0 or size == 0:
+            raise RangeNotSatisfiable(header)
+        return max(0, size - length), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise RangeNotSatisfiable(header)
+    return start, end
+
+
+def iter_file(path: Path, start: int, end: int) -> Iterator[bytes]:
+    """Bytes start..end (inclusive) of a file in CHUNK_SIZE pieces."""
+    with open(path, "rb") as f:
+        f.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = f.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+def prepare_file_response(path: Path, range_header: str = None, if_none_match: str = None,
+                          if_range: str = None) -> Tuple[int, dict, Optional[Tuple[int, int]]]:
+    """
+    Status, headers and byte range (or None for no body) for serving `path`
+    with conditional GET and single byte-range support.
+    """
+    stat = path.stat()
+    size = stat.st_size
+    etag = file_etag(path, stat)
+    headers = {
+        "ETag": etag,
+        "Accept-Ranges": "bytes",
+        "Last-Modified": formatdate(stat.st_mtime, usegmt=True),
+        "Cache-Control": (f"public, max-age={IMMUTABLE_MAX_AGE}, immutable"
+                          if CONTENT_ADDRESSED.match(path.name) else "no-cache"),
+    }
+
+    # If-None-Match uses weak comparison, so W/"x" matches "x"
+    if if_none_match and ({tag.strip().removeprefix("W/") for tag in if_none_match.split(",")} & {etag, "*"}):
+        return 304, headers, None
+
+    # If-Range: only honour the range when the client's copy is still current
+    if if_range and if_range.strip() != etag:
+        range_header = None
+
+    try:
+        byte_range = parse_range(range_header, size)
+    except RangeNotSatisfiable:
+        return 416, {**headers, "Content-Range": f"bytes */{size}"}, None
+
+    if byte_range is None:
+        return 200, {**headers, "Content-Length": str(size)}, (0, size - 1) if size else None
+
+    start, end = byte_range
+    headers.update({"Content-Range": f"bytes {start}-{end}/{size}", "Content-Length": str(end - start + 1)})
+    return 206, headers, byte_range
@@ -2,6 +2,7 @@ import os
 from fastapi import UploadFile
 import requests
 from PyPDF2 import PdfReader
+from utils.tracing import traced
 
 # ---------------- File Upload Helper ---------------- #
 def save_uploaded_file(file: UploadFile, directory: str = "uploads") -> str:
@@ -27,6 +28,7 @@ def save_uploaded_file(file: UploadFile, directory: str = "uploads") -> str:
     return path
 
 # ---------------- Extract Data from DOI ---------------- #
+@traced("helpers.extract_from_doi")
 def extract_from_doi(doi: str) -> str:
     """
     Extracts data from a DOI (Digital Object Identifier) by making a request to the DOI API.
@@ -48,6 +50,7 @@ def extract_from_doi(doi: str) -> str:
         return f"Error fetching DOI: {str(e)}"
 
 # ---------------- Extract Data from URL ---------------- #
+@traced("helpers.extract_from_url")
 def extract_from_url(url: str) -> str:
     """
     Extracts content from a URL.
@@ -104,33 +107,12 @@ def clean_text(text: str) -> str:
     # You can add more cleaning steps like removing special characters, etc.
     return text
 
-import requests
-from bs4 import BeautifulSoup
-import re
+from utils.html_extract import fetch_html, extract_paper_metadata
 
 def search_paper_by_url(url: str) -> dict:
     try:
-        headers = {"User-Agent": "Mozilla/5.0"}
-        response = requests.get(url, headers=headers)
-        response.raise_for_status()
-
-        soup = BeautifulSoup(response.content, 'html.parser')
-
-        title = soup.find('h1', {'class': 'paper-title'}).get_text(strip=True) if soup.find('h1', {'class': 'paper-title'}) else 'No Title Found'
-        authors = [author.get_text(strip=True) for author in soup.find_all('a', {'class': 'author-name'})]
-        abstract_tag = soup.find("meta", {"name": "description"}) or soup.find("div", {"class": "abstract"})
-        abstract = (
-            abstract_tag.get("content") if abstract_tag and "content" in abstract_tag.attrs
-            else abstract_tag.get_text() if abstract_tag else soup.get_text()
-        )
-        abstract = re.sub(r'\s+', ' ', abstract).strip()
-
-        return {
-            'title': title,
-            'url': url,
-            'authors': authors,
-            'abstract': abstract
-        }
+        content, final_url = fetch_html(url)
+        return extract_paper_metadata(content, final_url)
 
     except requests.exceptions.RequestException as e:
         print(f"Error during request to {url}: {e}")
@@ -0,0 +1,223 @@
+import re
+import httpx
+import lxml.html
+from lxml import etree
+from typing import Optional, Tuple
+from urllib.parse import urlparse
+from utils.rate_limiter import rate_limited_get, acquire_async
+from utils.tracing import span
+
+# ---------------- Config ---------------- #
+MAX_HTML_BYTES = 5 * 1024 * 1024  # stop downloading pages larger than this
+CHUNK_SIZE = 64 * 1024
+
+BROWSER_HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+        "AppleWebKit/537.36 (KHTML, like Gecko) "
+        "Chrome/120.0.0.0 Safari/537.36"
+    )
+}
+
+# Comments, processing instructions and blank text never reach the tree
+_PARSER = lxml.html.HTMLParser(remove_comments=True, remove_pis=True, remove_blank_text=True)
+# Tags whose text is never paper content. <form> is kept: ASP.NET publisher
+# sites wrap the whole page in one. <header> is only noise as the site banner
+# (a direct child of <body>); article templates put title and abstract in theirs.
+_NOISE_TAGS = ("script", "style", "noscript", "svg", "nav", "footer", "iframe")
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+# ---------------- Fetching ---------------- #
+def _check_response(status_code: int, content_type: str) -> None:
+    if status_code >= 400:
+        raise ValueError(f"❌ Failed to fetch content. HTTP {status_code}")
+    if "text/html" not in content_type:
+        raise ValueError("⚠️ URL does not point to an HTML page.")
+
+
+def fetch_html(url: str, max_bytes: int = MAX_HTML_BYTES) -> Tuple[bytes, str]:
+    """
+    Stream an HTML page, reading at most `max_bytes`.
+
+    :return: (content, final_url) after redirects.
+    :raises ValueError: on HTTP errors or non-HTML responses.
+    """
+    with rate_limited_get(url, headers=BROWSER_HEADERS, timeout=20, allow_redirects=True, stream=True) as response:
+        _check_response(response.status_code, response.headers.get("Content-Type", ""))
+        body = bytearray()
+        for chunk in response.iter_content(CHUNK_SIZE):
+            body += chunk
+            if len(body) >= max_bytes:
+                break
+        return bytes(body[:max_bytes]), response.url
+
+
+async def fetch_html_async(client: httpx.AsyncClient, url: str, max_bytes: int = MAX_HTML_BYTES) -> Tuple[bytes, str]:
+    """Async variant of fetch_html() for an existing httpx client."""
+    with span(f"GET {urlparse(url).hostname or ''}", url=url) as s:
+        await acquire_async(url)
+        async with client.stream("GET", url, headers=BROWSER_HEADERS, timeout=20, follow_redirects=True) as response:
+            if s is not None:
+                s.set(status=response.status_code)
+            _check_response(response.status_code, response.headers.get("Content-Type", ""))
+            body = bytearray()
+            async for chunk in response.aiter_bytes(CHUNK_SIZE):
+                body += chunk
+                if len(body) >= max_bytes:
+                    break
+            return bytes(body[:max_bytes]), str(response.url)
+
+
+# ---------------- Parsing helpers ---------------- #
+def parse_html(content: bytes):
+    """Parse with lxml's C parser and drop non-content elements."""
+    tree = lxml.html.fromstring(content, parser=_PARSER)
+    etree.strip_elements(tree, *_NOISE_TAGS, with_tail=False)
+    for banner in tree.xpath("/html/body/header"):
+        banner.drop_tree()
+    return tree
+
+
+def _text(element) -> str:
+    return _WHITESPACE.sub(" ", " ".join(element.itertext())).strip()
+
+
+def _first_text(tree, xpath: str) -> str:
+    nodes = tree.xpath(xpath)
+    return _text(nodes[0]) if nodes else ""
+
+
+def _meta(tree, *names: str) -> str:
+    """First non-empty <meta name|property=...> content among `names`."""
+    for name in names:
+        values = tree.xpath(f"//meta[@name='{name}' or @property='{name}']/@content")
+        for value in values:
+            if value.strip():
+                return _WHITESPACE.sub(" ", value).strip()
+    return ""
+
+
+def _has_class(name: str) -> str:
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+# ---------------- Site extractors ---------------- #
+def _extract_arxiv(tree) -> str:
+    abstract = tree.xpath(f"//blockquote[{_has_class('abstract')}]")
+    if not abstract:
+        return ""
+    for descriptor in abstract[0].xpath(f".//span[{_has_class('descriptor')}]"):
+        descriptor.drop_tree()  # the "Abstract:" label
+    title = _first_text(tree, f"//h1[{_has_class('title')}]")
+    title = re.sub(r"^Title:\s*", "", title)
+    return " ".join(part for part in (title, _text(abstract[0])) if part)
+
+
+def _extract_pubmed(tree) -> str:
+    title = _first_text(tree, f"//h1[{_has_class('heading-title')}]")
+    abstract = _first_text(tree, f"//div[@id='abstract'] | //div[{_has_class('abstract-content')}]")
+    return " ".join(part for part in (title, abstract) if part)
+
+
+def _extract_publisher(tree) -> str:
+    """Highwire/Dublin Core meta tags that most publisher landing pages emit."""
+    abstract = _meta(tree, "citation_abstract", "dc.description", "DC.Description", "og:description")
+    if not abstract:
+        return ""
+    title = _meta(tree, "citation_title", "dc.title", "DC.Title")
+    return " ".join(part for part in (title, abstract) if part)
+
+
+def _extract_generic(tree) -> str:
+    full_text = tree.xpath(f"//div[{_has_class('papercontent')}]")
+    if full_text:
+        return _text(full_text[0])
+
+    content_parts = []
+    description = _meta(tree, "description")
+    if description:
+        content_parts.append(description)
+    abstract = tree.xpath("//div[contains(translate(@class, 'ABSTRACT', 'abstract'), 'abstract')]")
+    if abstract:
+        content_parts.append(_text(abstract[0]))
+    paragraphs = tree.xpath("//p")[:5]
+    if paragraphs:
+        content_parts.append(" ".join(_text(p) for p in paragraphs))
+    return " ".join(content_parts)
+
+
+SITE_EXTRACTORS = {
+    "arxiv.org": _extract_arxiv,
+    "export.arxiv.org": _extract_arxiv,
+    "pubmed.ncbi.nlm.nih.gov": _extract_pubmed,
+}
+
+
+# ---------------- Public API ---------------- #
+def extract_text_from_html(content: bytes, url: Optional[str] = None) -> str:
+    """
+    Pull the readable paper text out of an HTML page. Known sites use their
+    own extractor, then publisher citation meta tags are tried, then the
+    generic full-text / description / abstract / first-paragraphs fallback.
+    """
+    if not content:
+        return ""
+    try:
+        tree = parse_html(content)
+    except (etree.ParserError, ValueError):
+        return ""
+
+    host = (urlparse(url).hostname or "") if url else ""
+    host = host[4:] if host.startswith("www.") else host
+    for extractor in (SITE_EXTRACTORS.get(host), _extract_publisher, _extract_generic):
+        if extractor:
+            text = extractor(tree)
+            if text:
+                return _WHITESPACE.sub(" ", text).strip()
+    return ""
+
+
+def extract_paper_metadata(content: bytes, url: str) -> dict:
+    """Title, authors and abstract of a paper landing page."""
+    tree = parse_html(content)
+    title = (
+        _meta(tree, "citation_title", "dc.title", "og:title")
+        or _first_text(tree, f"//h1[{_has_class('paper-title')} or {_has_class('title')}]")
+        or "No Title Found"
+    )
+    authors = [a.strip() for a in tree.xpath("//meta[@name='citation_author']/@content") if a.strip()]
+    if not authors:
+        authors = [_text(a) for a in tree.xpath(f"//a[{_has_class('author-name')}]")]
+    abstract = extract_text_from_html(content, url) or _text(tree)
+    return {
+        "title": title,
+        "url": url,
+        "authors": authors,
+        "abstract": abstract
+    }
+
+
+def extract_citation_metadata(content: bytes, url: str) -> dict:
+    """
+    Bibliographic fields from a landing page's citation_* / Dublin Core meta
+    tags. Cheaper than extract_paper_metadata(): no body text is extracted.
+    """
+    tree = parse_html(content)
+    date = _meta(tree, "citation_publication_date", "citation_date", "citation_online_date", "dc.date")
+    year = re.search(r"\b(1[5-9]\d\d|20\d\d)\b", date)
+    first_page, last_page = _meta(tree, "citation_firstpage"), _meta(tree, "citation_lastpage")
+    return {
+        "title": _meta(tree, "citation_title", "dc.title", "og:title") or _first_text(tree, "//h1"),
+        "authors": [a.strip() for a in tree.xpath("//meta[@name='citation_author' or @name='dc.creator']/@content")
+                    if a.strip()],
+        "doi": _meta(tree, "citation_doi", "dc.identifier"),
+        "year": year.group(1) if year else "",
+        "container": _meta(tree, "citation_journal_title", "citation_conference_title", "og:site_name"),
+        "volume": _meta(tree, "citation_volume"),
+        "issue": _meta(tree, "citation_issue"),
+        "pages": f"{first_page}-{last_page}" if first_page and last_page else first_page,
+        "publisher": _meta(tree, "citation_publisher", "dc.publisher"),
+        "url": url,
+    }
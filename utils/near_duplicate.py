@@ -0,0 +1,238 @@
+import re
+import zlib
+import sqlite3
+import hashlib
+import threading
+import numpy as np
+from typing import List, NamedTuple, Optional
+from utils.corpus_store import CORPUS_PATH
+from utils.document import find_abstract
+
+# ---------------- Config ---------------- #
+NUM_PERM = 128
+BANDS = 16              # 16 bands x 8 rows: candidate pairs from ~0.7 Jaccard upwards
+ROWS = NUM_PERM // BANDS
+SHINGLE_SIZE = 5        # words per shingle
+THRESHOLD = 0.8         # estimated Jaccard (full texts) or containment (abstracts) needed to call two texts duplicates
+
+# An abstract page and the full PDF of the same paper share little of their
+# full shingle sets, so each text also gets a signature of its abstract, as
+# detected in the text or given by the caller. Abstracts are compared by
+# containment, |A∩B| / min(|A|, |B|), and banded more finely to surface
+# partial overlaps. Page furniture never takes part: texts without a
+# recognizable abstract are matched on full-text Jaccard only.
+ABSTRACT_BANDS = 32         # 32 bands x 4 rows: candidate pairs from ~0.4 Jaccard upwards
+ABSTRACT_ROWS = NUM_PERM // ABSTRACT_BANDS
+MIN_ABSTRACT_SHINGLES = 50  # shorter abstracts are too small to tell papers apart
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_rng = np.random.default_rng(42)
+# Coefficients below 2**32 keep a * hash + b inside uint64 for 32-bit hashes
+_PERM_A = _rng.integers(1, 1 << 32, size=NUM_PERM, dtype=np.uint64)
+_PERM_B = _rng.integers(0, 1 << 32, size=NUM_PERM, dtype=np.uint64)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS minhash_signatures (
+    content_hash TEXT PRIMARY KEY,
+    signature    BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS minhash_buckets (
+    band         INTEGER NOT NULL,
+    bucket       TEXT NOT NULL,
+    content_hash TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_minhash_buckets ON minhash_buckets (band, bucket);
+CREATE TABLE IF NOT EXISTS minhash_abstracts (
+    content_hash  TEXT PRIMARY KEY,
+    signature     BLOB NOT NULL,
+    shingle_count INTEGER NOT NULL
+);
+"""
+
+_local = threading.local()
+
+
+def _connect() -> sqlite3.Connection:
+    """LSH tables live next to the papers in the corpus database."""
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        CORPUS_PATH.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(CORPUS_PATH, timeout=10)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(SCHEMA)
+        _local.conn = conn
+    return conn
+
+
+# ---------------- Signatures ---------------- #
+class TextSignature(NamedTuple):
+    full: np.ndarray      # MinHash of every shingle
+    abstract: np.ndarray  # MinHash of the abstract's shingles
+    abstract_size: int    # distinct shingles in the abstract; 0 when none was found
+    length: int           # characters of text, so richer sources can be preferred
+
+
+def shingles(text: str) -> set:
+    """Word n-gram shingles of the lowercased, punctuation-free text."""
+    words = re.findall(r"[a-z0-9]+", text.lower())
+    if len(words) < SHINGLE_SIZE:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)}
+
+
+def _minhash(shingle_set: set) -> np.ndarray:
+    hashes = np.fromiter((zlib.crc32(s.encode("utf-8")) for s in shingle_set), dtype=np.uint64)
+    if not len(hashes):
+        return np.full(NUM_PERM, np.iinfo(np.uint64).max, dtype=np.uint64)
+    permuted = (np.outer(_PERM_A, hashes) + _PERM_B[:, None]) % _MERSENNE_PRIME
+    return permuted.min(axis=1)
+
+
+def minhash_signature(text: str) -> np.ndarray:
+    """MinHash signature (NUM_PERM uint64 values) of a text's shingle set."""
+    return _minhash(shingles(text))
+
+
+def text_signature(text: str, abstract: str = None) -> TextSignature:
+    """
+    Full-text and abstract signatures of a text, as stored by add_document().
+    Pass `abstract` when it is known (a Crossref abstract, a PDF's detected
+    abstract section); otherwise an "Abstract" passage is looked for in `text`.
+    """
+    if abstract is None:
+        abstract = find_abstract(text)
+    abstract_shingles = shingles(abstract) if abstract else set()
+    return TextSignature(minhash_signature(text), _minhash(abstract_shingles), len(abstract_shingles), len(text))
+
+
+def estimate_similarity(sig_a: np.ndarray, sig_b: np.ndarray) -> float:
+    """Fraction of agreeing permutations, an unbiased Jaccard estimate."""
+    return float(np.mean(sig_a == sig_b))
+
+
+def estimate_containment(sig_a: np.ndarray, size_a: int, sig_b: np.ndarray, size_b: int) -> float:
+    """
+    Estimated share of the smaller set found in the larger one: with Jaccard
+    J, |A∩B| = J * (|A| + |B|) / (1 + J).
+    """
+    if min(size_a, size_b) < MIN_ABSTRACT_SHINGLES:
+        return 0.0
+    jaccard = estimate_similarity(sig_a, sig_b)
+    return min(1.0, jaccard * (size_a + size_b) / ((1 + jaccard) * min(size_a, size_b)))
+
+
+def _band_keys(signature: np.ndarray, bands: int = BANDS, rows: int = ROWS) -> List[str]:
+    return [
+        hashlib.blake2b(signature[band * rows:(band + 1) * rows].tobytes(), digest_size=8).hexdigest()
+        for band in range(bands)
+    ]
+
+
+def _has_abstract(signature: TextSignature) -> bool:
+    return signature.abstract_size >= MIN_ABSTRACT_SHINGLES
+
+
+def _abstract_band_keys(signature: TextSignature) -> List[tuple]:
+    """(band, key) pairs of the abstract, numbered after the full-text bands."""
+    if not _has_abstract(signature):
+        return []
+    keys = _band_keys(signature.abstract, ABSTRACT_BANDS, ABSTRACT_ROWS)
+    return [(BANDS + band, key) for band, key in enumerate(keys)]
+
+
+def _all_band_keys(signature: TextSignature) -> List[tuple]:
+    return list(enumerate(_band_keys(signature.full))) + _abstract_band_keys(signature)
+
+
+def _duplicate_score(a: TextSignature, full_b: np.ndarray, abstract_b: Optional[np.ndarray],
+                     abstract_size_b: int) -> float:
+    score = estimate_similarity(a.full, full_b)
+    if abstract_b is not None:
+        score = max(score, estimate_containment(a.abstract, a.abstract_size, abstract_b, abstract_size_b))
+    return score
+
+
+# ---------------- Persistent index ---------------- #
+def find_near_duplicate(signature: TextSignature, threshold: float = THRESHOLD) -> Optional[str]:
+    """
+    Return the content hash of the stored document most similar to
+    `signature`, if its score is at least `threshold`, or None.
+    """
+    matches = find_near_duplicates(signature, threshold)
+    return matches[0] if matches else None
+
+
+def find_near_duplicates(signature: TextSignature, threshold: float = THRESHOLD) -> List[str]:
+    """
+    Content hashes of stored documents whose estimated Jaccard similarity to
+    `signature`, or containment of their abstracts, is at least `threshold`,
+    best match first.
+    """
+    conn = _connect()
+    candidates = set()
+    for band, key in _all_band_keys(signature):
+        rows = conn.execute(
+            "SELECT content_hash FROM minhash_buckets WHERE band = ? AND bucket = ?", [band, key]
+        ).fetchall()
+        candidates.update(row[0] for row in rows)
+
+    scored = []
+    for candidate in candidates:
+        row = conn.execute(
+            "SELECT s.signature, a.signature, a.shingle_count FROM minhash_signatures s "
+            "LEFT JOIN minhash_abstracts a ON a.content_hash = s.content_hash WHERE s.content_hash = ?", [candidate]
+        ).fetchone()
+        if row:
+            abstract = np.frombuffer(row[1], dtype=np.uint64) if row[1] is not None else None
+            score = _duplicate_score(signature, np.frombuffer(row[0], dtype=np.uint64), abstract, row[2] or 0)
+            if score >= threshold:
+                scored.append((score, candidate))
+    return [candidate for _, candidate in sorted(scored, reverse=True)]
+
+
+def add_document(content_hash: str, signature: TextSignature) -> None:
+    """Register a processed document's signatures under its corpus content hash."""
+    conn = _connect()
+    with conn:
+        cursor = conn.execute(
+            "INSERT OR IGNORE INTO minhash_signatures (content_hash, signature) VALUES (?, ?)",
+            [content_hash, signature.full.astype(np.uint64).tobytes()]
+        )
+        if cursor.rowcount:
+            conn.executemany(
+                "INSERT INTO minhash_buckets (band, bucket, content_hash) VALUES (?, ?, ?)",
+                [(band, key, content_hash) for band, key in enumerate(_band_keys(signature.full))]
+            )
+        if not _has_abstract(signature):
+            return
+        cursor = conn.execute(
+            "INSERT OR IGNORE INTO minhash_abstracts (content_hash, signature, shingle_count) VALUES (?, ?, ?)",
+            [content_hash, signature.abstract.astype(np.uint64).tobytes(), signature.abstract_size]
+        )
+        if cursor.rowcount:
+            conn.executemany(
+                "INSERT INTO minhash_buckets (band, bucket, content_hash) VALUES (?, ?, ?)",
+                [(band, key, content_hash) for band, key in _abstract_band_keys(signature)]
+            )
+
+
+# ---------------- In-memory dedup ---------------- #
+def deduplicate(texts: List[str], threshold: float = THRESHOLD) -> List[int]:
+    """
+    Indices of the texts to keep, dropping any text that is a near-duplicate
+    of an earlier one in the list. Nothing is persisted.
+    """
+    buckets = {}
+    kept, signatures = [], {}
+    for i, text in enumerate(texts):
+        signature = text_signature(text)
+        keys = _all_band_keys(signature)
+        candidates = {j for band_key in keys for j in buckets.get(band_key, ())}
+        if any(_duplicate_score(signature, signatures[j].full, signatures[j].abstract, signatures[j].abstract_size)
+               >= threshold for j in candidates):
+            continue
+        kept.append(i)
+        signatures[i] = signature
+        for band_key in keys:
+            buckets.setdefault(band_key, []).append(i)
+    return kept
@@ -0,0 +1,149 @@
+import os
+import time
+import asyncio
+import threading
+import requests
+from urllib.parse import urlparse
+from utils.redis_client import get_redis, get_async_redis, mark_redis_down
+from utils.tracing import span
+
+# ---------------- Config ---------------- #
+MAX_429_RETRIES = 3
+
+# Published per-client limits: host -> (requests per second, burst)
+RATE_LIMITS = {
+    "export.arxiv.org": (1 / 3, 1),
+    "eutils.ncbi.nlm.nih.gov": (10, 10) if os.getenv("NCBI_API_KEY") else (3, 3),
+    "api.semanticscholar.org": (1, 1),
+    "api.crossref.org": (50, 50),
+    "api.openalex.org": (10, 10),
+}
+
+# GCRA: each call reserves the next slot on the host's schedule and is told
+# how long to wait for it, so concurrent callers queue in order instead of
+# failing and retrying. Redis TIME keeps every process on one clock.
+GCRA_SCRIPT = """
+local interval = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+local tat = tonumber(redis.call('GET', KEYS[1]) or now)
+if tat < now then tat = now end
+local wait = tat - now - (burst - 1) * interval
+if wait < 0 then wait = 0 end
+local new_tat = tat + interval
+redis.call('SET', KEYS[1], new_tat, 'PX', math.ceil(new_tat - now + burst * interval))
+return wait
+"""
+
+_scripts = {}
+_async_scripts = {}
+_local_tat = {}
+_local_lock = threading.Lock()
+
+
+def _redis_script():
+    """GCRA script registered on the shared client, or None while Redis is unreachable."""
+    client = get_redis()
+    if client is None:
+        return None
+    if id(client) not in _scripts:
+        _scripts.clear()
+        _scripts[id(client)] = client.register_script(GCRA_SCRIPT)
+    return _scripts[id(client)]
+
+
+def _async_redis_script():
+    """GCRA script on the redis.asyncio client, for reservations made on the event loop."""
+    client = get_async_redis()
+    if client is None:
+        return None
+    if id(client) not in _async_scripts:
+        _async_scripts.clear()
+        _async_scripts[id(client)] = client.register_script(GCRA_SCRIPT)
+    return _async_scripts[id(client)]
+
+
+def _local_reserve(host: str, interval_ms: float, burst: int) -> float:
+    """Same GCRA schedule kept in-process, used when Redis is unavailable."""
+    with _local_lock:
+        now = time.monotonic() * 1000
+        tat = max(_local_tat.get(host, now), now)
+        _local_tat[host] = tat + interval_ms
+    return max(0.0, tat - now - (burst - 1) * interval_ms)
+
+
+def reserve(host: str) -> float:
+    """
+    Reserve the next request slot for `host`. Returns the number of seconds
+    the caller must wait before sending; 0 for hosts without a configured limit.
+    """
+    limit = RATE_LIMITS.get(host)
+    if not limit:
+        return 0.0
+    rate, burst = limit
+    interval_ms = 1000 / rate
+
+    try:
+        script = _redis_script()
+        if script is not None:
+            return float(script(keys=[f"ratelimit:{host}"], args=[interval_ms, burst])) / 1000
+    except Exception as e:
+        mark_redis_down(e)
+
+    return _local_reserve(host, interval_ms, burst) / 1000
+
+
+def acquire(url: str) -> None:
+    """Block until a request to `url`'s host may be sent."""
+    wait = reserve(urlparse(url).hostname or "")
+    if wait:
+        time.sleep(wait)
+
+
+async def reserve_async(host: str) -> float:
+    """reserve() for the event loop: the Redis round trip is awaited instead of blocking."""
+    limit = RATE_LIMITS.get(host)
+    if not limit:
+        return 0.0
+    rate, burst = limit
+    interval_ms = 1000 / rate
+
+    try:
+        script = _async_redis_script()
+        if script is not None:
+            return float(await script(keys=[f"ratelimit:{host}"], args=[interval_ms, burst])) / 1000
+    except Exception as e:
+        mark_redis_down(e)
+
+    return _local_reserve(host, interval_ms, burst) / 1000
+
+
+async def acquire_async(url: str) -> None:
+    """Async variant of acquire() for httpx callers."""
+    wait = await reserve_async(urlparse(url).hostname or "")
+    if wait:
+        await asyncio.sleep(wait)
+
+
+def rate_limited_get(url: str, **kwargs) -> requests.Response:
+    """
+    requests.get() that waits for the host's rate-limit slot and, if the
+    provider still answers 429, honours Retry-After before trying again.
+    """
+    host = urlparse(url).hostname or ""
+    with span(f"GET {host}", url=url) as s:
+        for attempt in range(MAX_429_RETRIES + 1):
+            wait = reserve(host)
+            if wait:
+                time.sleep(wait)
+            response = requests.get(url, **kwargs)
+            if s is not None:
+                s.set(status=response.status_code, attempts=attempt + 1,
+                      rate_limit_wait_ms=round(s.attributes.get("rate_limit_wait_ms", 0) + wait * 1000, 1))
+            if response.status_code != 429 or attempt == MAX_429_RETRIES:
+                return response
+            retry_after = response.headers.get("Retry-After", "")
+            time.sleep(float(retry_after) if retry_after.isdigit() else 2 ** attempt)
+            response.close()
+        return response
@@ -0,0 +1,49 @@
+import os
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+REDIS_RETRY_AFTER = 30  # seconds to wait before trying Redis again after a failure
+
+_state = {"client": None, "async_client": None, "down_until": 0.0}
+
+
+def get_redis():
+    """
+    Shared Redis client (the Celery broker by default), or None while Redis is
+    unreachable so callers can fall back to in-process behaviour.
+    """
+    if time.time() < _state["down_until"]:
+        return None
+    if _state["client"] is None:
+        try:
+            import redis
+            _state["client"] = redis.Redis.from_url(REDIS_URL, socket_connect_timeout=0.2, socket_timeout=0.5)
+        except ImportError as e:
+            mark_redis_down(e)
+            return None
+    return _state["client"]
+
+
+def get_async_redis():
+    """redis.asyncio counterpart of get_redis() for code running on the event loop."""
+    if time.time() < _state["down_until"]:
+        return None
+    if _state["async_client"] is None:
+        try:
+            import redis.asyncio as aioredis
+            _state["async_client"] = aioredis.Redis.from_url(REDIS_URL, socket_connect_timeout=0.2, socket_timeout=0.5)
+        except ImportError as e:
+            mark_redis_down(e)
+            return None
+    return _state["async_client"]
+
+
+def mark_redis_down(error: Exception) -> None:
+    """Stop using Redis for REDIS_RETRY_AFTER seconds after a failed call."""
+    logger.warning(f"Redis unavailable, using in-process fallback: {error}")
+    _state["down_until"] = time.time() + REDIS_RETRY_AFTER
+    _state["client"] = None
+    _state["async_client"] = None
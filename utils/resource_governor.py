@@ -0,0 +1,109 @@
+import os
+import time
+import threading
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from utils.tracing import span
+
+# ---------------- Config ---------------- #
+# Cores this host may spend on inference, split across the server worker
+# processes (uvicorn --workers / Celery -c) and, within each process, across
+# INFERENCE_SLOTS concurrent model calls. Every slot gets its own share of
+# intra-op threads so the sum never exceeds the budget.
+def _available_cores() -> int:
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:  # not available on macOS / Windows
+        return os.cpu_count() or 1
+
+
+CPU_BUDGET = int(os.getenv("CPU_BUDGET", _available_cores()))
+WORKER_PROCESSES = int(os.getenv("WORKER_PROCESSES", os.getenv("WEB_CONCURRENCY", "1")))
+INFERENCE_SLOTS = int(os.getenv("INFERENCE_SLOTS", "1"))
+THREADS_PER_SLOT = max(1, CPU_BUDGET // max(1, WORKER_PROCESSES * INFERENCE_SLOTS))
+
+# Native thread pools read these when torch/numpy load, so they are set at
+# import time; this module is imported before transformers by generation_profiles.
+for _var in ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS", "NUMEXPR_NUM_THREADS"):
+    os.environ.setdefault(_var, str(THREADS_PER_SLOT))
+os.environ.setdefault("TOKENIZERS_PARALLELISM", "false")
+
+_executor = ThreadPoolExecutor(max_workers=INFERENCE_SLOTS, thread_name_prefix="inference")
+_stats_lock = threading.Lock()
+_stats = {"active": 0, "queued": 0, "completed": 0, "wait_s": 0.0, "busy_s": 0.0}
+_started_at = time.time()
+_torch_configured = False
+
+
+def configure_torch() -> None:
+    """Apply the per-slot thread count to torch (once per process, after torch is imported)."""
+    global _torch_configured
+    if _torch_configured:
+        return
+    _torch_configured = True
+    try:
+        import torch
+    except ImportError:  # native pools are still capped by the env vars above
+        return
+    torch.set_num_threads(THREADS_PER_SLOT)
+    try:
+        torch.set_num_interop_threads(1)
+    except RuntimeError:
+        pass  # can only be set before the first parallel op; already running
+
+
+def _run(fn, enqueued_at: float, args, kwargs):
+    started = time.time()
+    with _stats_lock:
+        _stats["queued"] -= 1
+        _stats["active"] += 1
+        _stats["wait_s"] += started - enqueued_at
+    try:
+        name = getattr(fn, "__qualname__", type(fn).__name__)
+        with span(f"inference {name}", queue_wait_ms=round((started - enqueued_at) * 1000, 1)):
+            return fn(*args, **kwargs)
+    finally:
+        with _stats_lock:
+            _stats["active"] -= 1
+            _stats["completed"] += 1
+            _stats["busy_s"] += time.time() - started
+
+
+def submit_inference(fn, *args, **kwargs):
+    """Queue a model call on the bounded inference executor; returns a Future."""
+    configure_torch()
+    with _stats_lock:
+        _stats["queued"] += 1
+    # Run in the caller's context so the model call's span joins the request's trace
+    context = contextvars.copy_context()
+    return _executor.submit(context.run, _run, fn, time.time(), args, kwargs)
+
+
+def run_inference(fn, *args, **kwargs):
+    """
+    Run a model call on one of the INFERENCE_SLOTS executor threads and wait
+    for it. Callers beyond the slot count queue here instead of competing for cores.
+    """
+    if threading.current_thread().name.startswith("inference"):
+        return fn(*args, **kwargs)  # already on an inference thread
+    return submit_inference(fn, *args, **kwargs).result()
+
+
+def governor_stats() -> dict:
+    """Current configuration and saturation of the inference executor."""
+    with _stats_lock:
+        stats = dict(_stats)
+    uptime = max(time.time() - _started_at, 1e-9)
+    return {
+        "cpu_budget": CPU_BUDGET,
+        "worker_processes": WORKER_PROCESSES,
+        "inference_slots": INFERENCE_SLOTS,
+        "threads_per_slot": THREADS_PER_SLOT,
+        "active": stats["active"],
+        "queued": stats["queued"],
+        "completed": stats["completed"],
+        # Fraction of slots busy right now, and averaged since startup
+        "saturation": stats["active"] / INFERENCE_SLOTS,
+        "utilization": stats["busy_s"] / (uptime * INFERENCE_SLOTS),
+        "avg_wait_ms": round(stats["wait_s"] / stats["completed"] * 1000, 2) if stats["completed"] else 0.0,
+    }
@@ -0,0 +1,141 @@
+import json
+import uuid
+import asyncio
+import hashlib
+from typing import Any, Awaitable, Callable, Dict
+from utils.redis_client import get_async_redis, mark_redis_down
+
+# ---------------- Config ---------------- #
+LOCK_TTL_MS = 120_000        # leader lock, refreshed while the computation runs
+RESULT_TTL_MS = 120_000      # how long later callers in other processes can pick up the result
+POLL_INTERVAL = 0.25         # seconds a follower waits for the leader's message before rechecking the lock
+WAIT_TIMEOUT = 900           # followers give up and compute themselves after this
+
+# Compare-and-delete so a leader never releases a lock it no longer owns
+RELEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+_in_flight: Dict[str, asyncio.Future] = {}
+
+
+def flight_key(kind: str, value: str, **params) -> str:
+    """Key identifying a unit of work: input kind, identifier and any options."""
+    raw = json.dumps({"kind": kind, "value": value, **params}, sort_keys=True)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+async def _keep_lock(client, lock_key: str, token: str) -> None:
+    while True:
+        await asyncio.sleep(LOCK_TTL_MS / 3000)
+        try:
+            if await client.get(lock_key) == token.encode():
+                await client.pexpire(lock_key, LOCK_TTL_MS)
+        except Exception:
+            return
+
+
+async def _wait_as_follower(client, key: str, token: str, deadline: float):
+    """
+    Wait for the leader's result. Returns ("result", value), or ("lead", None)
+    once this caller holds the lock (the leader finished without a usable
+    result, failed or died). Raises asyncio.TimeoutError after `deadline`.
+    """
+    lock_key, result_key = f"singleflight:lock:{key}", f"singleflight:result:{key}"
+    loop = asyncio.get_running_loop()
+    pubsub = client.pubsub()
+    try:
+        # Subscribe before checking, so a result published in between is not missed
+        await pubsub.subscribe(f"singleflight:done:{key}")
+        while True:
+            cached = await client.get(result_key)
+            if cached:
+                return "result", json.loads(cached)
+            if await client.set(lock_key, token, nx=True, px=LOCK_TTL_MS):
+                return "lead", None
+            if loop.time() > deadline:
+                raise asyncio.TimeoutError
+            message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=POLL_INTERVAL)
+            if message is not None:
+                return "result", json.loads(message["data"])
+    finally:
+        await pubsub.aclose()
+
+
+async def _run_across_processes(key: str, compute: Callable[[], Awaitable[Any]],
+                                cacheable: Callable[[Any], bool]) -> Any:
+    """
+    Elect one leader across worker processes with a Redis lock. Followers wait
+    on a pub/sub channel for the leader's result. Results that pass
+    `cacheable` are also kept for RESULT_TTL_MS for later callers; failures
+    reach only the followers already waiting. If the leader dies or fails
+    without publishing, the lock expires or is released and a follower takes over.
+    """
+    client = get_async_redis()
+    if client is None:
+        return await compute()
+
+    lock_key, result_key = f"singleflight:lock:{key}", f"singleflight:result:{key}"
+    token = uuid.uuid4().hex
+    deadline = asyncio.get_running_loop().time() + WAIT_TIMEOUT
+    try:
+        outcome, value = await _wait_as_follower(client, key, token, deadline)
+    except asyncio.TimeoutError:
+        return await compute()
+    except Exception as e:
+        mark_redis_down(e)
+        return await compute()
+    if outcome == "result":
+        return value
+
+    heartbeat = asyncio.create_task(_keep_lock(client, lock_key, token))
+    try:
+        result = await compute()
+        try:
+            payload = json.dumps(result, default=str)
+            if cacheable(result):
+                await client.set(result_key, payload, px=RESULT_TTL_MS)
+            await client.publish(f"singleflight:done:{key}", payload)
+        except Exception as e:
+            mark_redis_down(e)
+        return result
+    finally:
+        heartbeat.cancel()
+        try:
+            await client.eval(RELEASE_SCRIPT, 1, lock_key, token)
+        except Exception:
+            pass
+
+
+def _consume_exception(future: asyncio.Future) -> None:
+    if not future.cancelled():
+        future.exception()
+
+
+async def single_flight(key: str, compute: Callable[[], Awaitable[Any]],
+                        cacheable: Callable[[Any], bool] = lambda result: True) -> Any:
+    """
+    Run `compute` once for all concurrent callers sharing `key`. Callers in
+    this process await the leader's future; callers in other processes wait
+    on the Redis lock and receive the published (JSON) result. Pass
+    `cacheable` to keep error payloads from being served to later callers.
+    """
+    existing = _in_flight.get(key)
+    if existing is not None:
+        return await asyncio.shield(existing)
+
+    future = asyncio.get_running_loop().create_future()
+    future.add_done_callback(_consume_exception)
+    _in_flight[key] = future
+    try:
+        result = await _run_across_processes(key, compute, cacheable)
+        future.set_result(result)
+        return result
+    except BaseException as e:
+        future.set_exception(e)
+        raise
+    finally:
+        _in_flight.pop(key, None)
@@ -0,0 +1,240 @@
+import os
+import json
+import time
+import atexit
+import asyncio
+import secrets
+import threading
+import functools
+import contextvars
+from pathlib import Path
+from contextlib import contextmanager
+from typing import Optional, Tuple
+import requests
+
+# ---------------- Config ---------------- #
+# TRACE_EXPORTER: "none" (default, spans are not recorded), "json" (one span
+# per line appended to TRACE_FILE) or "otlp" (OTLP/HTTP JSON posted to a local
+# collector such as the OpenTelemetry Collector or Jaeger on port 4318).
+TRACE_EXPORTER = os.getenv("TRACE_EXPORTER", "none").lower()
+TRACE_FILE = Path(os.getenv("TRACE_FILE", "logs/traces.jsonl"))
+TRACE_OTLP_ENDPOINT = os.getenv("TRACE_OTLP_ENDPOINT", "http://localhost:4318/v1/traces")
+FLUSH_INTERVAL = 2.0  # seconds
+MAX_BATCH = 512
+ENABLED = TRACE_EXPORTER in ("json", "otlp")
+
+SpanContext = Tuple[str, str]  # (trace id, span id) as lowercase hex
+
+
+class Span:
+    """One timed operation; parent_id links it into its trace."""
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "start_ns", "end_ns", "attributes", "error")
+
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str], attributes: dict):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.start_ns = time.time_ns()
+        self.end_ns = 0
+        self.attributes = attributes
+        self.error = None
+
+    def set(self, **attributes) -> None:
+        self.attributes.update(attributes)
+
+    def to_dict(self) -> dict:
+        return {
+            "service": _service["name"],
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start_ns": self.start_ns,
+            "duration_ms": round((self.end_ns - self.start_ns) / 1e6, 3),
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+
+_current: contextvars.ContextVar = contextvars.ContextVar("current_span", default=None)
+_service = {"name": os.getenv("TRACE_SERVICE_NAME", "research-api")}
+
+
+def set_service_name(name: str) -> None:
+    """Label spans from this process (e.g. "research-worker" in Celery workers)."""
+    if not os.getenv("TRACE_SERVICE_NAME"):
+        _service["name"] = name
+
+
+# ---------------- Spans ---------------- #
+@contextmanager
+def span(name: str, parent: SpanContext = None, **attributes):
+    """
+    Time the block as a child of the current span (or of `parent`, a context
+    extracted from another process). Yields the Span, or None when tracing is off.
+    """
+    if not ENABLED:
+        yield None
+        return
+    current = _current.get()
+    if parent:
+        trace_id, parent_id = parent
+    elif current:
+        trace_id, parent_id = current.trace_id, current.span_id
+    else:
+        trace_id, parent_id = secrets.token_hex(16), None
+
+    s = Span(name, trace_id, parent_id, {k: v for k, v in attributes.items() if v is not None})
+    token = _current.set(s)
+    try:
+        yield s
+    except BaseException as e:
+        s.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        _current.reset(token)
+        s.end_ns = time.time_ns()
+        _export(s)
+
+
+def traced(name: str = None):
+    """Decorator form of span() for sync and async functions."""
+    def decorator(fn):
+        span_name = name or f"{fn.__module__}.{fn.__qualname__}"
+        if asyncio.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with span(span_name):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(span_name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def annotate(**attributes) -> None:
+    """Add attributes to the current span, if any."""
+    current = _current.get()
+    if current is not None:
+        current.set(**attributes)
+
+
+def current_trace_id() -> Optional[str]:
+    current = _current.get()
+    return current.trace_id if current else None
+
+
+# ---------------- Propagation ---------------- #
+# W3C Trace Context: "traceparent: 00-<trace id>-<parent span id>-01"
+def inject(carrier: dict) -> dict:
+    """Add the current span's traceparent to `carrier` (HTTP or task headers)."""
+    current = _current.get()
+    if current is not None:
+        carrier["traceparent"] = f"00-{current.trace_id}-{current.span_id}-01"
+    return carrier
+
+
+def extract(traceparent: Optional[str]) -> Optional[SpanContext]:
+    """Parent context from a traceparent value, or None when absent or malformed."""
+    parts = (traceparent or "").strip().split("-")
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+    try:
+        int(parts[1], 16), int(parts[2], 16)
+    except ValueError:
+        return None
+    return parts[1], parts[2]
+
+
+# ---------------- Export ---------------- #
+# Finished spans are buffered and written by one daemon thread, so recording
+# a span costs a list append on the request path.
+_buffer = []
+_buffer_lock = threading.Lock()
+_flush_event = threading.Event()
+_flusher = {"thread": None}
+
+
+def _export(s: Span) -> None:
+    with _buffer_lock:
+        _buffer.append(s)
+        full = len(_buffer) >= MAX_BATCH
+        if _flusher["thread"] is None or _flusher["thread"].pid != os.getpid():
+            _start_flusher()  # first span in this (possibly forked) process
+    if full:
+        _flush_event.set()
+
+
+def _start_flusher() -> None:
+    thread = threading.Thread(target=_flush_loop, name="trace-exporter", daemon=True)
+    thread.pid = os.getpid()
+    _flusher["thread"] = thread
+    thread.start()
+
+
+def _flush_loop() -> None:
+    while True:
+        _flush_event.wait(FLUSH_INTERVAL)
+        _flush_event.clear()
+        flush()
+
+
+def flush() -> None:
+    """Write out every buffered span now."""
+    with _buffer_lock:
+        spans = _buffer[:]
+        del _buffer[:]
+    if not spans:
+        return
+    try:
+        if TRACE_EXPORTER == "json":
+            _write_json(spans)
+        elif TRACE_EXPORTER == "otlp":
+            _post_otlp(spans)
+    except (OSError, requests.RequestException) as e:
+        print(f"⚠️ Dropped {len(spans)} trace spans: {e}")
+
+
+def _write_json(spans: list) -> None:
+    TRACE_FILE.parent.mkdir(parents=True, exist_ok=True)
+    lines = "".join(json.dumps(s.to_dict(), default=str) + "\n" for s in spans)
+    with open(TRACE_FILE, "a", encoding="utf-8") as f:
+        f.write(lines)
+
+
+def _otlp_value(value) -> dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _post_otlp(spans: list) -> None:
+    otlp_spans = [{
+        "traceId": s.trace_id,
+        "spanId": s.span_id,
+        "parentSpanId": s.parent_id or "",
+        "name": s.name,
+        "kind": 1,
+        "startTimeUnixNano": str(s.start_ns),
+        "endTimeUnixNano": str(s.end_ns),
+        "attributes": [{"key": k, "value": _otlp_value(v)} for k, v in s.attributes.items()],
+        "status": {"code": 2, "message": s.error} if s.error else {"code": 1},
+    } for s in spans]
+    payload = {"resourceSpans": [{
+        "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": _service["name"]}}]},
+        "scopeSpans": [{"scope": {"name": "research-tracing"}, "spans": otlp_spans}],
+    }]}
+    requests.post(TRACE_OTLP_ENDPOINT, json=payload, timeout=5).raise_for_status()
+
+
+if ENABLED:
+    atexit.register(flush)
@@ -0,0 +1,230 @@
+import os
+import json
+import fcntl
+import threading
+import numpy as np
+from pathlib import Path
+from typing import List, Optional
+
+# ---------------- Config ---------------- #
+INDEX_DIR = Path(os.getenv("VECTOR_INDEX_DIR", "index"))
+DEFAULT_NPROBE = 8
+KMEANS_ITERATIONS = 10
+KMEANS_SAMPLE = 50_000  # rows used to train the coarse quantizer
+
+
+class VectorIndex:
+    """
+    Store of L2-normalized float32 vectors with an IVF (inverted file)
+    approximate nearest-neighbour structure. Rows added with a key are
+    upserted: adding the same key again overwrites that row in place.
+
+    Layout inside `directory`:
+        vectors.f32  raw row-major float32 matrix, memory-mapped for search
+        meta.jsonl   JSON metadata records; a later record for the same row id
+                     replaces the earlier one
+        ivf.npz      k-means centroids plus CSR-style inverted lists
+
+    Rows appended after the last build() are scanned exhaustively, so the
+    index stays exact for new papers until the next rebuild. Rebuilds run in
+    a background thread, one process at a time.
+    """
+
+    def __init__(self, directory: Path = INDEX_DIR, dim: int = 384):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.dim = dim
+        self.vectors_path = self.directory / "vectors.f32"
+        self.meta_path = self.directory / "meta.jsonl"
+        self.ivf_path = self.directory / "ivf.npz"
+        self.lock_path = self.directory / ".lock"
+        self.build_lock_path = self.directory / ".build.lock"
+
+        self._lock = threading.RLock()
+        self._vectors = None
+        self._metadata = []
+        self._keys = {}  # key -> row id
+        # Upserted row id -> meta.jsonl offset past its record. Scanned exactly,
+        # since its IVF list may be stale, until a build that read it is loaded.
+        self._rewritten = {}
+        self._meta_offset = 0
+        # (centroids, list offsets, list ids, rows built); replaced as a whole so
+        # a search never mixes arrays from two builds
+        self._ivf = None
+        self._ivf_mtime = None
+        self._builder = None
+        self._refresh()
+
+    # ---------------- Loading ---------------- #
+    def _refresh(self) -> None:
+        """Pick up rows and IVF builds written by this or another process."""
+        with self._lock:
+            if self.meta_path.exists():
+                with open(self.meta_path, "rb") as f:
+                    f.seek(self._meta_offset)
+                    for line in f:
+                        if not line.endswith(b"\n"):
+                            break  # partially written by a concurrent writer
+                        record = json.loads(line)
+                        self._meta_offset += len(line)
+                        if record["id"] < len(self._metadata):
+                            self._metadata[record["id"]] = record  # upsert of an existing row
+                            self._rewritten[record["id"]] = self._meta_offset
+                        else:
+                            self._metadata.append(record)
+                        if record.get("key"):
+                            self._keys[record["key"]] = record["id"]
+
+            size = self.vectors_path.stat().st_size if self.vectors_path.exists() else 0
+            rows = min(size // (self.dim * 4), len(self._metadata))
+            if rows and (self._vectors is None or self._vectors.shape[0] != rows):
+                self._vectors = np.memmap(self.vectors_path, dtype=np.float32, mode="r", shape=(rows, self.dim))
+
+            if self.ivf_path.exists():
+                mtime = self.ivf_path.stat().st_mtime
+                if mtime != self._ivf_mtime:
+                    with np.load(self.ivf_path) as ivf:
+                        self._ivf = (ivf["centroids"], ivf["offsets"], ivf["ids"], int(ivf["rows"]))
+                        built_offset = int(ivf["meta_offset"]) if "meta_offset" in ivf.files else 0
+                    self._rewritten = {row_id: offset for row_id, offset in self._rewritten.items()
+                                       if offset > built_offset}
+                    self._ivf_mtime = mtime
+
+    @property
+    def _built_rows(self) -> int:
+        return self._ivf[3] if self._ivf is not None else 0
+
+    def __len__(self) -> int:
+        return 0 if self._vectors is None else self._vectors.shape[0]
+
+    # ---------------- Writing ---------------- #
+    def add(self, vector: np.ndarray, metadata: dict, key: Optional[str] = None) -> int:
+        """
+        Add one vector with its metadata. When `key` is already indexed its row
+        is overwritten instead of appending a duplicate. Returns the row id.
+        """
+        vector = np.asarray(vector, dtype=np.float32).reshape(self.dim)
+        norm = np.linalg.norm(vector)
+        if norm:
+            vector = vector / norm
+
+        with self._lock, open(self.lock_path, "w") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            self._refresh()
+            if key is not None and key in self._keys:
+                row_id = self._keys[key]
+                with open(self.vectors_path, "r+b") as f:
+                    f.seek(row_id * self.dim * 4)
+                    f.write(vector.tobytes())
+            else:
+                row_id = len(self._metadata)
+                with open(self.vectors_path, "ab") as f:
+                    f.seek(row_id * self.dim * 4)
+                    f.truncate()  # drop any vector bytes left by a writer that died mid-append
+                    f.write(vector.tobytes())
+            record = {**metadata, "id": row_id}
+            if key is not None:
+                record["key"] = key
+            with open(self.meta_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record) + "\n")
+            self._refresh()
+
+        if len(self) >= 2 * max(self._built_rows, 1000):
+            self._schedule_build()
+        return row_id
+
+    def _schedule_build(self) -> None:
+        """Rebuild the IVF in a daemon thread so the caller's request is not held up."""
+        with self._lock:
+            if self._builder is not None and self._builder.is_alive():
+                return
+            self._builder = threading.Thread(target=self._build_if_due, name="ivf-build", daemon=True)
+            self._builder.start()
+
+    def _build_if_due(self) -> None:
+        try:
+            with open(self.build_lock_path, "w") as lock_file:
+                try:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    return  # another process is already rebuilding
+                self._refresh()
+                if len(self) >= 2 * max(self._built_rows, 1000):
+                    self._build_locked()
+        except Exception as e:
+            print(f"⚠️ Could not rebuild vector index: {e}")
+
+    # ---------------- Building ---------------- #
+    def build(self, nlist: Optional[int] = None) -> None:
+        """(Re)train the k-means coarse quantizer and rebuild the inverted lists."""
+        with open(self.build_lock_path, "w") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            self._build_locked(nlist)
+
+    def _build_locked(self, nlist: Optional[int] = None) -> None:
+        with self._lock:
+            self._refresh()
+            rows, vectors, meta_offset = len(self), self._vectors, self._meta_offset
+        if rows == 0:
+            return
+        nlist = nlist or max(1, int(np.sqrt(rows)))
+
+        rng = np.random.default_rng(0)
+        sample_ids = rng.choice(rows, size=min(rows, KMEANS_SAMPLE), replace=False)
+        sample = np.asarray(vectors[np.sort(sample_ids)])
+        centroids = sample[rng.choice(len(sample), size=min(nlist, len(sample)), replace=False)].copy()
+
+        for _ in range(KMEANS_ITERATIONS):
+            assign = np.argmax(sample @ centroids.T, axis=1)
+            for c in range(len(centroids)):
+                members = sample[assign == c]
+                if len(members):
+                    centroid = members.mean(axis=0)
+                    centroids[c] = centroid / (np.linalg.norm(centroid) or 1.0)
+
+        assignments = np.empty(rows, dtype=np.int32)
+        for start in range(0, rows, 65_536):
+            block = np.asarray(vectors[start:start + 65_536])
+            assignments[start:start + len(block)] = np.argmax(block @ centroids.T, axis=1)
+
+        order = np.argsort(assignments, kind="stable").astype(np.int64)
+        counts = np.bincount(assignments, minlength=len(centroids))
+        offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+
+        tmp_path = self.directory / f"ivf.tmp.{os.getpid()}.npz"
+        # meta_offset: upserts recorded up to here are reflected in the lists
+        np.savez(tmp_path, centroids=centroids, offsets=offsets, ids=order, rows=rows, meta_offset=meta_offset)
+        os.replace(tmp_path, self.ivf_path)
+        self._refresh()
+
+    # ---------------- Search ---------------- #
+    def search(self, vector: np.ndarray, top_k: int = 10, nprobe: int = DEFAULT_NPROBE) -> List[dict]:
+        """Return up to top_k metadata records ordered by cosine similarity."""
+        # One consistent snapshot; a background build may swap the IVF meanwhile
+        with self._lock:
+            self._refresh()
+            vectors, ivf, rewritten = self._vectors, self._ivf, list(self._rewritten)
+        if vectors is None:
+            return []
+
+        query = np.asarray(vector, dtype=np.float32).reshape(self.dim)
+        query = query / (np.linalg.norm(query) or 1.0)
+
+        candidates, built_rows = [], 0
+        if ivf is not None:
+            centroids, list_offsets, list_ids, built_rows = ivf
+            probe = np.argsort(centroids @ query)[::-1][:nprobe]
+            candidates = [list_ids[list_offsets[c]:list_offsets[c + 1]] for c in probe]
+        candidates.append(np.arange(built_rows, len(vectors), dtype=np.int64))
+        candidates.append(np.asarray(rewritten, dtype=np.int64))
+        ids = np.unique(np.concatenate(candidates))
+        ids = ids[ids < len(vectors)]  # a build from another process may cover rows not mapped yet
+
+        if not len(ids):
+            return []
+        scores = vectors[ids] @ query
+        k = min(top_k, len(ids))
+        best = np.argpartition(-scores, k - 1)[:k]
+        best = best[np.argsort(-scores[best])]
+
+        return [{**self._metadata[int(ids[i])], "score": float(scores[i])} for i in best]